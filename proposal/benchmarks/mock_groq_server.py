@@ -0,0 +1,246 @@
+"""
+Local stand-in for the Groq chat-completions API, used by the benchmark harness.
+
+It answers the three kinds of calls the prototype makes (outline, streamed sections,
+evaluator tool/JSON calls) with deterministic content, and can simulate network
+latency, token throughput and rate limiting. Point the SDK at it with
+GROQ_BASE_URL=http://127.0.0.1:<port>.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+FILLER_SENTENCES = [
+    "Tommy Atkins accounts for 80% of Brazilian mango exports.",
+    "The Palmer variety has virtually fiberless flesh and a long shelf life.",
+    "Most commercial orchards are irrigated in the semi-arid Sao Francisco Valley.",
+    "Growers in Petrolina harvest mangoes almost year-round thanks to flowering induction.",
+    "Hot water treatment is required before mangoes are shipped to the United States.",
+    "Keitt mangoes stay green when ripe, which often confuses consumers abroad.",
+    "Exports to Europe travel mostly by sea in refrigerated containers.",
+    "Tommy Atkins accounts for 100% of Brazilian mango exports.",
+]
+
+
+class MockGroqConfig:
+    def __init__(self, latency_ms: float = 50.0, tokens_per_second: float = 400.0, section_tokens: int = 600,
+                 rate_limit_probability: float = 0.0, retry_after_s: float = 0.2, hallucination_rate: float = 0.1, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.section_tokens = section_tokens
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after_s = retry_after_s
+        self.hallucination_rate = hallucination_rate
+        self.random = random.Random(seed)
+
+
+class MockGroqServer:
+    """Runs the mock API on a background thread; use as a context manager."""
+
+    def __init__(self, config: Optional[MockGroqConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockGroqConfig()
+        self.stats = {"connections": 0, "requests": 0, "rate_limited": 0, "outline": 0, "section_stream": 0, "tool_selection": 0, "evaluation": 0, "batch_evaluation": 0, "repair": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockGroqServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                # One call per accepted TCP connection, so keep-alive reuse shows up in the stats.
+                server.count("connections")
+                super().setup()
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    self._send_json(200, server.stats)
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                server.count("requests")
+                config = server.config
+                time.sleep(config.latency_ms / 1000.0)
+
+                with server._lock:
+                    rate_limited = config.random.random() < config.rate_limit_probability
+                if rate_limited:
+                    server.count("rate_limited")
+                    self._send_json(429, {"error": {
+                        "message": f"Rate limit reached for model `{body.get('model')}`. Please try again in {config.retry_after_s}s.",
+                        "type": "tokens", "code": "rate_limit_exceeded"
+                    }}, headers={"retry-after": str(config.retry_after_s), "x-ratelimit-remaining-tokens": "0"})
+                    return
+
+                if body.get("stream"):
+                    server.count("section_stream")
+                    self._stream_section(body)
+                else:
+                    self._send_json(200, self._completion(body))
+
+            def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _completion(self, body: dict) -> dict:
+                messages = body.get("messages", [])
+                prompt_text = " ".join(str(m.get("content") or "") for m in messages)
+                message = {"role": "assistant", "content": None}
+
+                if body.get("tools") and not any(m.get("role") == "tool" for m in messages):
+                    server.count("tool_selection")
+                    claim = messages[-1].get("content", "").replace("Claim payload: ", "")
+                    message["tool_calls"] = [{
+                        "id": f"call_{hashlib.md5(claim.encode()).hexdigest()[:8]}",
+                        "type": "function",
+                        "function": {"name": "vector_search", "arguments": json.dumps({"query": claim[:200]})}
+                    }]
+                elif "JSON array" in prompt_text:
+                    server.count("outline")
+                    match = re.search(r"exactly (\d+)", prompt_text)
+                    sections = int(match.group(1)) if match else 5
+                    if '"summary"' in prompt_text:
+                        with server._lock:
+                            outline = [{"title": f"Section {i + 1}", "summary": server.config.random.choice(FILLER_SENTENCES)} for i in range(sections)]
+                    else:
+                        outline = [f"Section {i + 1}" for i in range(sections)]
+                    message["content"] = json.dumps({"outline": outline})
+                elif "Unsupported claims:" in prompt_text:
+                    server.count("repair")
+                    # A "corrected" section: filler without the planted 100% claim.
+                    supported = [sentence for sentence in FILLER_SENTENCES if "100%" not in sentence]
+                    with server._lock:
+                        sentences = [server.config.random.choice(supported) for _ in range(max(1, server.config.section_tokens // 12))]
+                    message["content"] = " ".join(sentences)
+                elif '"verdicts"' in prompt_text:
+                    server.count("batch_evaluation")
+                    claims = re.findall(r"^Claim (\d+): (.*)$", messages[-1].get("content", ""), flags=re.M)
+                    message["content"] = json.dumps({"verdicts": [dict(id=int(n), **self._verdict(claim)) for n, claim in claims]})
+                else:
+                    server.count("evaluation")
+                    claim = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+                    message["content"] = json.dumps(self._verdict(claim))
+
+                prompt_tokens = len(prompt_text) // 4 + 1
+                completion_tokens = len(message["content"] or "") // 4 + 20
+                return {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "mock"),
+                    "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+                }
+
+            def _verdict(self, claim: str) -> dict:
+                # Deterministic per claim, so repeated runs and cached runs agree.
+                digest = int(hashlib.sha256(claim.encode("utf-8")).hexdigest()[:8], 16)
+                hallucinated = "100%" in claim or (digest % 1000) / 1000.0 < server.config.hallucination_rate
+                return {
+                    "faithfulness_score": 0.0 if hallucinated else 1.0,
+                    "requires_revision": hallucinated,
+                    "rationale": "Mock verdict."
+                }
+
+            def _stream_section(self, body: dict):
+                config = server.config
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                words = []
+                while len(words) < config.section_tokens:
+                    words.extend(config.random.choice(FILLER_SENTENCES).split())
+                    # Roughly one paragraph break every 60 words.
+                    if len(words) % 60 < 10:
+                        words[-1] += "\n\n"
+                delay = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+
+                try:
+                    for word in words[:config.section_tokens]:
+                        self._send_event({"choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}, body)
+                        if delay:
+                            time.sleep(delay)
+                    self._send_event({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}, body)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                self.close_connection = True
+
+            def _send_event(self, chunk: dict, body: dict):
+                chunk.update({"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model", "mock")})
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the Groq chat-completions API.")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--section-tokens", type=int, default=600)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = MockGroqConfig(latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second,
+                            section_tokens=args.section_tokens, rate_limit_probability=args.rate_limit_probability)
+    server = MockGroqServer(config, port=args.port)
+    print(f"Mock Groq API listening on {server.base_url} (export GROQ_BASE_URL={server.base_url})")
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+End-to-end throughput/latency benchmarks against the local mock Groq server.
+
+Drives Orchestrator.evaluate_document and Orchestrator.generate_and_evaluate_pipeline at
+several report sizes and prints (or writes) one JSON document with claims/sec, claim
+latency percentiles, time-to-first-token, API call counts and peak memory, so results
+can be diffed between commits:
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --scales 1,5 --embeddings hashing
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_groq_server import FILLER_SENTENCES, MockGroqConfig, MockGroqServer
+
+WORDS_PER_PAGE = 500
+SOURCE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scenario", "source_knowledge.txt"))
+
+
+class HashingEmbeddingFunction(EmbeddingFunction):
+    """Offline bag-of-words embedding, for machines that can't download Chroma's default model."""
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    @staticmethod
+    def name() -> str:
+        return "benchmark-hashing"
+
+    def get_config(self) -> dict:
+        return {"dimensions": self.dimensions}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(**config)
+
+    def __call__(self, input):
+        embeddings = []
+        for text in input:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for word in text.lower().split():
+                vector[sum(map(ord, word)) % self.dimensions] += 1.0
+            embeddings.append(vector / (np.linalg.norm(vector) or 1.0))
+        return embeddings
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+
+def write_draft(path: str, pages: int, seed: int = 0):
+    rng = random.Random(seed)
+    words, paragraphs = 0, []
+    while words < pages * WORDS_PER_PAGE:
+        paragraph = " ".join(rng.choice(FILLER_SENTENCES) for _ in range(6))
+        paragraphs.append(paragraph)
+        words += len(paragraph.split())
+    with open(path, "w") as f:
+        f.write("\n\n".join(paragraphs))
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def build_orchestrator(args, num_sections: int = 5, client_pool=None):
+    from orchestrator import Orchestrator
+    embedding_function = HashingEmbeddingFunction() if args.embeddings == "hashing" else None
+    return Orchestrator(source_text_path=SOURCE_FILE, num_sections=num_sections, client_pool=client_pool,
+                        max_concurrency=args.max_concurrency, embedding_function=embedding_function,
+                        parallel_sections=args.parallel_sections, section_context_tokens=args.section_context_tokens,
+                        outline_context_tokens=args.section_context_tokens, queue_depth=args.queue_depth,
+                        overflow_policy=args.overflow_policy, repair_threshold=args.repair_threshold)
+
+
+def instrument(orchestrator, claim_latencies: list, first_token: dict):
+    """Wraps the orchestrator's per-claim evaluation and the generator stream with timers."""
+    evaluate_claim = orchestrator._evaluate_claim
+
+    async def timed_evaluate_claim(claim):
+        started = time.perf_counter()
+        try:
+            return await evaluate_claim(claim)
+        finally:
+            claim_latencies.append(time.perf_counter() - started)
+
+    orchestrator._evaluate_claim = timed_evaluate_claim
+
+    generate_report_stream = orchestrator.generator.generate_report_stream
+
+    async def timed_stream(*args, **kwargs):
+        async for chunk in generate_report_stream(*args, **kwargs):
+            first_token.setdefault("at", time.perf_counter())
+            yield chunk
+
+    orchestrator.generator.generate_report_stream = timed_stream
+
+
+async def run_case(args, server: MockGroqServer, mode: str, pages: int, workdir: str, client_pool=None) -> dict:
+    num_sections = max(3, pages)
+    server.config.section_tokens = max(50, pages * WORDS_PER_PAGE // num_sections)
+    orchestrator = build_orchestrator(args, num_sections=num_sections, client_pool=client_pool)
+
+    claim_latencies, first_token = [], {}
+    instrument(orchestrator, claim_latencies, first_token)
+    calls_before = dict(server.stats)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    if mode == "document":
+        draft_path = os.path.join(workdir, f"draft_{pages}p.md")
+        write_draft(draft_path, pages)
+        results = await orchestrator.evaluate_document(draft_path)
+    else:
+        results = await orchestrator.generate_and_evaluate_pipeline("Benchmark report", os.path.join(workdir, f"generated_{pages}p.md"))
+    elapsed = time.perf_counter() - started
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    api_calls = {key: server.stats[key] - calls_before.get(key, 0) for key in server.stats}
+    return {
+        "mode": mode,
+        "pages": pages,
+        "claims": len(results),
+        "flagged": sum(1 for r in results if r["verdict"].get("requires_revision", True)),
+        "repairs": orchestrator.repair_stats,
+        "structured_output": {"generator": orchestrator.generator.output_stats, "evaluator": orchestrator.evaluator.output_stats},
+        "wall_seconds": round(elapsed, 3),
+        "claims_per_second": round(len(results) / elapsed, 2) if elapsed else None,
+        "claim_latency_ms": {"p50": percentile(claim_latencies, 0.50), "p95": percentile(claim_latencies, 0.95), "p99": percentile(claim_latencies, 0.99)},
+        "time_to_first_token_ms": round((first_token["at"] - started) * 1000, 2) if "at" in first_token else None,
+        "api_calls": api_calls,
+        "peak_traced_memory_mb": round(peak_traced / 2**20, 2),
+    }
+
+
+async def run(args) -> dict:
+    config = MockGroqConfig(latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second,
+                            rate_limit_probability=args.rate_limit_probability)
+    from client_pool import ClientPool
+    from rate_limiter import RateLimiter, set_rate_limiter
+    from tracing import Tracer, set_tracer
+
+    cases = []
+    # One connection pool for all cases, as in a long-running service; api_calls.connections
+    # counts the TCP connections the mock server accepted during each case.
+    client_pool = ClientPool(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    with MockGroqServer(config) as server, tempfile.TemporaryDirectory() as workdir:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        os.environ.setdefault("GROQ_API_KEY", "mock")
+        for mode in args.modes.split(","):
+            for pages in [int(p) for p in args.scales.split(",")]:
+                # Fresh budgets per case so one case's pacing doesn't leak into the next.
+                set_rate_limiter(RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm))
+                tracer = Tracer(enabled=bool(args.trace_jsonl), jsonl_path=args.trace_jsonl)
+                set_tracer(tracer)
+                print(f"Running {mode} benchmark at {pages} pages...", file=sys.stderr)
+                case = await run_case(args, server, mode, pages, workdir, client_pool)
+                if tracer.enabled:
+                    case["trace"] = tracer.summary()
+                tracer.close()
+                cases.append(case)
+        await client_pool.aclose()
+
+    return {
+        "revision": git_revision(),
+        "config": {
+            "latency_ms": args.latency_ms,
+            "tokens_per_second": args.tokens_per_second,
+            "rate_limit_probability": args.rate_limit_probability,
+            "rpm": args.rpm,
+            "tpm": args.tpm,
+            "max_concurrency": args.max_concurrency,
+            "max_connections": args.max_connections,
+            "parallel_sections": args.parallel_sections,
+            "section_context_tokens": args.section_context_tokens,
+            "queue_depth": args.queue_depth,
+            "overflow_policy": args.overflow_policy,
+            "repair_threshold": args.repair_threshold,
+            "embeddings": args.embeddings,
+        },
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        "cases": cases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the generation/evaluation pipeline against a mock Groq API.")
+    parser.add_argument("--scales", default="1,5,15,20", help="Comma-separated report sizes in pages.")
+    parser.add_argument("--modes", default="document,pipeline", help="Comma-separated subset of: document, pipeline.")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=100000.0, help="Requests-per-minute budget given to the rate limiter.")
+    parser.add_argument("--tpm", type=float, default=1e9, help="Tokens-per-minute budget given to the rate limiter.")
+    parser.add_argument("--max-concurrency", type=int, default=50)
+    parser.add_argument("--max-connections", type=int, default=100, help="Size of the shared HTTP connection pool.")
+    parser.add_argument("--parallel-sections", type=int, default=1, help="Sections generated concurrently in pipeline mode.")
+    parser.add_argument("--section-context-tokens", type=int, help="Retrieved source budget per generation prompt (default: full source).")
+    parser.add_argument("--queue-depth", type=int, default=200, help="Claims allowed to wait for an evaluator in pipeline mode.")
+    parser.add_argument("--overflow-policy", choices=["block", "vector_tier", "coalesce"], default="block")
+    parser.add_argument("--repair-threshold", type=float, help="Regenerate pipeline sections with at least this fraction of flagged claims.")
+    parser.add_argument("--trace-jsonl", help="Record pipeline spans to this JSON-lines file and add per-case trace summaries.")
+    parser.add_argument("--embeddings", choices=["default", "hashing"], default="default")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Process start-up benchmark: how long a fresh process needs before it can do any work.
+
+Every measurement runs in a new interpreter and is repeated (median reported):
+
+  * `imports`: import time of the entry-point modules and which heavy dependencies
+    (ChromaDB, the Groq SDK, ...) they load eagerly; lazy loading should keep that list empty;
+  * `workers`: time until a batch-audit worker is ready (Orchestrator built, source indexed,
+    one query embedded, Groq client created), started cold with `spawn` or forked from a
+    pre-warmed parent (`batch_audit.py --prewarm`). With the default embeddings the forked
+    worker has to re-open the model it inherited, so this measures the real saving.
+
+With `--max-import-seconds`, the run exits non-zero when an entry point imports slower than
+that or loads a heavy dependency eagerly, so start-up regressions fail CI:
+
+    python benchmarks/startup_benchmark.py --output startup.json
+    python benchmarks/startup_benchmark.py --embeddings hashing --max-import-seconds 0.5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ["orchestrator", "batch_audit", "event_server"]
+HEAVY_MODULES = ["chromadb", "groq", "jsonschema", "onnxruntime", "tokenizers"]
+SOURCE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scenario", "source_knowledge.txt"))
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started,
+                  "eager": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                         cwd=SRC_DIR, text=True)
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {"seconds": round(statistics.median(run["seconds"] for run in runs), 3), "eager": runs[-1]["eager"]}
+
+
+def _worker(embeddings: str, started_at: float, results):
+    """Becomes ready the way a batch-audit worker does and reports how long that took."""
+    from orchestrator import Orchestrator
+    embedding_function = None
+    if embeddings == "hashing":
+        from run_benchmarks import HashingEmbeddingFunction
+        embedding_function = HashingEmbeddingFunction()
+    orchestrator = Orchestrator(source_text_path=SOURCE_FILE, embedding_function=embedding_function)
+    orchestrator.tool_registry.embedding_function(["Is the worker ready?"])
+    orchestrator.evaluator.client
+    results.put(time.time() - started_at)
+
+
+def measure_worker(start_method: str, embeddings: str, repeat: int) -> float:
+    context = multiprocessing.get_context(start_method)
+    results = context.Queue()
+    runs = []
+    for _ in range(repeat):
+        process = context.Process(target=_worker, args=(embeddings, time.time(), results))
+        process.start()
+        runs.append(results.get(timeout=300))
+        process.join()
+    return round(statistics.median(runs), 3)
+
+
+def run(args) -> dict:
+    # The Groq client refuses to be built without a key; no request is ever sent.
+    os.environ.setdefault("GROQ_API_KEY", "startup-benchmark")
+    imports = {}
+    for module in ENTRY_POINTS:
+        print(f"Timing import of {module}...", file=sys.stderr)
+        imports[module] = measure_import(module, args.repeat)
+
+    print("Timing cold (spawn) workers...", file=sys.stderr)
+    workers = {"spawn": measure_worker("spawn", args.embeddings, args.repeat)}
+    if "fork" in multiprocessing.get_all_start_methods():
+        from batch_audit import prewarm
+        from lazy_imports import preload
+        started = time.perf_counter()
+        if args.embeddings == "default":
+            prewarm()
+        else:
+            # Hashing embeddings need no model, so only the dependencies are pre-loaded.
+            preload()
+        workers["prewarm_seconds"] = round(time.perf_counter() - started, 3)
+        print("Timing pre-warmed (fork) workers...", file=sys.stderr)
+        workers["fork"] = measure_worker("fork", args.embeddings, args.repeat)
+
+    return {"config": {"repeat": args.repeat, "embeddings": args.embeddings}, "imports": imports, "workers": workers}
+
+
+def regressions(report: dict, max_import_seconds: float) -> list:
+    problems = []
+    for module, result in report["imports"].items():
+        if result["seconds"] > max_import_seconds:
+            problems.append(f"import {module} took {result['seconds']}s (budget {max_import_seconds}s)")
+        if result["eager"]:
+            problems.append(f"import {module} eagerly loads {', '.join(result['eager'])}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure process start-up: entry-point imports and batch worker readiness.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported.")
+    parser.add_argument("--embeddings", choices=["default", "hashing"], default="default")
+    parser.add_argument("--max-import-seconds", type=float, help="Fail when an entry point imports slower than this or loads a heavy dependency.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.max_import_seconds is not None:
+        problems = regressions(report, args.max_import_seconds)
+        for problem in problems:
+            print(f"Start-up regression: {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Batch audit of many generated drafts against their source corpora.
+
+    python src/batch_audit.py manifest.jsonl --output-dir audit/ --workers 4
+
+The manifest holds one JSON object per line, {"source": ..., "draft": ..., "id": ...};
+relative paths are resolved against the manifest's directory and `id` defaults to the
+draft path. Drafts are grouped by source so each corpus is indexed once per run, and the
+groups are spread over worker processes that pace against one shared rate budget. The
+Orchestrators of a worker share one HTTP connection pool. Every
+worker appends to its own `verdicts-<n>.jsonl`: one "verdict" record per claim followed by
+a "draft_done" record. Re-running the same command skips drafts that already have a
+"draft_done" record, so an interrupted run picks up where it stopped. `report.json`
+aggregates all verdict files at the end.
+
+With `--prewarm`, the dependencies and Chroma's default embedding model are loaded once in
+the parent process and the workers are forked from it instead of starting cold.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+from client_pool import ClientPool
+from lazy_imports import preload
+from orchestrator import Orchestrator
+from rate_limiter import RateLimiter, set_rate_limiter
+from tool_registry import get_default_embedding_function
+from verifiers import NLIVerifier
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest(path: str) -> List[Dict[str, str]]:
+    base = os.path.dirname(os.path.abspath(path))
+    entries, seen = [], set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                source, draft = entry["source"], entry["draft"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: expected {{\"source\": ..., \"draft\": ...}} ({e})")
+            draft_id = str(entry.get("id") or draft)
+            if draft_id in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate draft id {draft_id!r}")
+            seen.add(draft_id)
+            entries.append({
+                "id": draft_id,
+                "source": os.path.normpath(os.path.join(base, source)),
+                "draft": os.path.normpath(os.path.join(base, draft)),
+            })
+    return entries
+
+
+def completed_drafts(output_dir: str) -> Set[str]:
+    """Ids of drafts whose verdicts were fully written by an earlier run."""
+    done = set()
+    for record in _read_records(output_dir):
+        if record.get("type") == "draft_done":
+            done.add(record["draft_id"])
+    return done
+
+
+def plan_shards(entries: List[Dict[str, str]], workers: int) -> List[List[Dict[str, str]]]:
+    """
+    Splits entries into at most `workers` shards without splitting a source across shards,
+    so every corpus is indexed by one process only. Largest groups (by draft bytes) are
+    placed first, each on the currently lightest shard.
+    """
+    groups: Dict[str, List[Dict[str, str]]] = {}
+    for entry in entries:
+        groups.setdefault(entry["source"], []).append(entry)
+
+    def weight(group):
+        return sum(os.path.getsize(e["draft"]) if os.path.exists(e["draft"]) else 0 for e in group) + 1
+
+    shards: List[List[Dict[str, str]]] = [[] for _ in range(max(1, min(workers, len(groups))))]
+    loads = [0] * len(shards)
+    for group in sorted(groups.values(), key=weight, reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].extend(group)
+        loads[lightest] += weight(group)
+    return [shard for shard in shards if shard]
+
+
+async def audit_shard(shard: List[Dict[str, str]], verdicts_path: str, options: Dict) -> Dict:
+    """Evaluates one shard's drafts, reusing one Orchestrator (and its index) per source."""
+    stats = {"drafts": 0, "claims": 0, "failed": 0}
+    orchestrators: Dict[str, Orchestrator] = {}
+    # Loaded once per process and shared by every corpus in the shard.
+    verifier = NLIVerifier.from_pretrained(options["nli_model_dir"]) if options.get("nli_model_dir") else None
+    client_pool = ClientPool.from_env()
+    try:
+        with open(verdicts_path, "a", encoding="utf-8") as out:
+            for entry in shard:
+                started = time.perf_counter()
+                try:
+                    orchestrator = orchestrators.get(entry["source"])
+                    if orchestrator is None:
+                        # One index directory per corpus: a source is only ever handled by one process at a time.
+                        index_path = options.get("index_path")
+                        if index_path:
+                            index_path = os.path.join(index_path, Orchestrator._collection_name(entry["source"]))
+                        orchestrator = orchestrators[entry["source"]] = Orchestrator(
+                            source_text_path=entry["source"], model=options["model"], cache_path=options.get("cache_path"),
+                            index_path=index_path, max_concurrency=options["max_concurrency"],
+                            tiered=options["tiered"], eager_retrieval=options["eager_retrieval"], verifier=verifier,
+                            client_pool=client_pool)
+                    results = await orchestrator.evaluate_document(entry["draft"], batched=options["batched"])
+                except Exception as e:
+                    logger.error(f"Audit of {entry['id']} failed: {e}")
+                    stats["failed"] += 1
+                    continue
+
+                # A draft's records are written together and only count once "draft_done" is on disk.
+                lines = [json.dumps({"type": "verdict", "draft_id": entry["id"], "source": entry["source"], "index": i, **result})
+                         for i, result in enumerate(results)]
+                flagged = sum(1 for r in results if r["verdict"].get("requires_revision", True))
+                lines.append(json.dumps({
+                    "type": "draft_done", "draft_id": entry["id"], "source": entry["source"], "draft": entry["draft"],
+                    "claims": len(results), "flagged": flagged, "seconds": round(time.perf_counter() - started, 3),
+                }))
+                out.write("\n".join(lines) + "\n")
+                out.flush()
+                stats["drafts"] += 1
+                stats["claims"] += len(results)
+                logger.info(f"Audited {entry['id']}: {flagged}/{len(results)} claims flagged")
+    finally:
+        for orchestrator in orchestrators.values():
+            await orchestrator.aclose()
+        await client_pool.aclose()
+        if verifier is not None:
+            verifier.close()
+    return stats
+
+
+def prewarm():
+    """
+    Imports the lazily loaded dependencies (ChromaDB, the Groq SDK, jsonschema) and makes
+    sure Chroma's default embedding model is downloaded, so workers forked afterwards share
+    the imports and only re-open the model files (the inference session cannot be forked).
+    """
+    started = time.perf_counter()
+    preload()
+    get_default_embedding_function()(["warm-up"])
+    logger.info(f"Pre-warmed dependencies and embedding model in {time.perf_counter() - started:.2f}s")
+
+
+def _run_shard(shard: List[Dict[str, str]], verdicts_path: str, options: Dict, rate_state) -> Dict:
+    """Worker-process entry point."""
+    logging.basicConfig(level=options.get("log_level", logging.INFO), format="[%(processName)s] %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    set_rate_limiter(RateLimiter(shared_state=rate_state))
+    return asyncio.run(audit_shard(shard, verdicts_path, options))
+
+
+def run_audit(manifest_path: str, output_dir: str, workers: int = 1, options: Optional[Dict] = None,
+              requests_per_minute: float = 30, tokens_per_minute: float = 12000) -> Dict:
+    """Runs (or resumes) an audit and returns the aggregate report, also written to `report.json`."""
+    options = {"model": "llama-3.3-70b-versatile", "max_concurrency": 50, "batched": False,
+               "tiered": False, "eager_retrieval": False, **(options or {})}
+    os.makedirs(output_dir, exist_ok=True)
+    entries = load_manifest(manifest_path)
+    done = completed_drafts(output_dir)
+    pending = [entry for entry in entries if entry["id"] not in done]
+    logger.info(f"{len(entries)} drafts in manifest, {len(done & {e['id'] for e in entries})} already audited, {len(pending)} to go")
+
+    shards = plan_shards(pending, workers)
+    existing = len(glob.glob(os.path.join(output_dir, "verdicts-*.jsonl")))
+    # New files per run, so a resumed run never appends to a file another run may still hold.
+    paths = [os.path.join(output_dir, f"verdicts-{existing + n:03d}.jsonl") for n in range(len(shards))]
+    start_method = "spawn"
+    if shards and options.get("prewarm"):
+        prewarm()
+        if "fork" in multiprocessing.get_all_start_methods():
+            start_method = "fork"
+        else:
+            logger.warning("fork is not available on this platform; workers start cold")
+    if len(shards) == 1:
+        rate_state = RateLimiter.shared_state(requests_per_minute, tokens_per_minute, context=None)
+        _run_shard(shards[0], paths[0], options, rate_state)
+    elif shards:
+        context = multiprocessing.get_context(start_method)
+        rate_state = RateLimiter.shared_state(requests_per_minute, tokens_per_minute, context=context)
+        # Shared-memory budgets can only be handed to processes at start, so no Pool here.
+        processes = [context.Process(target=_run_shard, args=(shard, path, options, rate_state), name=f"shard-{n}")
+                     for n, (shard, path) in enumerate(zip(shards, paths))]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            if process.exitcode != 0:
+                logger.error(f"{process.name} exited with code {process.exitcode}; re-run to resume its drafts")
+
+    report = aggregate(output_dir, entries)
+    with open(os.path.join(output_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def _read_records(output_dir: str):
+    for path in sorted(glob.glob(os.path.join(output_dir, "verdicts-*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+
+
+def aggregate(output_dir: str, entries: List[Dict[str, str]]) -> Dict:
+    """Totals per run, per source and per draft, counting only fully written drafts."""
+    done: Dict[str, Dict] = {}
+    verdicts: Dict[tuple, Dict] = {}
+    for record in _read_records(output_dir):
+        if record.get("type") == "draft_done":
+            done[record["draft_id"]] = record
+        elif record.get("type") == "verdict":
+            verdicts[(record["draft_id"], record["index"])] = record
+
+    manifest_ids = {entry["id"] for entry in entries}
+    drafts, sources, tiers = [], {}, {}
+    for draft_id, record in done.items():
+        if draft_id not in manifest_ids:
+            continue
+        drafts.append({
+            "id": draft_id, "source": record["source"], "claims": record["claims"], "flagged": record["flagged"],
+            "flagged_rate": round(record["flagged"] / record["claims"], 3) if record["claims"] else 0.0,
+        })
+        source = sources.setdefault(record["source"], {"drafts": 0, "claims": 0, "flagged": 0})
+        source["drafts"] += 1
+        source["claims"] += record["claims"]
+        source["flagged"] += record["flagged"]
+        for index in range(record["claims"]):
+            tier = verdicts.get((draft_id, index), {}).get("tier", "unknown")
+            tiers[tier] = tiers.get(tier, 0) + 1
+
+    claims = sum(d["claims"] for d in drafts)
+    flagged = sum(d["flagged"] for d in drafts)
+    return {
+        "drafts": {"total": len(entries), "audited": len(drafts), "missing": sorted(manifest_ids - set(done))},
+        "claims": claims,
+        "flagged": flagged,
+        "flagged_rate": round(flagged / claims, 3) if claims else 0.0,
+        "tiers": tiers,
+        "sources": sources,
+        "worst_drafts": sorted(drafts, key=lambda d: (d["flagged_rate"], d["flagged"]), reverse=True)[:20],
+    }
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Audit many (source, draft) pairs listed in a JSON-lines manifest.")
+    parser.add_argument("manifest")
+    parser.add_argument("--output-dir", required=True, help="Verdict files and report.json go here; re-use it to resume.")
+    parser.add_argument("--workers", type=int, default=max(1, min(4, os.cpu_count() or 1)))
+    parser.add_argument("--model", default="llama-3.3-70b-versatile")
+    parser.add_argument("--rpm", type=float, default=float(os.environ.get("GROQ_RPM_LIMIT", 30)), help="Requests per minute shared by all workers.")
+    parser.add_argument("--tpm", type=float, default=float(os.environ.get("GROQ_TPM_LIMIT", 12000)), help="Tokens per minute shared by all workers.")
+    parser.add_argument("--cache-path", help="SQLite verdict cache shared by the workers.")
+    parser.add_argument("--index-path", help="Directory for persisted source embeddings.")
+    parser.add_argument("--max-concurrency", type=int, default=50)
+    parser.add_argument("--batched", action="store_true", help="Pack several claims into each evaluator call.")
+    parser.add_argument("--tiered", action="store_true", help="Settle clear-cut claims by vector distance first.")
+    parser.add_argument("--eager-retrieval", action="store_true")
+    parser.add_argument("--nli-model-dir", help="ONNX NLI model directory; confident claims are settled locally, the rest go to the LLM.")
+    parser.add_argument("--prewarm", action="store_true", help="Load dependencies and the embedding model once, then fork the workers from this process.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    options = {"model": args.model, "cache_path": args.cache_path, "index_path": args.index_path,
+               "max_concurrency": args.max_concurrency, "batched": args.batched, "tiered": args.tiered,
+               "eager_retrieval": args.eager_retrieval, "nli_model_dir": args.nli_model_dir, "prewarm": args.prewarm}
+    report = run_audit(args.manifest, args.output_dir, workers=args.workers, options=options,
+                       requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    print(json.dumps({k: v for k, v in report.items() if k != "worst_drafts"}, indent=2))
+
+if __name__ == "__main__":
+    main()
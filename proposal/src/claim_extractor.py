@@ -0,0 +1,170 @@
+import hashlib
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sentence_segmenter import CLOSERS, KIND_HEADER, KIND_TABLE_ROW, Segment, StreamingSentenceSegmenter
+from tracing import get_tracer
+
+# Sentences that only steer the reader ("In this section we explore...") and state no fact.
+META_SENTENCE = re.compile(
+    r"^(?:(?:in|throughout) (?:this|the following|the next|the previous) (?:section|report|chapter|part)"
+    r"|this (?:section|report|chapter) (?:will )?(?:covers?|describes?|explores?|discusses?|examines?|outlines?|presents?|looks? at)"
+    r"|in (?:conclusion|summary|short)|to (?:summarize|summarise|conclude|sum up)|overall,|let(?:'s| us) "
+    r"|the following|below (?:is|are) |next, we|we (?:will|now) )",
+    re.IGNORECASE,
+)
+# Coordinated clauses that can be judged on their own: "X grows in Y; Z is exported" or
+# "X grows in Y, while Z is exported". A clause opening with a pronoun needs its
+# neighbour and is left attached.
+CLAUSE_BREAK = re.compile(r";\s+|,\s+(?:and|but|while|whereas)\s+", re.IGNORECASE)
+DEPENDENT_OPENER = re.compile(r"^(?:it|its|they|them|their|this|that|these|those|which|who|he|she|his|her|there)\b", re.IGNORECASE)
+MARKUP = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+|[*_`#|>]+")
+NUMBER = re.compile(r"\d+(?:[.,]\d+)*%?")
+WORD = re.compile(r"[a-z0-9]+(?:[.,'][a-z0-9]+)*%?")
+# Words whose presence never changes what a claim asserts. Negations, prepositions and
+# qualifiers are deliberately absent: "from"/"to" or "short"/"long" must keep claims apart.
+FILLER_WORDS = frozenset({"a", "an", "the", "also", "very", "really", "just", "actually", "indeed"})
+
+
+class Claim(NamedTuple):
+    text: str
+    start: int  # offset of the first character in the draft
+    end: int  # offset one past the last character in the draft
+    kind: str
+    completed_at: float
+
+
+class ClaimExtractor:
+    """
+    Turns segmenter output into atomic factual claims.
+
+    Headers, questions, lead-ins ending in ':' and meta sentences about the report itself
+    are skipped unless they carry a number. Short declaratives ("Palmer is fiberless.") are
+    kept; only unterminated fragments with fewer than `min_words` words and no number are
+    skipped. Compound sentences are split at ';' and at ', and/but/while'
+    when both sides stand on their own. Every claim keeps its character span in the draft.
+    """
+
+    def __init__(self, min_words: int = 4, split_compound: bool = True):
+        self.min_words = min_words
+        self.split_compound = split_compound
+        self.skipped = 0
+
+    def extract(self, text: str) -> List[Claim]:
+        segmenter = StreamingSentenceSegmenter()
+        segments = segmenter.feed(text) + segmenter.flush()
+        return [claim for segment in segments for claim in self.claims(segment)]
+
+    def claims(self, segment: Segment) -> List[Claim]:
+        claims = [Claim(text, segment.start + start, segment.start + end, segment.kind, segment.completed_at)
+                  for text, start, end in self._clauses(segment)]
+        factual = [claim for claim in claims if segment.kind != KIND_HEADER and self.is_factual(claim.text, claim.kind)]
+        self.skipped += len(claims) - len(factual)
+        get_tracer().count("claims", len(claims) - len(factual), outcome="skipped")
+        return factual
+
+    def is_factual(self, text: str, kind: str = "sentence") -> bool:
+        plain = MARKUP.sub(" ", text).strip()
+        if NUMBER.search(plain):
+            return True
+        if kind == KIND_TABLE_ROW or plain.endswith(("?", ":")) or META_SENTENCE.match(plain):
+            return False
+        words = len(WORD.findall(plain.lower()))
+        if plain.rstrip(CLOSERS).endswith((".", "!")) and words >= 2:
+            return True
+        return words >= self.min_words
+
+    def _clauses(self, segment: Segment) -> List[Tuple[str, int, int]]:
+        """(text, start, end) of each independent clause, offsets relative to the segment."""
+        text = segment.text
+        if not self.split_compound or segment.kind in (KIND_HEADER, KIND_TABLE_ROW):
+            return [(text, 0, len(text))]
+        pieces, start = [], 0
+        for match in CLAUSE_BREAK.finditer(text):
+            left, right = text[start:match.start()], text[match.end():]
+            if (len(WORD.findall(left.lower())) < self.min_words or len(WORD.findall(right.lower())) < self.min_words
+                    or DEPENDENT_OPENER.match(right)):
+                continue
+            pieces.append((start, match.start()))
+            start = match.end()
+        pieces.append((start, len(text)))
+        clauses = []
+        for piece_start, piece_end in pieces:
+            piece = text[piece_start:piece_end]
+            stripped = piece.strip()
+            offset = piece_start + len(piece) - len(piece.lstrip())
+            clauses.append((stripped, offset, offset + len(stripped)))
+        return clauses
+
+
+def normalize_claim(text: str) -> str:
+    """Lower-cased words and numbers only, so markup and punctuation don't defeat exact matching."""
+    return " ".join(WORD.findall(MARKUP.sub(" ", text).lower()))
+
+
+class ClaimDeduplicator:
+    """
+    Recognises claims that were already submitted, exactly (same normalized text) or nearly
+    (same content words in the same order, i.e. differing only in markup, punctuation or
+    filler words). Any other change, such as "80%" to "8%" or "a short shelf life" to "a long
+    shelf life", makes a different claim: a similarity threshold can't tell those apart from
+    harmless rewording, so none is used.
+    """
+
+    def __init__(self):
+        self._exact: Dict[bytes, int] = {}
+        self._content: Dict[bytes, int] = {}
+        self._count = 0
+        self.stats = {"unique": 0, "exact": 0, "near": 0}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, text: str) -> Optional[int]:
+        """
+        Returns the index of the earlier claim `text` duplicates, or None when it is new;
+        new claims are numbered 0, 1, 2... in the order they were added.
+        """
+        normalized = normalize_claim(text)
+        key = _digest(normalized)
+        if key in self._exact:
+            return self._duplicate("exact", self._exact[key])
+
+        content_key = _digest(" ".join(word for word in normalized.split() if word not in FILLER_WORDS))
+        if content_key in self._content:
+            index = self._exact[key] = self._content[content_key]
+            return self._duplicate("near", index)
+
+        index = self._count
+        self._count += 1
+        self._exact[key] = self._content[content_key] = index
+        self.stats["unique"] += 1
+        get_tracer().count("claims", outcome="unique")
+        return None
+
+    def _duplicate(self, kind: str, index: int) -> int:
+        self.stats[kind] += 1
+        get_tracer().count("claims", outcome=f"{kind}_duplicate")
+        return index
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def deduplicate(claims: Sequence[Claim]) -> Tuple[List[Claim], List[int]]:
+    """
+    Returns the claims worth evaluating and, for every input claim, the index of the
+    evaluated claim whose verdict it shares.
+    """
+    deduplicator = ClaimDeduplicator()
+    unique: List[Claim] = []
+    owners: List[int] = []
+    for claim in claims:
+        duplicate = deduplicator.add(claim.text)
+        if duplicate is None:
+            unique.append(claim)
+            owners.append(len(unique) - 1)
+        else:
+            owners.append(duplicate)
+    return unique, owners
@@ -0,0 +1,142 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Dict, Optional
+
+import httpx
+
+from lazy_imports import LazyImport
+from rate_limiter import RateLimiter, get_rate_limiter
+
+DefaultAsyncHttpxClient = LazyImport("groq", "DefaultAsyncHttpxClient")
+
+
+class _LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    One httpx connection pool per event loop. Keep-alive connections belong to the loop
+    that opened them, so a client shared by scripts and tests that call `asyncio.run`
+    repeatedly must not hand a connection from a finished loop to a new one.
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool):
+        self.limits = limits
+        self.http2 = http2
+        self.requests = 0
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return await self._transport().handle_async_request(request)
+
+    def connection_counts(self) -> Dict[str, int]:
+        with self._lock:
+            transports = list(self._transports.values())
+        connections = [c for t in transports for c in t._pool.connections]
+        return {"event_loops": len(transports), "connections": len(connections),
+                "idle": sum(1 for c in connections if c.is_idle())}
+
+    async def aclose(self):
+        # Pools of other (usually finished) loops can't be closed from here; they are dropped.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+            self._transports.clear()
+        if transport is not None:
+            await transport.aclose()
+
+
+class ClientPool:
+    """
+    HTTP connection pool shared by every Groq client that is handed this pool (generator,
+    evaluator, and every Orchestrator of a batch job), so they reuse the same keep-alive
+    connections instead of each opening and handshaking their own.
+
+    `max_connections` caps open connections, `max_keepalive_connections` how many idle ones
+    are kept for reuse, for up to `keepalive_expiry` seconds. HTTP/2 is used when the
+    optional `h2` package is installed, unless `http2` says otherwise. Response headers are
+    fed to `rate_limiter` (the process-wide limiter when None). Close the pool with
+    `aclose()` or `async with` once no client needs it any more.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0,
+                 http2: Optional[bool] = None, rate_limiter: Optional[RateLimiter] = None):
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+        self.http2 = http2
+        self.rate_limiter = rate_limiter
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self._transport = _LoopLocalTransport(self.limits, http2)
+        self._http_client = None
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "ClientPool":
+        """
+        Pool sized from GROQ_MAX_CONNECTIONS / GROQ_MAX_KEEPALIVE (defaults 100 / 20);
+        GROQ_HTTP2=0 or 1 overrides HTTP/2 detection.
+        """
+        http2 = os.environ.get("GROQ_HTTP2")
+        kwargs.setdefault("max_connections", int(os.environ.get("GROQ_MAX_CONNECTIONS", 100)))
+        kwargs.setdefault("max_keepalive_connections", int(os.environ.get("GROQ_MAX_KEEPALIVE", 20)))
+        kwargs.setdefault("http2", None if http2 is None else http2 not in ("0", "false", "no"))
+        return cls(**kwargs)
+
+    async def _observe_response(self, response: httpx.Response):
+        """httpx response hook, so headers of every successful call feed the budgets too."""
+        # Resolved per response: batch workers install their limiter after the pool exists.
+        (self.rate_limiter or get_rate_limiter()).observe_headers(response.headers)
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The shared httpx client, created on first use."""
+        if self._http_client is None:
+            if self._closed:
+                raise RuntimeError("ClientPool is closed")
+            self._http_client = DefaultAsyncHttpxClient(transport=self._transport, limits=self.limits,
+                                                        event_hooks={"response": [self._observe_response]})
+        return self._http_client
+
+    @property
+    def closed(self) -> bool:
+        return self._closed or (self._http_client is not None and self._http_client.is_closed)
+
+    def stats(self) -> Dict:
+        return {"requests": self._transport.requests, "http2": self.http2, **self._transport.connection_counts()}
+
+    async def aclose(self):
+        if not self.closed and self._http_client is not None:
+            await self._http_client.aclose()
+        self._closed = True
+
+    async def __aenter__(self) -> "ClientPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+_client_pool: Optional[ClientPool] = None
+
+def get_client_pool() -> ClientPool:
+    """Returns the process-wide pool (see `ClientPool.from_env`), used by clients built without one."""
+    global _client_pool
+    if _client_pool is None or _client_pool.closed:
+        _client_pool = ClientPool.from_env()
+    return _client_pool
+
+def set_client_pool(pool: Optional[ClientPool]):
+    """Replaces the process-wide pool."""
+    global _client_pool
+    _client_pool = pool
@@ -1,112 +1,425 @@
 import os
-import json
 import logging
 import asyncio
-import re
-from groq import AsyncGroq
+import hashlib
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from client_pool import ClientPool, get_client_pool
+from lazy_imports import LazyImport
+from plan_cache import PlanCache
+from rate_limiter import PRIORITY_GENERATOR, RateLimiter, estimate_message_tokens, estimate_tokens, get_rate_limiter
+from tool_registry import SENTENCE_BOUNDARY, ToolRegistry
+from tracing import get_tracer
+from structured_output import OUTLINE_SCHEMA, StructuredOutputError, parse_with_repair
+
+AsyncGroq = LazyImport("groq", "AsyncGroq")
 
 logger = logging.getLogger(__name__)
 
 class DocumentGenerator:
-    def __init__(self, model: str = "llama-3.3-70b-versatile", num_sections: int = 5):
+    def __init__(self, model: str = "llama-3.3-70b-versatile", num_sections: int = 5, rate_limiter: Optional[RateLimiter] = None,
+                 parallel_sections: int = 1, tool_registry: Optional[ToolRegistry] = None,
+                 section_context_tokens: Optional[int] = None, outline_context_tokens: Optional[int] = None,
+                 client_pool: Optional[ClientPool] = None, plan_cache: Optional[PlanCache] = None,
+                 digest_tokens: int = 80):
+        """
+        With a `tool_registry` and `section_context_tokens`, each section prompt only carries
+        the source chunks retrieved for that section (up to the token budget) instead of the
+        whole corpus. `outline_context_tokens` likewise caps the outline prompt, which then
+        sees a digest made of the first sentence of every chunk.
+        `client_pool` (see client_pool.py) defaults to the process-wide connection pool, or to a
+        private one feeding `rate_limiter` when that is given; close that one with `aclose()`.
+        With a `plan_cache`, plans (outline, section summaries and a source digest of up to
+        `digest_tokens` per section) are reused for the same corpus and normalized prompt,
+        and sections get the plan as cross-section context instead of the previous text.
+        """
         self.model = model
         self.num_sections = num_sections
-        self.client = AsyncGroq()
+        self.parallel_sections = parallel_sections
+        self.tool_registry = tool_registry
+        self.section_context_tokens = section_context_tokens
+        self.outline_context_tokens = outline_context_tokens
+        self.prompt_token_savings = {"calls": 0, "full_source_tokens": 0, "sent_source_tokens": 0}
+        self.output_stats = {"valid": 0, "repaired": 0, "failed": 0}
+        self.plan_cache = plan_cache
+        self.digest_tokens = digest_tokens
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Shares keep-alive connections with every other client on the same pool. A private
+        # limiter needs a private pool (response headers feed the pool's limiter), closed by aclose().
+        self._owns_client_pool = client_pool is None and rate_limiter is not None
+        self.client_pool = client_pool or (ClientPool(rate_limiter=rate_limiter) if rate_limiter else get_client_pool())
+        self._client = None
         
         self.system_prompt = """You are an AI assistant tasked with generating a comprehensive, 5 to 20-page report based STRICTLY on the provided source knowledge.
         
 Your report should be well-structured, professional, extremely detailed, and very long. 
 Do not include any external information. If the source knowledge does not contain the answer, do not make it up."""
 
+    @property
+    def client(self):
+        """The Groq client, created (and the SDK imported) on the first call."""
+        if self._client is None:
+            # Retries belong to the rate limiter, which also honours retry-after and syncs the budgets.
+            self._client = AsyncGroq(http_client=self.client_pool.http_client, max_retries=0)
+        return self._client
+
+    async def aclose(self):
+        """Closes the connection pool if this generator created its own (`rate_limiter` without `client_pool`)."""
+        if self._owns_client_pool:
+            await self.client_pool.aclose()
+
+    async def __aenter__(self) -> "DocumentGenerator":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
     async def generate_outline(self, source_text: str, user_prompt: str) -> list[str]:
+        sections = await self._request_outline(source_text, user_prompt, with_summaries=False)
+        return [section["title"] for section in sections]
+
+    async def generate_outline_with_summaries(self, source_text: str, user_prompt: str) -> List[Dict[str, str]]:
+        """Outline where every section carries a one-sentence summary, used as shared context by parallel generation."""
+        return await self._request_outline(source_text, user_prompt, with_summaries=True)
+
+    async def _request_outline(self, source_text: str, user_prompt: str, with_summaries: bool,
+                               fallback: bool = True) -> List[Dict[str, str]]:
         # Force topic to be about Brazilian Mangos for the prototype.
         forced_prompt = f"Original request: '{user_prompt}'. OVERRIDE: Write a comprehensive document strictly about Brazilian Mangos. Ensure the outline has exactly {self.num_sections} detailed sections to reach the length requirement."
         
         system = f"You are an AI assistant orchestrating a highly detailed long-form document. The outline must contain exactly {self.num_sections} sections to ensure the final document is well structured."
-        user = f"Based on the following source knowledge and request, generate a detailed outline (section titles only) as a JSON array of strings.\n\nSource: {source_text}\n\nUser Request: {forced_prompt}\n\nJSON array format: [\"Section 1\", \"Section 2\"]"
+        source_text = self._outline_source(source_text)
+        if with_summaries:
+            user = f"Based on the following source knowledge and request, generate a detailed outline as a JSON object whose \"sections\" key holds a JSON array of objects with a \"title\" and a one-sentence \"summary\" of what that section covers.\n\nSource: {source_text}\n\nUser Request: {forced_prompt}\n\nJSON format: {{\"sections\": [{{\"title\": \"Section 1\", \"summary\": \"...\"}}]}}"
+        else:
+            user = f"Based on the following source knowledge and request, generate a detailed outline (section titles only) as a JSON array of strings.\n\nSource: {source_text}\n\nUser Request: {forced_prompt}\n\nJSON array format: [\"Section 1\", \"Section 2\"]"
         
         logger.info("Generating document outline...")
-        max_retries = 5
-        base_delay = 2
-        for attempt in range(max_retries):
-            try:
-                response = await self.client.chat.completions.create(
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+        expected_output_tokens = 300 + (60 * self.num_sections if with_summaries else 0)
+
+        async def request(messages: list) -> str:
+            response = await self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
                     model=self.model,
-                    messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+                    messages=messages,
                     response_format={ "type": "json_object" }
-                )
-                content = response.choices[0].message.content or "[]"
-                # Extract JSON array robustly
-                start = content.find('[')
-                end = content.rfind(']')
-                if start != -1 and end != -1:
-                    return json.loads(content[start:end+1])
-                return []
-            except Exception as e:
-                error_str = str(e).lower()
-                if "429" in error_str or "rate limit" in error_str:
-                    if attempt < max_retries - 1:
-                        match = re.search(r'try again in ([0-9.]+)s', error_str)
-                        delay = float(match.group(1)) + 1.0 if match else base_delay * (2 ** attempt)
-                        logger.warning(f"Rate limit reached. Retrying outline gen in {delay:.2f}s (Attempt {attempt + 1}/{max_retries})...")
-                        await asyncio.sleep(delay)
-                        continue
-                logger.error(f"Outline Generator Error: {e}")
-                return ["Introduction", "Main Body", "Conclusion"]
-        return ["Introduction", "Main Body", "Conclusion"]
-
-    async def generate_report_stream(self, source_text: str, user_prompt: str):
+                ),
+                priority=PRIORITY_GENERATOR,
+                estimated_tokens=estimate_message_tokens(messages, expected_output_tokens=expected_output_tokens),
+                description="outline generation"
+            )
+            return response.choices[0].message.content or "{}"
+
+        async def retry(previous: str, prompt: str) -> str:
+            return await request(messages + [{"role": "assistant", "content": previous}, {"role": "user", "content": prompt}])
+
+        try:
+            with get_tracer().span("generator.outline", sections=self.num_sections, summaries=with_summaries):
+                items = await parse_with_repair(OUTLINE_SCHEMA, await request(messages), retry, stats=self.output_stats)
+            return self._normalize_outline(items)
+        except Exception as e:
+            if not fallback:
+                raise
+            label = "Malformed outline" if isinstance(e, StructuredOutputError) else "Outline Generator Error"
+            logger.error(f"{label}: {e}; falling back to a 3-section outline")
+            return self._normalize_outline(["Introduction", "Main Body", "Conclusion"])
+
+    @staticmethod
+    def _normalize_outline(items: list) -> List[Dict[str, str]]:
+        """Accepts plain titles or {title, summary} objects."""
+        sections = []
+        for item in items:
+            if isinstance(item, dict) and item.get("title"):
+                sections.append({"title": str(item["title"]), "summary": str(item.get("summary", ""))})
+            elif isinstance(item, str) and item.strip():
+                sections.append({"title": item, "summary": ""})
+        return sections
+
+    def _record_savings(self, label: str, full_text: str, sent_text: str):
+        full_tokens, sent_tokens = estimate_tokens(full_text), estimate_tokens(sent_text)
+        self.prompt_token_savings["calls"] += 1
+        self.prompt_token_savings["full_source_tokens"] += full_tokens
+        self.prompt_token_savings["sent_source_tokens"] += sent_tokens
+        saved = 100.0 * (1 - sent_tokens / full_tokens) if full_tokens else 0.0
+        logger.info(f"{label}: sent {sent_tokens} source tokens instead of {full_tokens} ({saved:.0f}% saved)")
+
+    def _outline_source(self, source_text: str) -> str:
+        """
+        Full source, or a first-sentence-per-chunk digest when an outline budget is set. When
+        not every chunk fits, chunks are sampled at an even stride across the whole source, so
+        topics near its end reach the outline too.
+        """
+        if self.tool_registry is None or self.outline_context_tokens is None:
+            return source_text
+        leads = [SENTENCE_BOUNDARY.split(chunk.strip(), maxsplit=1)[0] for chunk in self.tool_registry.documents]
+        costs = [estimate_tokens(lead) for lead in leads]
+        step = max(1.0, sum(costs) / max(self.outline_context_tokens, 1))
+        digest, used, position = [], 0, 0.0
+        while position < len(leads):
+            index = int(position)
+            if used + costs[index] <= self.outline_context_tokens:
+                digest.append(f"- {leads[index]}")
+                used += costs[index]
+            position += step
+        scoped = "\n".join(digest)
+        self._record_savings("Outline prompt", source_text, scoped)
+        return scoped
+
+    async def _section_source(self, source_text: str, section: str, summary: str = "") -> str:
+        """Top-ranked source chunks for one section, packed under `section_context_tokens`."""
+        if self.tool_registry is None or self.section_context_tokens is None:
+            return source_text
+        query = f"{section}. {summary}".strip()
+        ranked = await self.tool_registry.asearch_documents(query, n_results=max(4, self.section_context_tokens // 100))
+        selected, used = [], 0
+        for chunk in ranked:
+            cost = estimate_tokens(chunk)
+            if used + cost > self.section_context_tokens:
+                continue
+            selected.append(chunk)
+            used += cost
+        scoped = "\n\n".join(selected)
+        self._record_savings(f"Section '{section}'", source_text, scoped)
+        return scoped
+
+    def _section_messages(self, source_text: str, user_prompt: str, section: str, continuity: str) -> list:
+        section_prompt = f"Source Knowledge:\n{source_text}\n\nUser Request: {user_prompt}\n\nTask: Generate the content for the section titled '{section}'. Write at least 4-5 long, comprehensive paragraphs for this section to ensure the final document reaches the 5-20 pages length requirement. Provide deep, specific details from the source knowledge.\n\n{continuity}\n\nReturn ONLY the detailed content for this section, formatted in Markdown."
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": section_prompt}
+        ]
+
+    async def _stream_section(self, section: str, messages: list, raise_errors: bool = False):
+        """
+        Streams one section's body text. Errors are reported inline instead of aborting the
+        report, unless `raise_errors` is set (the section then never counts as complete).
+        """
+        tracer = get_tracer()
+        started = time.perf_counter()
+        first_token_at, output_chunks = None, 0
+        try:
+            # Streaming calls are the user-facing path, so they are scheduled ahead of evaluator calls.
+            response = await self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=True
+                ),
+                priority=PRIORITY_GENERATOR,
+                estimated_tokens=estimate_message_tokens(messages, expected_output_tokens=2000),
+                description=f"section '{section}'"
+            )
+            
+            async for chunk in response:
+                text = chunk.choices[0].delta.content if chunk.choices and chunk.choices[0].delta.content else ""
+                if tracer.enabled:
+                    # Groq reports usage on the final chunk of a stream.
+                    tracer.record_usage("generator", getattr(getattr(chunk, "x_groq", None), "usage", None))
+                if text:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        tracer.record("generator.section_ttft", first_token_at - started, section=section)
+                    output_chunks += 1
+                    yield text
+                
+        except Exception as e:
+            logger.error(f"Generator Error for section {section}: {e}")
+            if raise_errors:
+                raise
+            yield f"\n[Error generating section {section}]\n"
+        finally:
+            if tracer.enabled:
+                elapsed = time.perf_counter() - started
+                streaming = time.perf_counter() - first_token_at if first_token_at else 0.0
+                # Content deltas arrive roughly one token at a time.
+                tracer.record("generator.section", elapsed, section=section, output_chunks=output_chunks,
+                              tokens_per_second=round(output_chunks / streaming, 1) if streaming else None)
+
+    async def repair_section(self, source_text: str, user_prompt: str, section: Dict[str, str], body: str,
+                             failing: List[Tuple[str, str]]) -> str:
+        """
+        Rewrites one section's `body` so that the `failing` (claim, evidence) pairs are corrected
+        or dropped, keeping the supported content. Returns the new body; errors propagate so the
+        caller can keep the original.
+        """
+        section_source = await self._section_source(source_text, section["title"], section.get("summary", ""))
+        corrections = "\n".join(f"{n}. {claim}\n   Evidence: {evidence or 'none found in the source'}"
+                                for n, (claim, evidence) in enumerate(failing, start=1))
+        prompt = (f"Source Knowledge:\n{section_source}\n\nUser Request: {user_prompt}\n\n"
+                  f"Task: The draft of the section titled '{section['title']}' below contains claims that are not supported by the source knowledge. "
+                  f"Rewrite the section so that every statement is supported by the source knowledge. Correct or remove each listed claim using its evidence, "
+                  f"and keep the supported content, structure and length.\n\nDraft section:\n{body}\n\nUnsupported claims:\n{corrections}\n\n"
+                  f"Return ONLY the corrected content for this section, formatted in Markdown.")
+        messages = [{"role": "system", "content": self.system_prompt}, {"role": "user", "content": prompt}]
+        with get_tracer().span("generator.repair", section=section["title"], claims=len(failing)):
+            response = await self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(model=self.model, messages=messages),
+                priority=PRIORITY_GENERATOR,
+                estimated_tokens=estimate_message_tokens(messages, expected_output_tokens=estimate_tokens(body)),
+                description=f"repair of section '{section['title']}'"
+            )
+        return (response.choices[0].message.content or "").strip()
+
+    async def plan_outline(self, source_text: str, user_prompt: str) -> List[Dict[str, str]]:
+        """The outline `generate_report_stream` would use; summaries are only requested for parallel generation."""
+        if self.plan_cache is not None:
+            return await self._cached_plan(source_text, user_prompt)
+        if self.parallel_sections > 1:
+            outline = await self.generate_outline_with_summaries(source_text, user_prompt)
+        else:
+            outline = self._normalize_outline(await self.generate_outline(source_text, user_prompt))
+        logger.info(f"Generated outline with {len(outline)} sections: {[s['title'] for s in outline]}")
+        return outline
+
+    async def _cached_plan(self, source_text: str, user_prompt: str) -> List[Dict[str, str]]:
+        """
+        The plan for this corpus and prompt from `plan_cache`, or a new one: an outline with
+        summaries plus a digest of the source region behind each section. Fallback outlines
+        (after an outline error) are used but not cached.
+        """
+        corpus = self.tool_registry.corpus_fingerprint if self.tool_registry is not None else hashlib.sha256(source_text.encode("utf-8")).hexdigest()
+        key = self.plan_cache.make_key(user_prompt, corpus, self.model, self.num_sections,
+                                       settings=f"outline_context={self.outline_context_tokens};digest={self.digest_tokens}")
+        plan = self.plan_cache.get(key)
+        if plan is not None:
+            logger.info(f"Reusing cached plan with {len(plan)} sections: {[s['title'] for s in plan]}")
+            return plan
+
+        try:
+            outline = await self._request_outline(source_text, user_prompt, with_summaries=True, fallback=False)
+        except Exception as e:
+            logger.error(f"Outline Generator Error: {e}; falling back to a 3-section outline")
+            return self._normalize_outline(["Introduction", "Main Body", "Conclusion"])
+        with get_tracer().span("generator.digests", sections=len(outline)):
+            digests = await asyncio.gather(*(self._section_digest(section) for section in outline))
+        plan = [{**section, "digest": digest} for section, digest in zip(outline, digests)]
+        self.plan_cache.set(key, plan)
+        logger.info(f"Generated plan with {len(plan)} sections: {[s['title'] for s in plan]}")
+        return plan
+
+    async def _section_digest(self, section: Dict[str, str]) -> str:
+        """The source sentences that best match a section, packed under `digest_tokens`."""
+        if self.tool_registry is None:
+            return section["summary"]
+        query = f"{section['title']}. {section['summary']}".strip()
+        ranked = await self.tool_registry.asearch_documents(query, n_results=3)
+        selected, used = [], 0
+        for sentence in self.tool_registry.best_sentences(query, ranked):
+            cost = estimate_tokens(sentence)
+            if used + cost > self.digest_tokens:
+                continue
+            selected.append(sentence)
+            used += cost
+        return " ".join(selected) or section["summary"]
+
+    @staticmethod
+    def _plan_context(outline: List[Dict[str, str]], index: int) -> str:
+        """Cross-section context from a plan: what every other section covers, by source digest once written."""
+        lines = []
+        for n, section in enumerate(outline):
+            if n < index:
+                lines.append(f"{n + 1}. {section['title']} (already written, covers: {section['digest'] or section['summary']})")
+            elif n == index:
+                lines.append(f"{n + 1}. {section['title']} (this section)")
+            else:
+                lines.append(f"{n + 1}. {section['title']}" + (f": {section['summary']}" if section['summary'] else ""))
+        return (f"Document plan (for continuity; you are writing section {index + 1} of {len(outline)}, "
+                f"do not repeat what the other sections cover):\n" + "\n".join(lines))
+
+    async def generate_report_stream(self, source_text: str, user_prompt: str, outline: Optional[List[Dict[str, str]]] = None,
+                                     start_section: int = 0, previous_text: str = "",
+                                     on_section_complete: Optional[Callable[[int], None]] = None,
+                                     raise_errors: bool = False):
         """
         Generates a draft report, streaming it section by section.
+        With `parallel_sections > 1`, sections are generated concurrently but still streamed in outline order.
+
+        To resume an interrupted draft, pass its `outline`, the index of the first section still
+        to write and the text written so far (used as continuity context unless the outline is a
+        cached plan, whose digests are used instead). `on_section_complete`
+        is called with a section's index once all of its text has been yielded. With
+        `raise_errors`, a section whose generation fails raises instead of yielding an inline
+        error note, so a checkpointed run regenerates it on resume.
         """
-        outline = await self.generate_outline(source_text, user_prompt)
-        logger.info(f"Generated outline with {len(outline)} sections: {outline}")
-        
-        accumulated_context = ""
+        if outline is None:
+            outline = await self.plan_outline(source_text, user_prompt)
+
+        if self.parallel_sections > 1:
+            async for text in self._generate_parallel(source_text, user_prompt, outline, start_section, on_section_complete,
+                                                      raise_errors):
+                yield text
+            return
+
+        # Only the tail is ever sent, so there is no need to keep the whole draft around.
+        accumulated_context = previous_text[-2000:]
+        planned = all("digest" in section for section in outline)
         
-        for section in outline:
-            section_prompt = f"Source Knowledge:\n{source_text}\n\nUser Request: {user_prompt}\n\nTask: Generate the content for the section titled '{section}'. Write at least 4-5 long, comprehensive paragraphs for this section to ensure the final document reaches the 5-20 pages length requirement. Provide deep, specific details from the source knowledge.\n\nPrevious context in this document (for continuity):\n{accumulated_context[-2000:]}\n\nReturn ONLY the detailed content for this section, formatted in Markdown."
-            
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": section_prompt}
-            ]
+        for index in range(start_section, len(outline)):
+            section = outline[index]["title"]
+            section_source = await self._section_source(source_text, section, outline[index].get("summary", ""))
+            if planned:
+                continuity = self._plan_context(outline, index)
+            else:
+                continuity = f"Previous context in this document (for continuity):\n{accumulated_context}"
+            messages = self._section_messages(section_source, user_prompt, section, continuity)
             
             logger.info(f"Generating section: {section}")
             
             header = f"\n\n## {section}\n\n"
             yield header
-            accumulated_context += header
+            accumulated_context = (accumulated_context + header)[-2000:]
             
-            max_retries = 5
-            base_delay = 2
-            for attempt in range(max_retries):
-                try:
-                    response = await self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        stream=True
+            async for text in self._stream_section(section, messages, raise_errors):
+                yield text
+                accumulated_context = (accumulated_context + text)[-2000:]
+            if on_section_complete:
+                on_section_complete(index)
+
+    async def _generate_parallel(self, source_text: str, user_prompt: str, outline: List[Dict[str, str]],
+                                 start_section: int = 0, on_section_complete: Optional[Callable[[int], None]] = None,
+                                 raise_errors: bool = False):
+        """
+        Generates up to `parallel_sections` sections at once. Continuity comes from the outline's
+        section summaries rather than the previous section's text, so sections don't wait on each
+        other; output of later sections is buffered until every earlier section has been streamed.
+        """
+
+        overview = "\n".join(
+            f"{n}. {s['title']}" + (f": {s['summary']}" if s['summary'] else "")
+            for n, s in enumerate(outline, start=1)
+        )
+        queues = [asyncio.Queue() for _ in outline]
+        # asyncio.Semaphore is FIFO, so earlier sections get slots first.
+        semaphore = asyncio.Semaphore(self.parallel_sections)
+
+        async def produce(index: int, section: Dict[str, str]):
+            try:
+                async with semaphore:
+                    continuity = (
+                        f"Document outline (for continuity; you are writing section {index + 1} of {len(outline)}, "
+                        f"other sections cover the remaining topics so avoid repeating them):\n{overview}"
                     )
-                    
-                    async for chunk in response:
-                        text = chunk.choices[0].delta.content if chunk.choices and chunk.choices[0].delta.content else ""
-                        if text:
-                            yield text
-                            accumulated_context += text
-                    break # Success, exit retry loop
-                        
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if "429" in error_str or "rate limit" in error_str:
-                        if attempt < max_retries - 1:
-                            match = re.search(r'try again in ([0-9.]+)s', error_str)
-                            delay = float(match.group(1)) + 1.0 if match else base_delay * (2 ** attempt)
-                            logger.warning(f"Rate limit reached. Retrying section '{section}' in {delay:.2f}s (Attempt {attempt + 1}/{max_retries})...")
-                            await asyncio.sleep(delay)
-                            continue
-                    
-                    logger.error(f"Generator Error for section {section}: {e}")
-                    err_msg = f"\n[Error generating section {section}]\n"
-                    yield err_msg
-                    accumulated_context += err_msg
-                    break # Exit retry loop on non-429 error
+                    section_source = await self._section_source(source_text, section["title"], section["summary"])
+                    messages = self._section_messages(section_source, user_prompt, section["title"], continuity)
+                    logger.info(f"Generating section: {section['title']}")
+                    async for text in self._stream_section(section["title"], messages, raise_errors):
+                        queues[index].put_nowait(text)
+            except Exception as e:
+                queues[index].put_nowait(e)
+            finally:
+                queues[index].put_nowait(None)
+
+        tasks = [asyncio.create_task(produce(i, outline[i])) for i in range(start_section, len(outline))]
+        try:
+            for index in range(start_section, len(outline)):
+                yield f"\n\n## {outline[index]['title']}\n\n"
+                while (text := await queues[index].get()) is not None:
+                    if isinstance(text, Exception):
+                        raise text
+                    yield text
+                if on_section_complete:
+                    on_section_complete(index)
+        finally:
+            for task in tasks:
+                task.cancel()
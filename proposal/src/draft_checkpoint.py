@@ -0,0 +1,80 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DraftCheckpoint:
+    """
+    Sidecar state for a draft that is being streamed to disk.
+
+    Records the run's outline, how many sections have been fully written (and the draft's
+    byte length at that point) and every finished verdict, keyed by claim text. The file is
+    replaced atomically on each save, so a crash leaves either the previous or the new state.
+    """
+
+    def __init__(self, path: str, run_key: str):
+        self.path = path
+        self.run_key = run_key
+        self.outline: Optional[List[Dict[str, str]]] = None
+        self.completed_sections = 0
+        self.draft_length = 0
+        self.verdicts: Dict[str, Dict] = {}
+
+    @staticmethod
+    def path_for(output_path: str) -> str:
+        return f"{output_path}.checkpoint.json"
+
+    @staticmethod
+    def make_run_key(user_prompt: str, source_hash: str, model: str, num_sections: int) -> str:
+        payload = "\x1f".join([user_prompt, source_hash, model, str(num_sections)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def load(cls, path: str, run_key: str) -> "DraftCheckpoint":
+        """Returns the saved state if it belongs to the same run, otherwise a fresh checkpoint."""
+        checkpoint = cls(path, run_key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return checkpoint
+
+        if data.get("run_key") != run_key:
+            logger.info(f"Checkpoint {path} belongs to a different run; starting over.")
+            return checkpoint
+        checkpoint.outline = data.get("outline")
+        checkpoint.completed_sections = data.get("completed_sections", 0)
+        checkpoint.draft_length = data.get("draft_length", 0)
+        checkpoint.verdicts = data.get("verdicts", {})
+        return checkpoint
+
+    @property
+    def resumable(self) -> bool:
+        return self.outline is not None
+
+    def save(self):
+        payload = {
+            "run_key": self.run_key,
+            "outline": self.outline,
+            "completed_sections": self.completed_sections,
+            "draft_length": self.draft_length,
+            "verdicts": self.verdicts,
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
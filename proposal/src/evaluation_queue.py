@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# What `EvaluationQueue.put` does when the queue is already `max_depth` deep.
+OVERFLOW_BLOCK = "block"  # wait for a worker to free a slot, pausing the producer
+OVERFLOW_VECTOR_TIER = "vector_tier"  # answer the claim right away with the cheap fallback evaluator
+OVERFLOW_COALESCE = "coalesce"  # append the claim to the newest queued item and evaluate them together
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_VECTOR_TIER, OVERFLOW_COALESCE)
+
+# Tier of the result delivered for a claim whose evaluation raised.
+TIER_ERROR = "error"
+
+
+class _WorkItem:
+    __slots__ = ("claims", "tags", "ready_at", "taken")
+
+    def __init__(self, claim: str, tag: Any, ready_at: float):
+        self.claims = [claim]
+        self.tags = [tag]
+        self.ready_at = [ready_at]
+        self.taken = False
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.claims)
+
+
+class EvaluationQueue:
+    """
+    Bounded producer/consumer queue in front of a fixed pool of evaluator workers.
+
+    `put` enqueues a claim together with an opaque `tag`; every result is handed to
+    `on_result(tag, result)` as soon as it is ready, in completion order. Because the queue
+    holds at most `max_depth` claims, a fast producer is either paused (`block`), diverted
+    to `fallback` (`vector_tier`) or has its sentences merged into the newest queued item
+    (`coalesce`, up to `max_coalesced_chars`; blocks once that limit is hit).
+    A claim whose evaluation raises still gets a result: flagged, with tier `error` and
+    the error in the rationale, so one failure never aborts the run.
+    """
+
+    def __init__(self, evaluate: Callable[[str], Awaitable[Dict]], on_result: Callable[[Any, Dict], None],
+                 workers: int = 8, max_depth: int = 64, overflow: str = OVERFLOW_BLOCK,
+                 fallback: Optional[Callable[[str], Awaitable[Dict]]] = None, max_coalesced_chars: int = 600):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}; expected one of {OVERFLOW_POLICIES}")
+        if overflow == OVERFLOW_VECTOR_TIER and fallback is None:
+            raise ValueError("The vector_tier overflow policy needs a fallback evaluator")
+        self.evaluate = evaluate
+        self.on_result = on_result
+        self.workers = workers
+        self.max_depth = max_depth
+        self.overflow = overflow
+        self.fallback = fallback
+        self.max_coalesced_chars = max_coalesced_chars
+
+        self.dispatch_latencies: List[float] = []
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "fallback": 0, "coalesced": 0, "blocked_seconds": 0.0, "max_depth_seen": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tail: Optional[_WorkItem] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> "EvaluationQueue":
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return self
+
+    async def __aenter__(self) -> "EvaluationQueue":
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.join()
+        else:
+            self.cancel()
+
+    @property
+    def stats(self) -> Dict:
+        return {**self._stats, "blocked_seconds": round(self._stats["blocked_seconds"], 3), "depth": self._queue.qsize() if self._queue else 0}
+
+    async def put(self, claim: str, tag: Any = None, ready_at: Optional[float] = None):
+        """Submits a claim; `ready_at` (a perf_counter time) feeds the dispatch latency stats."""
+        ready_at = time.perf_counter() if ready_at is None else ready_at
+        self._stats["submitted"] += 1
+
+        if self._queue.full():
+            if self.overflow == OVERFLOW_VECTOR_TIER:
+                self._stats["fallback"] += 1
+                self.dispatch_latencies.append(time.perf_counter() - ready_at)
+                self._deliver(_WorkItem(claim, tag, ready_at), await self.fallback(claim))
+                return
+            tail = self._tail
+            if (self.overflow == OVERFLOW_COALESCE and tail is not None and not tail.taken
+                    and len(tail.text) + len(claim) < self.max_coalesced_chars):
+                self._stats["coalesced"] += 1
+                tail.claims.append(claim)
+                tail.tags.append(tag)
+                tail.ready_at.append(ready_at)
+                return
+
+        item = _WorkItem(claim, tag, ready_at)
+        started = time.perf_counter()
+        await self._queue.put(item)
+        self._stats["blocked_seconds"] += time.perf_counter() - started
+        self._tail = item
+        self._stats["max_depth_seen"] = max(self._stats["max_depth_seen"], self._queue.qsize())
+
+    async def drain(self):
+        """Waits until every claim queued so far is evaluated; the workers keep running."""
+        await self._queue.join()
+
+    async def join(self):
+        """Waits for every queued claim to be evaluated, then stops the workers."""
+        for _ in self._workers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._workers)
+        self._workers = []
+
+    def cancel(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    async def _work(self):
+        while (item := await self._queue.get()) is not None:
+            try:
+                await self._process(item)
+            finally:
+                self._queue.task_done()
+        self._queue.task_done()
+
+    async def _process(self, item: _WorkItem):
+        item.taken = True
+        now = time.perf_counter()
+        self.dispatch_latencies.extend(now - ready_at for ready_at in item.ready_at)
+        get_tracer().record("queue.wait", now - item.ready_at[0], sentences=len(item.claims))
+        try:
+            result = await self.evaluate(item.text)
+        except Exception as e:
+            logger.error(f"Evaluation failed for claim '{item.text[:80]}': {e}")
+            self._stats["failed"] += len(item.claims)
+            result = {
+                "claim": item.text,
+                "verdict": {"faithfulness_score": 0.0, "requires_revision": True, "rationale": f"Evaluation error: {e}"},
+                "tier": TIER_ERROR,
+            }
+        self._deliver(item, result)
+
+    def _deliver(self, item: _WorkItem, result: Dict):
+        coalesced = len(item.claims) > 1
+        for claim, tag in zip(item.claims, item.tags):
+            # Every sentence gets its own result; merged ones say what text was actually judged.
+            self._stats["completed"] += 1
+            self.on_result(tag, {**result, "claim": claim, "evaluated_as": item.text} if coalesced else result)
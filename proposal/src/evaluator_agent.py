@@ -1,23 +1,196 @@
 import logging
 import json
 import asyncio
-import re
-from groq import AsyncGroq
+from typing import List, Optional, Tuple
+from client_pool import ClientPool, get_client_pool
+from lazy_imports import LazyImport
+from rate_limiter import PRIORITY_EVALUATOR, RateLimiter, estimate_message_tokens, estimate_tokens, get_rate_limiter
 from tool_registry import ToolRegistry
+from tracing import get_tracer
+from verdict_cache import VerdictCache
+from verifiers import Verifier
+from structured_output import BATCH_VERDICTS_SCHEMA, VERDICT_SCHEMA, StructuredOutputError, parse_with_repair
+
+AsyncGroq = LazyImport("groq", "AsyncGroq")
 
 logger = logging.getLogger(__name__)
 
+BATCH_SYSTEM_PROMPT = """You are an Evaluator Agent. You will receive several numbered claims, each paired with evidence retrieved from the source context.
+Evaluate every claim based ONLY on its evidence. Do not use external knowledge.
+
+Return a JSON object with a single key "verdicts" holding an array with exactly one entry per claim, in the same order. Each entry must have:
+- id (the claim number you were given)
+- faithfulness_score (float between 0.0 and 1.0)
+- requires_revision (boolean)
+- rationale (string explaining your decision)
+
+A score of 1.0 means perfectly faithful to the source. 0.0 means completely unsupported or hallucinated."""
+
+EVIDENCE_SYSTEM_PROMPT = """You are an Evaluator Agent. Your task is to check if a claim is factually grounded in the source context provided with it.
+Evaluate the claim based ONLY on that source context. Do not use external knowledge.
+
+Return a JSON object with:
+- faithfulness_score (float between 0.0 and 1.0)
+- requires_revision (boolean)
+- rationale (string explaining your decision)
+
+A score of 1.0 means perfectly faithful to the source. 0.0 means completely unsupported or hallucinated."""
+
 class EvaluatorAgent:
-    def __init__(self, tool_registry: ToolRegistry, model: str = "llama-3.3-70b-versatile"):
+    def __init__(self, tool_registry: ToolRegistry, model: str = "llama-3.3-70b-versatile", cache: Optional[VerdictCache] = None,
+                 eager_retrieval: bool = False, min_retrieval_confidence: float = 0.5, rate_limiter: Optional[RateLimiter] = None,
+                 verifier: Optional[Verifier] = None, client_pool: Optional[ClientPool] = None):
         self.tool_registry = tool_registry
         self.model = model
-        self.client = AsyncGroq()
+        self.cache = cache
+        # Eager retrieval runs vector search locally and skips the tool-selection round-trip
+        # whenever the best match is at least `min_retrieval_confidence` (same scale as
+        # ToolRegistry.evaluate_claim_by_vector scores).
+        self.eager_retrieval = eager_retrieval
+        self.min_retrieval_confidence = min_retrieval_confidence
+        # A local verifier (see verifiers.py) settles confident cases; the LLM only sees the rest.
+        self.verifier = verifier
+        # Pairs from concurrent evaluate_claim calls waiting to be scored in one verify_many call.
+        self._verify_pending: List[Tuple[Tuple[str, str], asyncio.Future]] = []
+        self._verify_task: Optional[asyncio.Task] = None
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # A shared pool outlives this agent and is never closed here. A private limiter needs a
+        # private pool (response headers feed the pool's limiter), which aclose() closes.
+        self._owns_client_pool = client_pool is None and rate_limiter is not None
+        self.client_pool = client_pool or (ClientPool(rate_limiter=rate_limiter) if rate_limiter else get_client_pool())
+        self._client = None
+        # valid / repaired / failed counts of schema-checked model replies.
+        self.output_stats = {"valid": 0, "repaired": 0, "failed": 0}
+
+    @property
+    def client(self):
+        """The Groq client, created (and the SDK imported) on the first call."""
+        if self._client is None:
+            # Retries belong to the rate limiter, which also honours retry-after and syncs the budgets.
+            self._client = AsyncGroq(http_client=self.client_pool.http_client, max_retries=0)
+        return self._client
+
+    async def aclose(self):
+        """Closes the connection pool if this agent created its own (`rate_limiter` without `client_pool`)."""
+        if self._owns_client_pool:
+            await self.client_pool.aclose()
+
+    async def __aenter__(self) -> "EvaluatorAgent":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
 
     async def evaluate_claim(self, claim: str) -> dict:
         """
         Takes a single claim, asks the LLM to use the vector_search tool to find evidence,
         and uses the result to evaluate its faithfulness to avoid hallucinations.
+        Verdicts are served from the verdict cache when one is configured.
         """
+        if self.cache is None:
+            verdict, _ = await self._evaluate_claim_uncached(claim)
+            return verdict
+
+        key = self._cache_key(claim)
+        return await self.cache.get_or_compute(key, lambda: self._evaluate_claim_uncached(claim))
+
+    def _cache_key(self, claim: str) -> str:
+        # Verdicts from a verifier cascade are not interchangeable with LLM-only ones.
+        model = f"{self.model}+{self.verifier.name}" if self.verifier is not None else self.model
+        return self.cache.make_key(claim, model, self.tool_registry.corpus_fingerprint)
+
+    async def _evaluate_claim_uncached(self, claim: str, use_verifier: bool = True) -> Tuple[dict, bool]:
+        """Runs the evaluation for one claim. Returns the verdict and whether it may be cached."""
+        with get_tracer().span("evaluator.claim") as span:
+            if self.verifier is not None and use_verifier:
+                evidence = await self.tool_registry.avector_search(claim)
+                verdict = await self._verify(claim, evidence)
+                if verdict is not None:
+                    span.set(path="verifier")
+                    return verdict, True
+                span.set(path="verifier_deferred")
+                return await self._evaluate_with_evidence(claim, evidence)
+            if self.eager_retrieval:
+                retrieval = await self.tool_registry.aretrieve(claim)
+                if retrieval["documents"] and retrieval["confidence"] >= self.min_retrieval_confidence:
+                    span.set(path="eager")
+                    # Confidence comes from dense distance; the evidence itself uses the registry's configured (hybrid) search.
+                    return await self._evaluate_with_evidence(claim, await self.tool_registry.avector_search(claim))
+                logger.debug(f"Low retrieval confidence ({retrieval['confidence']:.2f}), using the tool loop for: {claim}")
+            span.set(path="tools")
+            return await self._evaluate_claim_with_tools(claim)
+
+    async def _verify(self, claim: str, evidence: str) -> Optional[dict]:
+        """
+        Scores one pair with the verifier. Pairs from concurrent calls are collected and scored
+        together: whatever arrives while a verify_many call runs goes into the next one.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._verify_pending.append(((claim, evidence), future))
+        if self._verify_task is None or self._verify_task.done():
+            self._verify_task = asyncio.create_task(self._flush_verifier())
+        return await future
+
+    async def _flush_verifier(self):
+        # Let the other claims of this loop iteration join the first batch.
+        await asyncio.sleep(0)
+        while self._verify_pending:
+            batch, self._verify_pending = self._verify_pending, []
+            try:
+                verdicts = await self.verifier.verify_many([pair for pair, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), verdict in zip(batch, verdicts):
+                if not future.done():
+                    future.set_result(verdict)
+
+    async def _evaluate_with_evidence(self, claim: str, evidence: str) -> Tuple[dict, bool]:
+        """Single JSON-mode completion over pre-retrieved evidence, skipping the tool-calling round-trip."""
+        logger.debug(f"Evaluating claim via eager retrieval: {claim}")
+        messages = [
+            {"role": "system", "content": EVIDENCE_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Claim payload: {claim}\n\nSource context:\n{evidence}"}
+        ]
+        try:
+            content = await self._json_completion(messages)
+        except Exception as e:
+            logger.error(f"LLM Eval Error: {e}")
+            return {
+                "faithfulness_score": 0.0,
+                "requires_revision": True,
+                "rationale": f"LLM error: {e}"
+            }, False
+        return await self._parse_verdict(messages, content)
+
+    async def _parse_verdict(self, messages: list, content: str) -> Tuple[dict, bool]:
+        """Validates a verdict reply, asking once for a corrected one if it is malformed."""
+        async def retry(previous: str, prompt: str) -> str:
+            return await self._json_completion(messages + [{"role": "assistant", "content": previous}, {"role": "user", "content": prompt}],
+                                               expected_output_tokens=150)
+
+        try:
+            verdict = await parse_with_repair(VERDICT_SCHEMA, content, retry, stats=self.output_stats)
+        except StructuredOutputError as e:
+            return {
+                "faithfulness_score": 0.0,
+                "requires_revision": True,
+                "rationale": f"Failed to parse LLM evaluation JSON: {e}"
+            }, False
+        except Exception as e:
+            logger.error(f"LLM Eval Error: {e}")
+            return {
+                "faithfulness_score": 0.0,
+                "requires_revision": True,
+                "rationale": f"LLM error: {e}"
+            }, False
+        return {"faithfulness_score": verdict["faithfulness_score"], "requires_revision": verdict["requires_revision"],
+                "rationale": verdict["rationale"]}, True
+
+    async def _evaluate_claim_with_tools(self, claim: str) -> Tuple[dict, bool]:
+        """Runs the tool-calling evaluation loop."""
         logger.debug(f"Evaluating claim via LLM Eval with Tools: {claim}")
         
         system_prompt = """You are an Evaluator Agent. Your task is to check if a claim is factually grounded in the source context.
@@ -31,95 +204,208 @@ When evaluating, return a JSON object with:
 
 A score of 1.0 means perfectly faithful to the source. 0.0 means completely unsupported or hallucinated."""
 
-        max_retries = 5
-        base_delay = 2
-
-        for attempt in range(max_retries):
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Claim payload: {claim}"}
-            ]
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Claim payload: {claim}"}
+        ]
+        
+        try:
+            # Step 1: LLM decides to use tool or answer (should use tool)
+            response = await self._completion(
+                messages,
+                tools=self.tool_registry.tools,
+                tool_choice="auto"
+            )
             
-            try:
-                # Step 1: LLM decides to use tool or answer (should use tool)
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=self.tool_registry.tools,
-                    tool_choice="auto"
-                )
-                
-                response_message = response.choices[0].message
-                tool_calls = response_message.tool_calls
+            response_message = response.choices[0].message
+            tool_calls = response_message.tool_calls
+            
+            if tool_calls:
+                # Step 2: Execute tool and return result to LLM
+                messages.append(response_message) # Add assistant's tool call message
                 
-                if tool_calls:
-                    # Step 2: Execute tool and return result to LLM
-                    messages.append(response_message) # Add assistant's tool call message
+                for tool_call in tool_calls:
+                    function_name = tool_call.function.name
+                    function_args = json.loads(tool_call.function.arguments)
+                    logger.debug(f"LLM called tool: {function_name} with args: {function_args}")
                     
-                    for tool_call in tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        logger.debug(f"LLM called tool: {function_name} with args: {function_args}")
+                    try:
+                        function_response = await self.tool_registry.aexecute_tool(function_name, function_args)
+                    except Exception as e:
+                        logger.error(f"Error executing tool {function_name}: {e}")
+                        function_response = f"Error: {e}"
                         
-                        try:
-                            function_response = self.tool_registry.execute_tool(function_name, function_args)
-                        except Exception as e:
-                            logger.error(f"Error executing tool {function_name}: {e}")
-                            function_response = f"Error: {e}"
-                            
-                        messages.append(
-                            {
-                                "tool_call_id": tool_call.id,
-                                "role": "tool",
-                                "name": function_name,
-                                "content": function_response,
-                            }
-                        )
-                    
-                    # Step 3: LLM evaluates with the context, forcing JSON format
-                    messages.append({
-                        "role": "system", 
-                        "content": "Now use the tool results to output the evaluation JSON object as previously instructed. Ensure the output is valid JSON."
-                    })
-                    
-                    second_response = await self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        response_format={ "type": "json_object" }
+                    messages.append(
+                        {
+                            "tool_call_id": tool_call.id,
+                            "role": "tool",
+                            "name": function_name,
+                            "content": function_response,
+                        }
                     )
-                    
-                    content = second_response.choices[0].message.content or "{}"
-                else:
-                    # The LLM decided not to use a tool (unexpected, but handle it)
-                    logger.warning("LLM didn't use a tool, attempting to parse response directly.")
-                    # the first response isn't guaranteed to be json, but we try
-                    content = response_message.content or "{}"
-
-                # Extract JSON cleanly
-                start = content.find('{')
-                end = content.rfind('}')
-                if start != -1 and end != -1:
-                    return json.loads(content[start:end+1])
-                    
-                return {
-                    "faithfulness_score": 0.0,
-                    "requires_revision": True,
-                    "rationale": "Failed to parse LLM evaluation JSON."
-                }
                 
-            except Exception as e:
-                error_str = str(e).lower()
-                if "429" in error_str or "rate limit" in error_str:
-                    if attempt < max_retries - 1:
-                        match = re.search(r'try again in ([0-9.]+)s', error_str)
-                        delay = float(match.group(1)) + 1.0 if match else base_delay * (2 ** attempt)
-                        logger.warning(f"Rate limit reached. Retrying in {delay} seconds (Attempt {attempt + 1}/{max_retries})...")
-                        await asyncio.sleep(delay)
-                        continue
+                # Step 3: LLM evaluates with the context, forcing JSON format
+                messages.append({
+                    "role": "system", 
+                    "content": "Now use the tool results to output the evaluation JSON object as previously instructed. Ensure the output is valid JSON."
+                })
                 
-                logger.error(f"LLM Eval Error: {e}")
-                return {
-                    "faithfulness_score": 0.0,
-                    "requires_revision": True,
-                    "rationale": f"LLM error: {e}"
-                }
+                content = await self._json_completion(messages)
+            else:
+                # The LLM decided not to use a tool (unexpected, but handle it)
+                logger.warning("LLM didn't use a tool, attempting to parse response directly.")
+                # the first response isn't guaranteed to be json; a malformed one gets a corrective retry
+                content = response_message.content or "{}"
+
+            return await self._parse_verdict(messages, content)
+            
+        except Exception as e:
+            logger.error(f"LLM Eval Error: {e}")
+            return {
+                "faithfulness_score": 0.0,
+                "requires_revision": True,
+                "rationale": f"LLM error: {e}"
+            }, False
+
+    async def evaluate_claims_batch(self, claims: List[str], max_prompt_tokens: int = 6000, max_batch_size: int = 25, max_concurrency: int = 8) -> List[dict]:
+        """
+        Evaluates many claims with a handful of LLM calls instead of two calls per claim.
+        Evidence is retrieved locally for every claim, then claims are packed into batches
+        that fit `max_prompt_tokens`. Returns one verdict per claim, in input order.
+        """
+        verdicts: List[Optional[dict]] = [None] * len(claims)
+        keys: List[Optional[str]] = [None] * len(claims)
+        uncached = []
+
+        for idx, claim in enumerate(claims):
+            if self.cache is not None:
+                keys[idx] = self._cache_key(claim)
+                cached = self.cache.get(keys[idx])
+                if cached is not None:
+                    verdicts[idx] = cached
+                    continue
+            uncached.append(idx)
+
+        # One vectorized retrieval call for every uncached claim.
+        evidence = await self.tool_registry.avector_search_many([claims[idx] for idx in uncached]) if uncached else []
+        pending = [(idx, claims[idx], claim_evidence) for idx, claim_evidence in zip(uncached, evidence)]
+        if self.verifier is not None and pending:
+            local = await self.verifier.verify_many([(claim, claim_evidence) for _, claim, claim_evidence in pending])
+            for (idx, _, _), verdict in zip(pending, local):
+                if verdict is not None:
+                    verdicts[idx] = verdict
+                    if self.cache is not None:
+                        self.cache.set(keys[idx], verdict)
+            pending = [item for item, verdict in zip(pending, local) if verdict is None]
+            logger.info(f"Local verifier settled {len(local) - len(pending)} of {len(local)} claims")
+
+        budget = max_prompt_tokens - estimate_tokens(BATCH_SYSTEM_PROMPT)
+        batches, current, current_tokens = [], [], 0
+        for item in pending:
+            item_tokens = estimate_tokens(item[1]) + estimate_tokens(item[2])
+            if current and (current_tokens + item_tokens > budget or len(current) >= max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += item_tokens
+        if current:
+            batches.append(current)
+
+        logger.info(f"Evaluating {len(pending)} uncached claims in {len(batches)} batches ({len(claims) - len(pending)} cache hits)...")
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_batch(batch):
+            async with semaphore:
+                return await self._evaluate_batch_with_split(batch)
+
+        for batch_results in await asyncio.gather(*[run_batch(batch) for batch in batches]):
+            for idx, verdict, cacheable in batch_results:
+                verdicts[idx] = verdict
+                if cacheable and self.cache is not None:
+                    self.cache.set(keys[idx], verdict)
+
+        return verdicts
+
+    async def _evaluate_batch_with_split(self, batch: list) -> List[Tuple[int, dict, bool]]:
+        """
+        Evaluates a packed batch, halving it on malformed output until single claims are
+        evaluated against the evidence already retrieved for them. API errors fail the whole
+        batch (not cached) instead of multiplying requests during an outage.
+        """
+        if len(batch) == 1:
+            idx, claim, evidence = batch[0]
+            # Batched claims have already been through the verifier.
+            verdict, cacheable = await self._evaluate_with_evidence(claim, evidence)
+            return [(idx, verdict, cacheable)]
+
+        with get_tracer().span("evaluator.batch", claims=len(batch)) as span:
+            try:
+                parsed = await self._request_batch_verdicts(batch)
+            except Exception as e:
+                logger.error(f"LLM Batch Eval Error: {e}")
+                span.set(error=type(e).__name__)
+                verdict = {"faithfulness_score": 0.0, "requires_revision": True, "rationale": f"LLM error: {e}"}
+                return [(idx, dict(verdict), False) for idx, _, _ in batch]
+            span.set(malformed=parsed is None)
+        if parsed is not None:
+            return [(idx, verdict, True) for (idx, _, _), verdict in zip(batch, parsed)]
+
+        mid = len(batch) // 2
+        logger.warning(f"Malformed batch response for {len(batch)} claims, retrying as batches of {mid} and {len(batch) - mid}.")
+        left, right = await asyncio.gather(
+            self._evaluate_batch_with_split(batch[:mid]),
+            self._evaluate_batch_with_split(batch[mid:])
+        )
+        return left + right
+
+    async def _request_batch_verdicts(self, batch: list) -> Optional[List[dict]]:
+        """
+        Sends one batch prompt. Returns verdicts aligned with `batch`, or None if the response
+        is malformed; API errors are raised.
+        """
+        payload = "\n\n".join(
+            f"Claim {n}: {claim}\nEvidence {n}:\n{evidence}"
+            for n, (_, claim, evidence) in enumerate(batch, start=1)
+        )
+        messages = [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": payload}
+        ]
+
+        def align(value: dict) -> List[dict]:
+            entries = value["verdicts"]
+            if len(entries) != len(batch):
+                raise StructuredOutputError(f"expected {len(batch)} verdicts, got {len(entries)}")
+            by_id = {str(entry.get("id", position)): entry for position, entry in enumerate(entries, start=1)}
+            missing = [n for n in range(1, len(batch) + 1) if str(n) not in by_id]
+            if missing:
+                raise StructuredOutputError(f"no verdict for claim ids {missing}")
+            return [{
+                "faithfulness_score": by_id[str(n)]["faithfulness_score"],
+                "requires_revision": by_id[str(n)]["requires_revision"],
+                "rationale": by_id[str(n)]["rationale"]
+            } for n in range(1, len(batch) + 1)]
+
+        async def retry(previous: str, prompt: str) -> str:
+            return await self._json_completion(messages + [{"role": "assistant", "content": previous}, {"role": "user", "content": prompt}],
+                                               expected_output_tokens=120 * len(batch))
+
+        try:
+            content = await self._json_completion(messages, expected_output_tokens=120 * len(batch))
+            return await parse_with_repair(BATCH_VERDICTS_SCHEMA, content, retry, check=align, stats=self.output_stats)
+        except StructuredOutputError:
+            return None
+
+    async def _completion(self, messages: list, expected_output_tokens: int = 300, **kwargs):
+        """Chat completion paced and retried by the shared rate limiter."""
+        return await self.rate_limiter.call(
+            lambda: self.client.chat.completions.create(model=self.model, messages=messages, **kwargs),
+            priority=PRIORITY_EVALUATOR,
+            estimated_tokens=estimate_message_tokens(messages, expected_output_tokens),
+            description="evaluation"
+        )
+
+    async def _json_completion(self, messages: list, expected_output_tokens: int = 300) -> str:
+        """Single JSON-mode completion. Raises on non-retryable errors."""
+        response = await self._completion(messages, expected_output_tokens, response_format={ "type": "json_object" })
+        return response.choices[0].message.content or "{}"
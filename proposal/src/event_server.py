@@ -0,0 +1,142 @@
+"""
+Local Server-Sent Events endpoint that streams a draft and its verdicts live.
+
+    python src/event_server.py --port 8765
+    curl -N 'http://127.0.0.1:8765/events?prompt=Brazilian+mangos'
+
+Every event from Orchestrator.stream_events is sent as one SSE message whose event name
+is the event type (text, verdict, done, error) and whose data is the event as JSON, so a
+front-end can append text and highlight `[start, end)` of flagged claims as they arrive.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from orchestrator import Orchestrator
+
+logger = logging.getLogger(__name__)
+
+
+class EventServer:
+    """
+    Minimal HTTP/1.1 server on asyncio streams, sharing the orchestrator's event loop.
+    Runs are serialized: a second client waits until the current report has finished.
+    """
+
+    def __init__(self, orchestrator: Orchestrator, output_dir: str, host: str = "127.0.0.1", port: int = 8765):
+        self.orchestrator = orchestrator
+        self.output_dir = output_dir
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._run_lock = asyncio.Lock()
+
+    async def start(self) -> "EventServer":
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Streaming events on http://{self.host}:{self.port}/events?prompt=...")
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def output_path(self, prompt: str) -> str:
+        # Same prompt, same file, so a re-sent request resumes from the draft's checkpoint.
+        return os.path.join(self.output_dir, f"draft-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]}.md")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if len(request_line) < 2:
+                return
+            method, target = request_line[0], urlsplit(request_line[1])
+            if method == "OPTIONS":
+                self._write_head(writer, "204 No Content")
+            elif method != "GET" or target.path.rstrip("/") != "/events":
+                self._write_error(writer, "404 Not Found", "Use GET /events?prompt=...")
+            elif not (prompt := parse_qs(target.query).get("prompt", [""])[0].strip()):
+                self._write_error(writer, "400 Bad Request", "Missing 'prompt' query parameter")
+            else:
+                self._write_head(writer, "200 OK", {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+                await self._stream(writer, prompt)
+            await writer.drain()
+        except ConnectionError:
+            logger.info("Client disconnected")
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter, prompt: str):
+        async with self._run_lock:
+            events = self.orchestrator.stream_events(prompt, self.output_path(prompt))
+            try:
+                async for event in events:
+                    self._write_event(writer, event)
+                    await writer.drain()
+            except ConnectionError:
+                raise
+            except Exception as e:
+                logger.error(f"Event stream failed: {e}")
+                self._write_event(writer, {"type": "error", "message": str(e)})
+            finally:
+                await events.aclose()
+
+    @staticmethod
+    def _write_head(writer: asyncio.StreamWriter, status: str, headers: Optional[Dict[str, str]] = None):
+        lines = [f"HTTP/1.1 {status}", "Connection: close", "Access-Control-Allow-Origin: *",
+                 "Access-Control-Allow-Methods: GET, OPTIONS"]
+        lines += [f"{key}: {value}" for key, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    @classmethod
+    def _write_error(cls, writer: asyncio.StreamWriter, status: str, message: str):
+        body = json.dumps({"error": message}).encode("utf-8")
+        cls._write_head(writer, status, {"Content-Type": "application/json", "Content-Length": str(len(body))})
+        writer.write(body)
+
+    @staticmethod
+    def _write_event(writer: asyncio.StreamWriter, event: Dict):
+        writer.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+
+
+async def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    scenario_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scenario")
+    parser = argparse.ArgumentParser(description="Stream generated drafts and live verdicts over Server-Sent Events.")
+    parser.add_argument("--source", default=os.path.join(scenario_dir, "source_knowledge.txt"))
+    parser.add_argument("--model", default="llama-3.3-70b-versatile")
+    parser.add_argument("--sections", type=int, default=5)
+    parser.add_argument("--parallel-sections", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output-dir", default=os.path.join(scenario_dir, "live_drafts"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    orchestrator = Orchestrator(source_text_path=args.source, model=args.model, num_sections=args.sections,
+                                parallel_sections=args.parallel_sections,
+                                cache_path=os.path.join(scenario_dir, ".verdict_cache.sqlite3"),
+                                index_path=os.path.join(scenario_dir, ".vector_index"))
+    async with orchestrator:
+        await EventServer(orchestrator, args.output_dir, host=args.host, port=args.port).serve_forever()
+
+if __name__ == "__main__":
+    asyncio.run(main())
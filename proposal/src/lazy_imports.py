@@ -0,0 +1,54 @@
+import importlib
+import threading
+from typing import Any, List, Optional
+
+_registry: List["LazyImport"] = []
+
+
+class LazyImport:
+    """
+    Stands in for a module, or one attribute of it, and imports it on first use. ChromaDB
+    and the Groq SDK take about 1.5 s to import together, which short-lived CLI audits and
+    autoscaled workers would otherwise pay before doing any work.
+
+        chromadb = LazyImport("chromadb")
+        AsyncGroq = LazyImport("groq", "AsyncGroq")
+
+    Attribute access and calls go to the real object. Tests can still `patch` the
+    module-level name.
+    """
+
+    def __init__(self, module: str, attribute: Optional[str] = None):
+        self._module = module
+        self._attribute = attribute
+        self._target: Any = None
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def resolve(self) -> Any:
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    target = importlib.import_module(self._module)
+                    self._target = getattr(target, self._attribute) if self._attribute else target
+        return self._target
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = f"{self._module}.{self._attribute}" if self._attribute else self._module
+        return f"<LazyImport {name}{'' if self.loaded else ' (not loaded)'}>"
+
+
+def preload():
+    """Imports everything declared lazily so far, e.g. before forking warm workers."""
+    for lazy in list(_registry):
+        lazy.resolve()
@@ -1,29 +1,149 @@
 import logging
 import asyncio
-from typing import List, Dict
+import contextvars
+import hashlib
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional
 from tool_registry import ToolRegistry
 from evaluator_agent import EvaluatorAgent
 from document_generator import DocumentGenerator
+from verdict_cache import VerdictCache
+from plan_cache import PlanCache
+from draft_checkpoint import DraftCheckpoint
+from verifiers import Verifier
+from client_pool import ClientPool
+from tracing import get_tracer
+from evaluation_queue import OVERFLOW_BLOCK, TIER_ERROR, EvaluationQueue
+from sentence_segmenter import Segment, StreamingSentenceSegmenter
+from claim_extractor import ClaimDeduplicator, ClaimExtractor, deduplicate, normalize_claim
 
 logger = logging.getLogger(__name__)
 
+# Claims closer than `accept_max_distance` to the source that also reuse at least
+# `accept_min_lexical_overlap` of their tokens, and state the best chunk's numbers and names
+# in its order, are accepted without an LLM call;
+# claims whose nearest evidence is farther than `reject_min_distance` are flagged locally.
+DEFAULT_TIER_THRESHOLDS = {
+    "accept_max_distance": 0.35,
+    "accept_min_lexical_overlap": 0.9,
+    "reject_min_distance": 1.3,
+}
+
+# Bump whenever _chunk_source_text changes so persisted indexes are rebuilt.
+CHUNKING_SIGNATURE = "paragraph-v1"
+
+TIER_VECTOR_ACCEPT = "vector_accept"
+TIER_VECTOR_REJECT = "vector_reject"
+TIER_LLM = "llm"
+TIER_VECTOR_FALLBACK = "vector_fallback"
+
+# Tier counts of the run the current task belongs to, so concurrent runs on one
+# Orchestrator (e.g. several stream_events clients) keep separate stats.
+_run_tier_counts: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("run_tier_counts", default=None)
+
 class Orchestrator:
-    def __init__(self, source_text_path: str, model: str = "llama-3.3-70b-versatile", num_sections: int = 5):
+    def __init__(self, source_text_path: str, model: str = "llama-3.3-70b-versatile", num_sections: int = 5, cache_path: Optional[str] = None,
+                 eager_retrieval: bool = False, min_retrieval_confidence: float = 0.5, max_concurrency: int = 50,
+                 tiered: bool = False, tier_thresholds: Optional[Dict[str, float]] = None,
+                 index_path: Optional[str] = None, read_only_index: bool = False, embedding_function=None,
+                 parallel_sections: int = 1, section_context_tokens: Optional[int] = None,
+                 outline_context_tokens: Optional[int] = None, queue_depth: int = 200,
+                 overflow_policy: str = OVERFLOW_BLOCK, verifier: Optional[Verifier] = None,
+                 client_pool: Optional[ClientPool] = None,
+                 repair_threshold: Optional[float] = None, plan_cache: Optional[PlanCache] = None):
         """
         Initializes the Orchestrator by loading the ground truth document 
         and initializing the Evaluator Agent and Generator.
+        If `cache_path` is given, verdicts are persisted there and reused across runs, and so
+        are report plans (see plan_cache.py); `plan_cache` supplies a plan cache explicitly,
+        e.g. an in-memory one shared by a long-running server.
+        `eager_retrieval` lets the evaluator skip the tool-calling round-trip when local
+        retrieval is at least `min_retrieval_confidence`.
+        `max_concurrency` caps in-flight evaluations; actual call pacing is done by the
+        shared rate limiter (see rate_limiter.py). In the streaming pipeline, at most
+        `queue_depth` claims wait for an evaluator; `overflow_policy` decides what happens
+        beyond that (see evaluation_queue.py).
+        `verifier` (e.g. verifiers.NLIVerifier) settles confident claims locally before the LLM.
+        Drafts are split into atomic factual claims (see claim_extractor.py); a claim that only
+        differs from an earlier one in markup, punctuation or filler words shares its verdict.
+        With `repair_threshold`, the streaming pipeline regenerates any section in which at least
+        that fraction of claims is flagged (see generate_and_evaluate_pipeline).
+        With `tiered=True`, claims are pre-screened by vector distance and only the
+        ambiguous band reaches the LLM evaluator (see DEFAULT_TIER_THRESHOLDS).
+        With `index_path`, source embeddings are persisted there and only re-computed
+        for chunks that changed; `read_only_index` opens an index built by another process.
+        `embedding_function` overrides Chroma's default embedding model.
+        `parallel_sections` > 1 generates that many report sections concurrently.
+        `section_context_tokens` / `outline_context_tokens` give generation prompts only the
+        retrieved slice of the source (within those token budgets) instead of all of it.
+        Generator and evaluator share `client_pool`'s HTTP connections. Without one, the
+        Orchestrator opens its own pool; use `async with Orchestrator(...)` or `aclose()`
+        to release it. A pool passed in (e.g. shared by a batch job) is left open.
         """
-        self.tool_registry = ToolRegistry()
+        self.tool_registry = ToolRegistry(
+            collection_name=self._collection_name(source_text_path),
+            persist_directory=index_path,
+            read_only=read_only_index,
+            embedding_function=embedding_function
+        )
+        self.max_concurrency = max_concurrency
+        self.queue_depth = queue_depth
+        self.overflow_policy = overflow_policy
+        self.evaluation_queue: Optional[EvaluationQueue] = None
+        self.claim_extractor = ClaimExtractor()
+        self.repair_threshold = repair_threshold
+        self.repair_stats: List[Dict] = []
+        self.tiered = tiered
+        self.tier_thresholds = {**DEFAULT_TIER_THRESHOLDS, **(tier_thresholds or {})}
+        self.tier_counts: Dict[str, int] = {}
+        self.dispatch_latencies: List[float] = []
         self.source_text_path = source_text_path
         
         # Load and chunk source text
         self.source_text = self._load_file(source_text_path)
         chunks = self._chunk_source_text(self.source_text)
-        self.tool_registry.load_context(chunks)
+        source_hash = hashlib.sha256(self.source_text.encode("utf-8")).hexdigest()
+        self.tool_registry.sync_context(chunks, source_hash)
         
-        self.evaluator = EvaluatorAgent(self.tool_registry, model=model)
-        self.generator = DocumentGenerator(model=model, num_sections=num_sections)
+        self.verdict_cache = VerdictCache(db_path=cache_path) if cache_path else None
+        self._owns_plan_cache = plan_cache is None and cache_path is not None
+        self.plan_cache = plan_cache or (PlanCache(db_path=cache_path) if cache_path else None)
+        self._owns_client_pool = client_pool is None
+        self.client_pool = client_pool or ClientPool.from_env()
+        self.evaluator = EvaluatorAgent(self.tool_registry, model=model, cache=self.verdict_cache,
+                                        eager_retrieval=eager_retrieval, min_retrieval_confidence=min_retrieval_confidence,
+                                        verifier=verifier, client_pool=self.client_pool)
+        self.generator = DocumentGenerator(model=model, num_sections=num_sections, parallel_sections=parallel_sections,
+                                           tool_registry=self.tool_registry, section_context_tokens=section_context_tokens,
+                                           outline_context_tokens=outline_context_tokens, client_pool=self.client_pool,
+                                           plan_cache=self.plan_cache)
+
+    async def __aenter__(self) -> "Orchestrator":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Closes the connection pool and plan cache (unless they were passed in), the verdict
+        cache and the tool registry's retrieval threads.
+        """
+        if self._owns_client_pool:
+            await self.client_pool.aclose()
+        if self.verdict_cache is not None:
+            self.verdict_cache.close()
+        if self._owns_plan_cache:
+            self.plan_cache.close()
+        self.tool_registry.close()
         
+    @staticmethod
+    def _collection_name(source_text_path: str) -> str:
+        """One collection per source file and chunking strategy."""
+        key = f"{os.path.abspath(source_text_path)}|{CHUNKING_SIGNATURE}"
+        return f"source_knowledge-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}"
+
     def _load_file(self, filepath: str) -> str:
         try:
             with open(filepath, 'r') as f:
@@ -36,96 +156,522 @@ class Orchestrator:
         """Simple paragraph-based chunking strategy for the vector DB context."""
         return [c.strip() for c in text.split('\n\n') if c.strip()]
 
-    def _robust_sentence_chunking(self, text: str, window_size: int = 2) -> List[str]:
-        """
-        Splits text into sliding window chunks of sentences to preserve context for the evaluator.
-        """
-        raw_sentences = [s.strip() + "." for s in text.replace('\n', ' ').split('. ') if len(s.strip()) > 20]
-        chunks = []
-        for i in range(len(raw_sentences)):
-            start = max(0, i - window_size + 1)
-            chunk = " ".join(raw_sentences[start:i+1])
-            chunks.append(chunk)
-        return chunks
-
-    async def evaluate_claims_concurrently(self, claims: List[str], max_concurrency: int = 50) -> List[Dict]:
-        semaphore = asyncio.Semaphore(max_concurrency)
+    def _vector_tier(self, claim: str, retrieval: Dict) -> Optional[Dict]:
+        """Returns a local verdict for clear-cut claims, or None if the LLM must decide."""
+        if not retrieval["documents"]:
+            return {
+                "faithfulness_score": 0.0,
+                "requires_revision": True,
+                "rationale": "No context found in vector knowledge base."
+            }
+
+        distance = retrieval["distances"][0]
+        if distance >= self.tier_thresholds["reject_min_distance"]:
+            return {
+                "faithfulness_score": 0.0,
+                "requires_revision": True,
+                "rationale": f"No nearby evidence in the source (closest vector distance: {distance:.3f})."
+            }
+
+        best = retrieval["documents"][0]
+        overlap = self.tool_registry.lexical_overlap(claim, best)
+        if (distance <= self.tier_thresholds["accept_max_distance"] and overlap >= self.tier_thresholds["accept_min_lexical_overlap"]
+                and self.tool_registry.anchors_in_order(claim, best)):
+            return {
+                "faithfulness_score": round(self.tool_registry.distance_to_score(distance), 2),
+                "requires_revision": False,
+                "rationale": f"Near-verbatim match (vector distance: {distance:.3f}, lexical overlap: {overlap:.2f}): '{best}'"
+            }
+        return None
+
+    async def _evaluate_claim_by_vector(self, claim: str) -> Dict:
+        """Cheap vector-distance verdict, used when the evaluation queue overflows."""
+        verdict = await self.tool_registry.aevaluate_claim_by_vector(claim)
+        self._count_tier(TIER_VECTOR_FALLBACK)
+        return {"claim": claim, "verdict": verdict, "tier": TIER_VECTOR_FALLBACK}
+
+    async def _evaluate_claim(self, claim: str) -> Dict:
+        """Evaluates one claim, going through the vector pre-filter first when tiered mode is on."""
+        with get_tracer().span("orchestrator.claim") as span:
+            if self.tiered:
+                verdict = self._vector_tier(claim, await self.tool_registry.aretrieve(claim))
+                if verdict is not None:
+                    tier = TIER_VECTOR_REJECT if verdict["requires_revision"] else TIER_VECTOR_ACCEPT
+                    self._count_tier(tier)
+                    span.set(tier=tier)
+                    return {"claim": claim, "verdict": verdict, "tier": tier}
+
+            verdict = await self.evaluator.evaluate_claim(claim)
+            self._count_tier(TIER_LLM)
+            span.set(tier=TIER_LLM)
+            return {"claim": claim, "verdict": verdict, "tier": TIER_LLM}
+
+    def _start_tier_counts(self) -> Dict[str, int]:
+        """Fresh tier counts for a run, seen by every task it starts; `tier_counts` is the latest run's."""
+        self.tier_counts = {}
+        _run_tier_counts.set(self.tier_counts)
+        return self.tier_counts
+
+    def _count_tier(self, tier: str, count: int = 1):
+        counts = _run_tier_counts.get()
+        if counts is None:
+            counts = self.tier_counts
+        counts[tier] = counts.get(tier, 0) + count
+
+    def tier_stats(self, counts: Optional[Dict[str, int]] = None) -> Dict:
+        """Share of claims handled by each evaluation tier in `counts` (default: the latest run)."""
+        counts = self.tier_counts if counts is None else counts
+        total = sum(counts.values())
+        return {
+            "total_claims": total,
+            "counts": dict(counts),
+            "fractions": {tier: round(count / total, 3) for tier, count in counts.items()} if total else {}
+        }
+
+    async def evaluate_claims_concurrently(self, claims: List[str], max_concurrency: Optional[int] = None) -> List[Dict]:
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
         
         async def sem_evaluate(claim):
             async with semaphore:
-                verdict = await self.evaluator.evaluate_claim(claim)
-                return {"claim": claim, "verdict": verdict}
+                return await self._evaluate_claim(claim)
 
         tasks = [asyncio.create_task(sem_evaluate(claim)) for claim in claims]
         logger.info(f"Evaluating {len(claims)} claims concurrently...")
         return await asyncio.gather(*tasks)
 
-    async def generate_and_evaluate_pipeline(self, user_prompt: str, output_path: str, print_stream: bool = False) -> List[Dict]:
+    async def evaluate_claims_batched(self, claims: List[str], max_prompt_tokens: int = 6000, max_concurrency: int = 8) -> List[Dict]:
+        """Evaluates claims by packing several of them into each LLM request."""
+        logger.info(f"Evaluating {len(claims)} claims in batched mode...")
+        results: List[Optional[Dict]] = [None] * len(claims)
+        llm_indices = []
+        retrievals = await self.tool_registry.aretrieve_many(claims) if self.tiered else [None] * len(claims)
+        for idx, (claim, retrieval) in enumerate(zip(claims, retrievals)):
+            verdict = self._vector_tier(claim, retrieval) if retrieval is not None else None
+            if verdict is None:
+                llm_indices.append(idx)
+                continue
+            tier = TIER_VECTOR_REJECT if verdict["requires_revision"] else TIER_VECTOR_ACCEPT
+            self._count_tier(tier)
+            results[idx] = {"claim": claim, "verdict": verdict, "tier": tier}
+
+        verdicts = await self.evaluator.evaluate_claims_batch([claims[idx] for idx in llm_indices], max_prompt_tokens=max_prompt_tokens, max_concurrency=max_concurrency)
+        self._count_tier(TIER_LLM, len(llm_indices))
+        for idx, verdict in zip(llm_indices, verdicts):
+            results[idx] = {"claim": claims[idx], "verdict": verdict, "tier": TIER_LLM}
+        return results
+
+    async def generate_and_evaluate_pipeline(self, user_prompt: str, output_path: str, print_stream: bool = False,
+                                             on_result: Optional[Callable[[Dict], None]] = None,
+                                             on_text: Optional[Callable[[str], None]] = None,
+                                             on_repair: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
         """
         The full end-to-end pipeline:
         1. Generate a draft report based on the source text asynchronously (streaming).
-        2. Buffer sentences from the stream and evaluate them in real-time.
-        3. Save the draft to disk.
+        2. Segment the stream incrementally and evaluate each factual claim in real-time,
+           through a bounded queue served by `max_concurrency` workers. Repeated claims are
+           not re-evaluated; they get the verdict of their first occurrence.
+        3. Append the draft to disk as it streams, checkpointing after every section.
+        4. With `repair_threshold` set, regenerate each section whose verdicts cross it as soon
+           as they are all in, while later sections are still being written. The rewrite is
+           constrained by the flagged claims and their evidence; only its new claims are
+           evaluated, and it is spliced into the draft if it has fewer flagged claims.
+
+        The checkpoint (`<output_path>.checkpoint.json`) holds the outline, the completed
+        sections and finished verdicts. Re-running with the same prompt and output path
+        resumes at the first incomplete section and only evaluates claims without a verdict.
+
+        `on_text` receives the draft text as it is written (including, on resume, the part
+        already on disk). `on_result` is called with each claim's result as soon as it is
+        available, with `start`/`end` character offsets into the draft; the returned list
+        holds all results in document order.
+        `on_repair` receives each accepted repair once the draft is final, in document order:
+        {"section", "start", "end", "text", "results", "flagged_before", "flagged_after"}, where
+        `text` replaces draft[start:end] as it stands after the previous repairs (later
+        offsets move by len(text) - (end - start)) and `results` are the new section's claims.
         """
         logger.info("Starting Generation and Real-time Evaluation Phase...")
+        tier_counts = self._start_tier_counts()
+        self.dispatch_latencies = []
+        self.repair_stats = []
         
-        generated_draft_parts = []
-        evaluation_tasks = []
-        buffer = ""
-        
-        semaphore = asyncio.Semaphore(50)
-        
-        async def evaluate_and_store_buffer(text_chunk):
-            async with semaphore:
-                verdict = await self.evaluator.evaluate_claim(text_chunk)
-                return {"claim": text_chunk, "verdict": verdict}
-
-        async for chunk in self.generator.generate_report_stream(self.source_text, user_prompt):
-            if print_stream:
-                print(chunk, end="", flush=True)
-            generated_draft_parts.append(chunk)
-            buffer += chunk
-            
-            # Simple sentence boundary detection for real-time dispatch
-            if '. ' in buffer or '.\n' in buffer:
-                # We have at least one complete sentence
-                parts = buffer.split('. ', 1)
-                if len(parts) > 1:
-                    complete_sentence = parts[0].strip() + "."
-                    buffer = parts[1]
-                    
-                    if len(complete_sentence) > 20: 
-                        # Use complete sentence for evaluation
-                        task = asyncio.create_task(evaluate_and_store_buffer(complete_sentence))
-                        evaluation_tasks.append(task)
-                        
-        # Flush remaining buffer
-        if len(buffer.strip()) > 20:
-            task = asyncio.create_task(evaluate_and_store_buffer(buffer.strip()))
-            evaluation_tasks.append(task)
-            
-        final_draft = "".join(generated_draft_parts)
-        
-        with open(output_path, 'w') as f:
-            f.write(final_draft)
-        logger.info(f"Draft report saved to {output_path}")
-        
-        logger.info(f"Waiting for {len(evaluation_tasks)} remaining evaluation tasks to complete...")
-        if evaluation_tasks:
-            results = await asyncio.gather(*evaluation_tasks)
+        run_key = self._draft_run_key(user_prompt)
+        checkpoint = DraftCheckpoint.load(DraftCheckpoint.path_for(output_path), run_key)
+        previous_text = ""
+        if checkpoint.resumable and os.path.exists(output_path) and os.path.getsize(output_path) >= checkpoint.draft_length:
+            # Drop whatever was written of the section that was interrupted.
+            os.truncate(output_path, checkpoint.draft_length)
+            with open(output_path, "r", encoding="utf-8") as f:
+                previous_text = f.read()
+            logger.info(f"Resuming {output_path} at section {checkpoint.completed_sections + 1} of {len(checkpoint.outline)} "
+                        f"with {len(checkpoint.verdicts)} verdicts already recorded")
         else:
-            results = []
+            checkpoint = DraftCheckpoint(checkpoint.path, run_key)
+            checkpoint.outline = await self.generator.plan_outline(self.source_text, user_prompt)
+            open(output_path, "w").close()
+            checkpoint.save()
+
+        results: List[Optional[Dict]] = []
+        spans: List[tuple] = []
+        segmenter = StreamingSentenceSegmenter()
+        deduplicator = ClaimDeduplicator()
+        evaluated: List[int] = []  # result index of each claim the deduplicator saw first
+        followers: Dict[int, List[int]] = {}  # result index -> later duplicates waiting for its verdict
+        draft_parts: List[str] = [previous_text]
+        written = len(previous_text)
+        sections: List[Dict] = []  # sections written in this run, with their span in the draft
+
+        tracer = get_tracer()
+
+        def store(index: int, result: Dict, fresh: bool = True):
+            start, end, completed_at, _ = spans[index]
+            if fresh:
+                tracer.record("pipeline.sentence_to_verdict", time.perf_counter() - completed_at, tier=result.get("tier"))
+            result = {**result, "start": start, "end": end}
+            results[index] = result
+            if result.get("tier") != TIER_ERROR:
+                # Failed evaluations are retried on resume rather than recorded.
+                checkpoint.verdicts[result["claim"]] = result
+            if on_result:
+                on_result(result)
+            for follower in followers.pop(index, []):
+                share(follower, index)
+            for section in sections:
+                if section["members"] is not None and section["start"] <= start < section["end"]:
+                    maybe_repair(section)
+
+        def seal_sections():
+            # A section's last sentence is only segmented once the next chunk (or the end of the
+            # stream) arrives, so its claims are collected after that chunk was dispatched.
+            for section in sections:
+                if section["members"] is None:
+                    section["members"] = [i for i, span in enumerate(spans) if section["start"] <= span[0] < section["end"]]
+                    maybe_repair(section)
+
+        def maybe_repair(section: Dict):
+            if self.repair_threshold is None or section["repair"] is not None:
+                return
+            members = [results[i] for i in section["members"]]
+            if not members or any(result is None for result in members):
+                return
+            flagged = sum(1 for result in members if result["verdict"].get("requires_revision", True))
+            if flagged and flagged / len(members) >= self.repair_threshold:
+                body = "".join(draft_parts)[section["body_start"]:section["end"]]
+                section["repair"] = asyncio.create_task(
+                    self._repair_section(user_prompt, checkpoint.outline[section["index"]], body, members, evaluate=evaluate_queued))
+
+        def share(index: int, owner: int):
+            claim = spans[index][3]
+            store(index, {**results[owner], "claim": claim, "duplicate_of": owner}, fresh=False)
+
+        def deliver(tag, result: Dict):
+            # Draft claims are tagged with their result index, repair claims with a future.
+            if isinstance(tag, asyncio.Future):
+                if not tag.done():
+                    tag.set_result(result)
+            else:
+                store(tag, result)
+
+        async def evaluate_queued(claims: List[str]) -> List[Dict]:
+            """Evaluates repair claims through the same bounded queue and workers as the draft."""
+            loop = asyncio.get_running_loop()
+            futures = [loop.create_future() for _ in claims]
+            for claim, future in zip(claims, futures):
+                await queue.put(claim, future)
+            return list(await asyncio.gather(*futures))
+
+        queue = EvaluationQueue(self._evaluate_claim, deliver, workers=self.max_concurrency, max_depth=self.queue_depth,
+                                overflow=self.overflow_policy, fallback=self._evaluate_claim_by_vector)
+        self.evaluation_queue = queue
+        self.dispatch_latencies = queue.dispatch_latencies
+
+        async def dispatch(segments: List[Segment]):
+            for segment in segments:
+                for claim in self.claim_extractor.claims(segment):
+                    index = len(results)
+                    results.append(None)
+                    spans.append((claim.start, claim.end, claim.completed_at, claim.text))
+                    duplicate = deduplicator.add(claim.text)
+                    if duplicate is not None:
+                        owner = evaluated[duplicate]
+                        if results[owner] is None:
+                            followers.setdefault(owner, []).append(index)
+                        else:
+                            share(index, owner)
+                        continue
+                    evaluated.append(index)
+                    if claim.text in checkpoint.verdicts:
+                        store(index, checkpoint.verdicts[claim.text], fresh=False)
+                    else:
+                        # Blocks here when the queue is full, which in turn pauses the generation stream.
+                        await queue.put(claim.text, index, ready_at=claim.completed_at)
+
+        queue.start()
+        with tracer.span("pipeline.run", resumed=bool(previous_text)):
+            try:
+                # Claims in the part of the draft that survived are re-dispatched; recorded verdicts are reused.
+                if previous_text and on_text:
+                    on_text(previous_text)
+                await dispatch(segmenter.feed(previous_text))
+
+                with open(output_path, "a", encoding="utf-8") as draft:
+                    def section_complete(index: int):
+                        draft.flush()
+                        checkpoint.completed_sections = index + 1
+                        checkpoint.draft_length = draft.tell()
+                        checkpoint.save()
+                        start = sections[-1]["end"] if sections else len(previous_text)
+                        header = f"\n\n## {checkpoint.outline[index]['title']}\n\n"
+                        sections.append({"index": index, "start": start, "end": written, "body_start": start + len(header),
+                                         "members": None, "repair": None})
+
+                    async for chunk in self.generator.generate_report_stream(
+                            self.source_text, user_prompt, outline=checkpoint.outline,
+                            start_section=checkpoint.completed_sections, previous_text=previous_text,
+                            on_section_complete=section_complete, raise_errors=True):
+                        if print_stream:
+                            print(chunk, end="", flush=True)
+                        draft.write(chunk)
+                        draft_parts.append(chunk)
+                        written += len(chunk)
+                        if on_text:
+                            on_text(chunk)
+                        await dispatch(segmenter.feed(chunk))
+                        seal_sections()
+
+                await dispatch(segmenter.flush())
+                seal_sections()
+                logger.info(f"Draft report saved to {output_path}")
+                logger.info(f"Waiting for {queue.stats['depth']} queued claims to be evaluated...")
+                # Repairs queue their claims behind the draft's, and late verdicts can start more
+                # repairs, so the workers only stop once neither has anything left.
+                while True:
+                    await queue.drain()
+                    repairs = [section["repair"] for section in sections if section["repair"] is not None and not section["repair"].done()]
+                    if not repairs:
+                        break
+                    logger.info(f"Waiting for {len(repairs)} section repairs...")
+                    await asyncio.gather(*repairs)
+                await queue.join()
+            except Exception:
+                # Let claims that were already queued finish so their verdicts are checkpointed.
+                self._cancel_repairs(sections)
+                await queue.join()
+                raise
+            except BaseException:
+                queue.cancel()
+                self._cancel_repairs(sections)
+                raise
+            finally:
+                # Verdicts that finished before an interruption are kept for the next run.
+                checkpoint.save()
             
+        accepted = [section for section in sections if section["repair"] is not None and section["repair"].result()["accepted"]]
+        if accepted:
+            text, results, events = self._splice_repairs("".join(draft_parts), results, accepted, checkpoint.outline)
+            with open(output_path, "w", encoding="utf-8") as draft:
+                draft.write(text)
+            checkpoint.draft_length = os.path.getsize(output_path)
+            for result in results:
+                if result.get("tier") != TIER_ERROR:
+                    checkpoint.verdicts[result["claim"]] = result
+            checkpoint.save()
+            for event in events:
+                if on_repair:
+                    on_repair(event)
+            logger.info(f"Repaired {len(accepted)} sections of {output_path}")
+
+        logger.info(f"Evaluation queue: {queue.stats}")
+        logger.info(f"Claims: {deduplicator.stats}, {self.claim_extractor.skipped} non-factual segments skipped")
+        if self.tiered:
+            logger.info(f"Tier stats: {self.tier_stats(tier_counts)}")
+        logger.info(f"Dispatch latency: {self.dispatch_latency_stats()}")
+        tracer.write_summary()
         return results
 
-    async def evaluate_document(self, generated_text_path: str) -> List[Dict]:
+    async def _repair_section(self, user_prompt: str, section: Dict[str, str], body: str, section_results: List[Dict],
+                              evaluate: Optional[Callable[[List[str]], Awaitable[List[Dict]]]] = None) -> Dict:
+        """
+        Regenerates one section against its flagged claims and their evidence, then evaluates
+        the claims of the rewrite that are not unchanged, already-accepted ones with `evaluate`
+        (the pipeline's queue; evaluate_claims_concurrently by default). Offsets in the
+        returned `results` are relative to the new body.
+        """
+        evaluate = evaluate or self.evaluate_claims_concurrently
+        flagged = [r for r in section_results if r["verdict"].get("requires_revision", True)]
+        flagged_ids = {id(r) for r in flagged}
+        outcome = {"section": section["title"], "flagged_before": len(flagged), "flagged_after": None,
+                   "reverified": 0, "accepted": False}
+        with get_tracer().span("pipeline.repair", section=section["title"], flagged=len(flagged)) as span:
+            try:
+                evidence = await asyncio.gather(*(self.tool_registry.asearch_documents(r["claim"], n_results=2) for r in flagged))
+                new_body = await self.generator.repair_section(
+                    self.source_text, user_prompt, section, body,
+                    [(r["claim"], " ".join(documents)) for r, documents in zip(flagged, evidence)])
+                claims = self.claim_extractor.extract(new_body)
+                supported = {normalize_claim(r["claim"]): r for r in section_results if id(r) not in flagged_ids}
+                changed = [claim for claim in claims if normalize_claim(claim.text) not in supported]
+                unique, owners = deduplicate(changed)
+                evaluated = await evaluate([claim.text for claim in unique])
+                verdicts = iter([evaluated[owner] for owner in owners])
+            except Exception as e:
+                logger.error(f"Repair of section '{section['title']}' failed, keeping the original: {e}")
+                self.repair_stats.append(outcome)
+                return outcome
+
+            results = []
+            for claim in claims:
+                previous = supported.get(normalize_claim(claim.text))
+                result = previous if previous is not None else next(verdicts)
+                results.append({**result, "claim": claim.text, "start": claim.start, "end": claim.end, "repaired": previous is None})
+            flagged_after = sum(1 for r in results if r["verdict"].get("requires_revision", True))
+            outcome.update(flagged_after=flagged_after, reverified=len(unique), body=new_body, results=results,
+                           accepted=bool(new_body.strip()) and flagged_after < len(flagged))
+            span.set(flagged_after=flagged_after, reverified=len(unique), accepted=outcome["accepted"])
+        logger.info(f"Repair of section '{section['title']}': {len(flagged)} -> {flagged_after} flagged claims "
+                    f"({len(unique)} re-evaluated), {'accepted' if outcome['accepted'] else 'rejected'}")
+        self.repair_stats.append({k: v for k, v in outcome.items() if k not in ("body", "results")})
+        return outcome
+
+    @staticmethod
+    def _cancel_repairs(sections: List[Dict]):
+        for section in sections:
+            if section["repair"] is not None:
+                section["repair"].cancel()
+
+    @staticmethod
+    def _splice_repairs(text: str, results: List[Dict], accepted: List[Dict], outline: List[Dict[str, str]]):
+        """
+        Replaces the body of every accepted section with its repair. Returns the new draft, all
+        results re-based onto it in document order, and one event per repair (see on_repair).
         """
-        Reads a generated report, breaks it down into robust chunks,
+        owners = {id(r): results[r["duplicate_of"]] for r in results if "duplicate_of" in r}
+        pieces, kept, events = [], [], []
+        cursor = shift = 0
+        shifts = []  # (section start, section end, cumulative shift after the section), original offsets
+        for section in sorted(accepted, key=lambda s: s["start"]):
+            repair = section["repair"].result()
+            new_start = section["body_start"] + shift
+            pieces += [text[cursor:section["body_start"]], repair["body"]]
+            cursor = section["end"]
+            new_results = [{**r, "start": r["start"] + new_start, "end": r["end"] + new_start} for r in repair["results"]]
+            kept += new_results
+            events.append({"section": outline[section["index"]]["title"], "start": new_start,
+                           "end": new_start + section["end"] - section["body_start"], "text": repair["body"],
+                           "results": new_results, "flagged_before": repair["flagged_before"], "flagged_after": repair["flagged_after"]})
+            shift += len(repair["body"]) - (section["end"] - section["body_start"])
+            shifts.append((section["start"], section["end"], shift))
+        pieces.append(text[cursor:])
+
+        # The draft's results were already handed to on_result and the checkpoint, so they are
+        # copied rather than re-based in place; `originals` maps each copy back for duplicate_of.
+        originals = {}
+        for result in results:
+            if any(start <= result["start"] < end for start, end, _ in shifts):
+                continue
+            delta = next((total for _, end, total in reversed(shifts) if end <= result["start"]), 0)
+            copy = {**result, "start": result["start"] + delta, "end": result["end"] + delta}
+            originals[id(copy)] = result
+            kept.append(copy)
+
+        kept.sort(key=lambda r: r["start"])
+        positions = {id(originals.get(id(r), r)): i for i, r in enumerate(kept)}
+        for result in kept:
+            owner = owners.get(id(originals.get(id(result), result)))
+            if owner is not None and id(owner) in positions:
+                result["duplicate_of"] = positions[id(owner)]
+            else:
+                result.pop("duplicate_of", None)
+        return "".join(pieces), kept, events
+
+    async def stream_events(self, user_prompt: str, output_path: str) -> AsyncIterator[Dict]:
+        """
+        Runs `generate_and_evaluate_pipeline` and yields its progress as it happens:
+
+        - {"type": "text", "offset", "text"} for every chunk of draft text,
+        - {"type": "verdict", "claim", "start", "end", "verdict", "tier"} as each claim is judged,
+          with offsets into the draft,
+        - {"type": "repair", "section", "start", "end", "text", "results", ...} for each section
+          rewritten by the repair stage (see `on_repair` of generate_and_evaluate_pipeline),
+        - a final {"type": "done", "claims", "flagged"}.
+
+        Closing the generator early cancels the pipeline; its checkpoint allows a later resume.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        written = 0
+
+        def on_text(text: str):
+            nonlocal written
+            events.put_nowait({"type": "text", "offset": written, "text": text})
+            written += len(text)
+
+        def on_result(result: Dict):
+            events.put_nowait({"type": "verdict", **result})
+
+        def on_repair(repair: Dict):
+            events.put_nowait({"type": "repair", **repair})
+
+        pipeline = asyncio.create_task(self.generate_and_evaluate_pipeline(user_prompt, output_path, on_result=on_result,
+                                                                           on_text=on_text, on_repair=on_repair))
+        pipeline.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            results = pipeline.result()
+            yield {"type": "done", "claims": len(results), "flagged": sum(1 for r in results if r["verdict"].get("requires_revision", True))}
+        finally:
+            if not pipeline.done():
+                pipeline.cancel()
+                try:
+                    await pipeline
+                except asyncio.CancelledError:
+                    pass
+
+    def _draft_run_key(self, user_prompt: str) -> str:
+        return DraftCheckpoint.make_run_key(user_prompt, self.tool_registry.corpus_fingerprint,
+                                            self.evaluator.model, self.generator.num_sections)
+
+    def dispatch_latency_stats(self) -> Dict:
+        """Percentiles (in ms) of the delay between a sentence completing and its evaluation starting."""
+        if not self.dispatch_latencies:
+            return {"count": 0}
+        ordered = sorted(self.dispatch_latencies)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+        return {"count": len(ordered), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": round(ordered[-1] * 1000, 3)}
+
+    async def evaluate_document(self, generated_text_path: str, batched: bool = False) -> List[Dict]:
+        """
+        Reads a generated report, breaks it down into atomic factual claims,
         and sends them to the EvaluatorAgent for strictly verified scoring asynchronously.
+        With `batched=True`, claims are packed into multi-claim requests.
+        Duplicate claims are evaluated once; every claim gets a result with `start`/`end`
+        offsets into the report, and repeats also carry `duplicate_of` (the index of the
+        result they share).
         """
         generated_text = self._load_file(generated_text_path)
         if not generated_text:
             return []
 
-        claims = self._robust_sentence_chunking(generated_text)
-        return await self.evaluate_claims_concurrently(claims)
+        claims = self.claim_extractor.extract(generated_text)
+        unique, owners = deduplicate(claims)
+        logger.info(f"{len(claims)} claims extracted, {len(unique)} left to evaluate after deduplication")
+        tier_counts = self._start_tier_counts()
+        with get_tracer().span("document.evaluate", claims=len(claims), evaluated=len(unique), batched=batched):
+            texts = [claim.text for claim in unique]
+            if batched:
+                verdicts = await self.evaluate_claims_batched(texts)
+            else:
+                verdicts = await self.evaluate_claims_concurrently(texts)
+        if self.tiered:
+            logger.info(f"Tier stats: {self.tier_stats(tier_counts)}")
+        get_tracer().write_summary()
+
+        first = {}  # unique index -> result index of its first occurrence
+        results = []
+        for claim, owner in zip(claims, owners):
+            result = {**verdicts[owner], "claim": claim.text, "start": claim.start, "end": claim.end}
+            if owner in first:
+                result["duplicate_of"] = first[owner]
+            else:
+                first[owner] = len(results)
+            results.append(result)
+        return results
@@ -0,0 +1,57 @@
+import hashlib
+import logging
+import re
+from typing import Dict, List, Optional
+
+from tiered_store import TieredStore
+from tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class PlanCache:
+    """
+    Cache of report plans: the outline, with a summary and a source digest per section.
+
+    Keys are derived from the normalized prompt, a fingerprint of the source corpus, the
+    generator model and the planning settings, so regenerating a report for the same corpus
+    and an equivalent prompt skips the outline call. Entries live in a TieredStore, like
+    VerdictCache's, in a `plans` table of a database that may be the verdict cache's file.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_memory_entries: int = 256,
+                 max_disk_entries: int = 10_000, ttl_seconds: Optional[float] = 30 * 24 * 3600):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._store = TieredStore("plans", "plan", db_path=db_path, max_memory_entries=max_memory_entries,
+                                  max_disk_entries=max_disk_entries, ttl_seconds=ttl_seconds)
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Lower-cased words only, so case, spacing and punctuation don't change the plan."""
+        return " ".join(re.findall(r"[\w%]+", prompt.lower()))
+
+    def make_key(self, user_prompt: str, corpus_fingerprint: str, model: str, num_sections: int, settings: str = "") -> str:
+        payload = "\x1f".join([self.normalize_prompt(user_prompt), corpus_fingerprint, model, str(num_sections), settings])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, str]]]:
+        plan, _ = self._store.get(key)
+        self._stats["hits" if plan is not None else "misses"] += 1
+        get_tracer().count("plan_cache", outcome="hit" if plan is not None else "miss")
+        return [dict(section) for section in plan] if plan is not None else None
+
+    def set(self, key: str, plan: List[Dict[str, str]]):
+        self._store.set(key, [dict(section) for section in plan])
+        self._stats["stores"] += 1
+
+    @property
+    def stats(self) -> dict:
+        return {**self._stats, "memory_entries": self._store.memory_entries}
+
+    def close(self):
+        self._store.close()
@@ -0,0 +1,288 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import re
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lower value = served first. Streaming generation is user-facing, so it always
+# jumps ahead of queued evaluator calls.
+PRIORITY_GENERATOR = 0
+PRIORITY_EVALUATOR = 10
+
+def _stage(priority: int) -> str:
+    """Low-cardinality label for traces and metrics."""
+    return "generator" if priority <= PRIORITY_GENERATOR else "evaluator"
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt budgeting."""
+    return len(text) // 4 + 1
+
+def estimate_message_tokens(messages: list, expected_output_tokens: int = 0) -> int:
+    total = expected_output_tokens
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+        total += estimate_tokens(content or "")
+    return total
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parses Groq reset durations such as '7.66s', '2m59.56s' or '120ms' into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, matched = 0.0, False
+    for amount, unit in re.findall(r'([0-9.]+)(ms|h|m|s)', value):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}[unit]
+    return total if matched else None
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    if getattr(e, "status_code", None) == 429:
+        return True
+    error_str = str(e).lower()
+    return "429" in error_str or "rate limit" in error_str
+
+
+class _TokenBucket:
+    """
+    Budget that refills continuously at `capacity` per minute. Its state is a
+    [capacity, level, updated_at] slice of `state`, which may be a shared-memory array
+    (see RateLimiter.shared_state) so several processes draw from the same bucket. Callers
+    hold RateLimiter._lock across refill, check and consume.
+    """
+
+    def __init__(self, per_minute: float, state=None, offset: int = 0):
+        self._state = state if state is not None else [float(per_minute), float(per_minute), time.monotonic()]
+        self._offset = offset
+
+    capacity = property(lambda self: self._state[self._offset], lambda self, value: self._state.__setitem__(self._offset, value))
+    level = property(lambda self: self._state[self._offset + 1], lambda self, value: self._state.__setitem__(self._offset + 1, value))
+    updated_at = property(lambda self: self._state[self._offset + 2], lambda self, value: self._state.__setitem__(self._offset + 2, value))
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.capacity / 60.0)
+        self.updated_at = now
+
+    def seconds_until(self, amount: float) -> float:
+        # A single request larger than the whole bucket is allowed once the bucket is full.
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+
+class RateLimiter:
+    """
+    Process-wide pacer for Groq calls.
+
+    Tracks request-per-minute and token-per-minute budgets as token buckets, syncs them
+    with the `x-ratelimit-*` / `retry-after` headers returned by the API, and hands out
+    call slots in priority order so generator streams are never stuck behind evaluator work.
+    """
+
+    def __init__(self, requests_per_minute: float = 30, tokens_per_minute: float = 12000, max_retries: int = 5, base_delay: float = 2.0,
+                 shared_state=None):
+        """
+        With `shared_state` (from `RateLimiter.shared_state`), the budgets live in shared memory
+        and every process built from the same state paces against one global budget; the
+        per-minute arguments are then ignored. Updates hold the array's lock, so two processes
+        can't both spend the last slot.
+        """
+        self._shared_state = shared_state if shared_state is not None else self.shared_state(requests_per_minute, tokens_per_minute, context=None)
+        # Shared-memory arrays carry a cross-process (re-entrant) lock; a plain list is only
+        # touched from one event loop.
+        get_lock = getattr(self._shared_state, "get_lock", None)
+        self._lock = get_lock() if get_lock is not None else contextlib.nullcontext()
+        self._requests = _TokenBucket(requests_per_minute, self._shared_state, 0)
+        self._tokens = _TokenBucket(tokens_per_minute, self._shared_state, 3)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop = None
+        self.stats = {"calls": 0, "rate_limited": 0, "paced_waits": 0, "paced_seconds": 0.0}
+
+    @staticmethod
+    def shared_state(requests_per_minute: float, tokens_per_minute: float, context=multiprocessing):
+        """
+        Budget state for RateLimiter(shared_state=...): a shared-memory array from the given
+        multiprocessing `context`, or a plain list when `context` is None.
+        """
+        now = time.monotonic()
+        values = [float(requests_per_minute), float(requests_per_minute), now,
+                  float(tokens_per_minute), float(tokens_per_minute), now, 0.0]
+        return context.Array("d", values) if context is not None else values
+
+    @property
+    def _blocked_until(self) -> float:
+        return self._shared_state[6]
+
+    @_blocked_until.setter
+    def _blocked_until(self, value: float):
+        self._shared_state[6] = value
+
+    def _get_condition(self) -> asyncio.Condition:
+        # asyncio primitives are bound to one event loop; scripts and tests may run several.
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+            self._waiters = []
+        return self._condition
+
+    def _block_for(self, seconds: float):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _try_consume(self, estimated_tokens: int) -> float:
+        """Takes one call from the budgets if they allow it now; otherwise returns how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            wait = max(
+                self._blocked_until - now,
+                self._requests.seconds_until(1),
+                self._tokens.seconds_until(estimated_tokens),
+            )
+            if wait <= 0:
+                self._requests.level -= 1
+                self._tokens.level -= min(estimated_tokens, self._tokens.capacity)
+            return wait
+
+    async def acquire(self, estimated_tokens: int, priority: int = PRIORITY_EVALUATOR):
+        """Waits until the budgets allow one more call and this caller is first in line."""
+        condition = self._get_condition()
+        entry = (priority, next(self._sequence))
+        async with condition:
+            heapq.heappush(self._waiters, entry)
+            started = time.monotonic()
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        timeout = self._try_consume(estimated_tokens)
+                        if timeout <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                condition.notify_all()
+
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self.stats["paced_waits"] += 1
+                self.stats["paced_seconds"] += waited
+                get_tracer().record("ratelimit.wait", waited, stage=_stage(priority))
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Corrects the token bucket once the real usage of a call is known."""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + estimated_tokens - actual_tokens)
+
+    def observe_headers(self, headers):
+        """Syncs the budgets with Groq's rate-limit headers."""
+        if not headers:
+            return
+        with self._lock:
+            now = time.monotonic()
+
+            limit_tokens = headers.get("x-ratelimit-limit-tokens")
+            if limit_tokens:
+                try:
+                    self._tokens.capacity = float(limit_tokens)
+                except ValueError:
+                    pass
+
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            if remaining_tokens:
+                try:
+                    self._tokens.refill(now)
+                    self._tokens.level = min(self._tokens.level, float(remaining_tokens))
+                except ValueError:
+                    pass
+
+            # Groq reports the daily request budget in the request headers; once it is
+            # exhausted nothing can go out until it resets.
+            remaining_requests = headers.get("x-ratelimit-remaining-requests")
+            if remaining_requests == "0":
+                reset = _parse_duration(headers.get("x-ratelimit-reset-requests", ""))
+                if reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+            retry_after = _parse_duration(headers.get("retry-after", ""))
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    async def call(self, request: Callable[[], Awaitable[T]], priority: int = PRIORITY_EVALUATOR, estimated_tokens: int = 1000, description: str = "request") -> T:
+        """
+        Paces `request` against the shared budgets and retries it on 429s.
+        Non rate-limit errors, and rate-limit errors after `max_retries`, are re-raised.
+        """
+        tracer = get_tracer()
+        for attempt in range(self.max_retries):
+            await self.acquire(estimated_tokens, priority)
+            self.stats["calls"] += 1
+            try:
+                with tracer.span("llm.call", stage=_stage(priority), description=description, attempt=attempt):
+                    result = await request()
+            except Exception as e:
+                if not _is_rate_limit_error(e) or attempt == self.max_retries - 1:
+                    raise
+                self.stats["rate_limited"] += 1
+                response = getattr(e, "response", None)
+                self.observe_headers(getattr(response, "headers", None))
+
+                match = re.search(r'try again in ((?:[0-9.]+(?:ms|h|m|s))+)', str(e).lower())
+                hinted = _parse_duration(match.group(1)) if match else None
+                delay = hinted + 1.0 if hinted else self.base_delay * (2 ** attempt)
+                self._block_for(delay)
+                tracer.count("llm.retries", stage=_stage(priority))
+                tracer.record("ratelimit.retry_delay", delay, stage=_stage(priority))
+                logger.warning(f"Rate limit reached. Retrying {description} in {delay:.2f}s (Attempt {attempt + 1}/{self.max_retries})...")
+                continue
+
+            usage = getattr(result, "usage", None)
+            tracer.record_usage(_stage(priority), usage)
+            total_tokens = getattr(usage, "total_tokens", None)
+            self.record_usage(estimated_tokens, total_tokens if isinstance(total_tokens, int) else None)
+            return result
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter, configured from GROQ_RPM_LIMIT / GROQ_TPM_LIMIT."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(
+            requests_per_minute=float(os.environ.get("GROQ_RPM_LIMIT", 30)),
+            tokens_per_minute=float(os.environ.get("GROQ_TPM_LIMIT", 12000)),
+        )
+    return _rate_limiter
+
+def set_rate_limiter(limiter: Optional[RateLimiter]):
+    """Replaces the process-wide limiter (e.g. to apply a different tier's budgets)."""
+    global _rate_limiter
+    _rate_limiter = limiter
@@ -18,8 +18,13 @@ async def main():
     scenario_dir = os.path.join(script_dir, "..", "scenario")
     
     source_file = os.path.join(scenario_dir, "source_knowledge.txt")
-    orchestrator = Orchestrator(source_text_path=source_file, model=model_name, num_sections=5)
-    print("Context loaded successfully into ChromaDB!")
+    cache_file = os.path.join(scenario_dir, ".verdict_cache.sqlite3")
+    index_dir = os.path.join(scenario_dir, ".vector_index")
+    async with Orchestrator(source_text_path=source_file, model=model_name, num_sections=5, cache_path=cache_file, index_path=index_dir) as orchestrator:
+        print("Context loaded successfully into ChromaDB!")
+        await run_scenario(orchestrator, scenario_dir)
+
+async def run_scenario(orchestrator: Orchestrator, scenario_dir: str):
 
     generated_file = os.path.join(scenario_dir, "mocked_generation.md")
     print(f"Beginning statement-by-statement evaluation of {generated_file}...")
@@ -44,16 +49,17 @@ async def main():
     print(f"\nUser provides the topic: '{user_prompt}'")
     print("System will OVERRIDE this and force a 5-20 page generation about Brazilian Mangos (Prototype constraint).")
 
-    print("\n1. Generating new draft...")
-    dynamic_results = await orchestrator.generate_and_evaluate_pipeline(user_prompt, output_file)
+    print("\n1. Generating new draft; verdicts are printed as soon as each claim is checked...")
+    async for event in orchestrator.stream_events(user_prompt, output_file):
+        if event["type"] == "verdict":
+            if event["verdict"].get("requires_revision", True):
+                print(f"🚨 Hallucination found in dynamic generation (chars {event['start']}-{event['end']}): {event['claim']}")
+            else:
+                print(f"✅ Verified Fact: {event['claim']}")
+        elif event["type"] == "done":
+            print(f"\n2. Evaluation Complete! {event['flagged']} of {event['claims']} claims flagged.")
 
-    print("\n2. Evaluation Complete! Let's see if the generator hallucinated anything this time:")
-    for idx, r in enumerate(dynamic_results):
-        verdict = r['verdict']
-        if verdict.get('requires_revision', True):
-            print(f"🚨 Hallucination found in dynamic generation: {r['claim']}")
-        else:
-            print(f"✅ Verified Fact: {r['claim']}")
+    print(f"\nVerdict cache stats: {orchestrator.verdict_cache.stats}")
 
 if __name__ == "__main__":
     asyncio.run(main())
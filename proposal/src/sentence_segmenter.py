@@ -0,0 +1,166 @@
+import re
+import time
+from typing import List, NamedTuple, Optional
+
+# Tokens that end in a period without ending the sentence.
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "e.g", "i.e", "cf", "al",
+    "approx", "ca", "fig", "figs", "no", "nos", "vol", "pp", "inc", "ltd", "co", "corp",
+    "dept", "est", "u.s", "u.k", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep",
+    "sept", "oct", "nov", "dec",
+}
+
+CLOSERS = "\"')]*_”’"
+LIST_MARKER = re.compile(r"\s*(?:[-*+]|\d+[.)])\s")
+# Characters that may end a unit; everything between them is skipped in one search.
+BREAK_CHARS = re.compile(r"[\n.!?]")
+NON_BLANK = re.compile(r"\S")
+
+KIND_SENTENCE = "sentence"
+KIND_HEADER = "header"
+KIND_LIST_ITEM = "list_item"
+KIND_TABLE_ROW = "table_row"
+
+
+class Segment(NamedTuple):
+    text: str
+    start: int  # offset of the first character in the full stream
+    end: int  # offset one past the last character in the full stream
+    kind: str
+    completed_at: float  # time.perf_counter() when the unit was recognised as complete
+
+
+class StreamingSentenceSegmenter:
+    """
+    Incremental sentence/claim segmenter for streamed Markdown.
+
+    Each `feed` call scans only the characters it has not seen before and returns every
+    unit that became complete. Only the current (unfinished) unit is buffered, and the
+    current line's kind is worked out once, so feeding a long paragraph token by token
+    stays linear. Periods in decimals, abbreviations, initials and ordered-list markers
+    don't end a sentence; headers, list items and table rows end at their newline.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._buffer_offset = 0  # stream offset of self._buffer[0], where the unfinished unit starts
+        self._scan = 0
+        self._new_line(0)
+
+    def _new_line(self, offset: int):
+        self._line_start = offset  # stream offset of the current line
+        self._line_lead: Optional[str] = None  # its first non-blank character, once found
+        self._line_lead_at = -1  # stream offset of that character
+        self._first_unit = True  # whether the buffered unit opens the line
+
+    def feed(self, text: str) -> List[Segment]:
+        buf = self._buffer + text
+        segments: List[Segment] = []
+        unit_start = 0
+        i = self._scan
+
+        while True:
+            match = BREAK_CHARS.search(buf, i)
+            if match is None:
+                i = len(buf)
+                break
+            i = match.start()
+            if buf[i] == "\n":
+                self._emit(segments, buf, unit_start, i)
+                i = unit_start = i + 1
+                self._new_line(self._buffer_offset + i)
+                continue
+            boundary = self._boundary_after(buf, i)
+            if boundary is None:
+                # Not enough lookahead yet; resume here on the next feed.
+                break
+            if boundary:
+                self._emit(segments, buf, unit_start, boundary)
+                i = unit_start = boundary
+                self._first_unit = False
+                continue
+            i += 1
+
+        self._buffer = buf[unit_start:]
+        self._buffer_offset += unit_start
+        self._scan = i - unit_start
+        return segments
+
+    def flush(self) -> List[Segment]:
+        """Emits whatever is left once the stream has ended."""
+        segments: List[Segment] = []
+        self._emit(segments, self._buffer, 0, len(self._buffer))
+        self._buffer_offset += len(self._buffer)
+        self._buffer = ""
+        self._scan = 0
+        self._new_line(self._buffer_offset)
+        return segments
+
+    @staticmethod
+    def _line_kind(line: str) -> str:
+        stripped = line.lstrip()
+        if stripped.startswith("#"):
+            return KIND_HEADER
+        if stripped.startswith("|"):
+            return KIND_TABLE_ROW
+        if LIST_MARKER.match(line):
+            return KIND_LIST_ITEM
+        return KIND_SENTENCE
+
+    def _lead(self, buf: str) -> str:
+        """First non-blank character of the current line, searched for once per line."""
+        if self._line_lead is None:
+            # Until it is found the buffered unit opens the line, so the line start is buffered.
+            match = NON_BLANK.search(buf, self._line_start - self._buffer_offset)
+            if match is None:
+                return ""
+            self._line_lead, self._line_lead_at = match.group(), self._buffer_offset + match.start()
+        return self._line_lead
+
+    def _boundary_after(self, buf: str, i: int) -> Optional[int]:
+        """
+        Decides whether the punctuation at `buf[i]` ends a unit. Returns the index just past
+        the unit, 0 if it is not a boundary, or None if more input is needed to decide.
+        """
+        if self._lead(buf) in ("#", "|"):
+            return 0
+
+        j = i + 1
+        while j < len(buf) and (buf[j] in CLOSERS or buf[j] in ".!?"):
+            j += 1
+        if j == len(buf):
+            return None
+        if not buf[j].isspace():
+            # "3.5", "e.g.," or a URL: punctuation inside a token.
+            return 0
+
+        if buf[i] == ".":
+            word_start = i
+            while word_start > 0 and not buf[word_start - 1].isspace():
+                word_start -= 1
+            word = buf[word_start:i].lstrip(CLOSERS + "(")
+            if word.lower() in ABBREVIATIONS:
+                return 0
+            if len(word) == 1 and word.isupper():
+                return 0  # an initial, as in "J. Smith"
+            if word.isdigit() and self._line_lead_at == self._buffer_offset + word_start:
+                return 0  # ordered-list marker "1."
+
+        k = j
+        while k < len(buf) and buf[k] in " \t":
+            k += 1
+        if k == len(buf):
+            return None
+        if buf[k].islower():
+            return 0
+        return j
+
+    def _emit(self, segments: List[Segment], buf: str, start: int, end: int):
+        raw = buf[start:end]
+        text = raw.strip()
+        if not any(c.isalnum() for c in text):
+            return
+        leading = len(raw) - len(raw.lstrip())
+        absolute_start = self._buffer_offset + start + leading
+        kind = self._line_kind(raw) if self._first_unit else KIND_SENTENCE
+        segments.append(Segment(text, absolute_start, absolute_start + len(text), kind, time.perf_counter()))
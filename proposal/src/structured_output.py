@@ -0,0 +1,182 @@
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from lazy_imports import LazyImport
+from tracing import get_tracer
+
+jsonschema = LazyImport("jsonschema")
+
+try:
+    import orjson
+
+    def _loads(text: str) -> Any:
+        return orjson.loads(text)
+
+    _FAST_ERRORS = (orjson.JSONDecodeError,)
+except ImportError:  # orjson normally comes with chromadb
+    _loads = json.loads
+    _FAST_ERRORS = (json.JSONDecodeError,)
+
+logger = logging.getLogger(__name__)
+
+_DECODER = json.JSONDecoder()
+
+
+class StructuredOutputError(ValueError):
+    """Model output that holds no JSON value, or one that does not match the expected schema."""
+
+
+def extract_json(text: str) -> Any:
+    """
+    The JSON value in a model reply. The whole reply is tried first (the JSON-mode case, with
+    orjson when available); otherwise the first complete object or array is decoded from the
+    text around it, which copes with code fences, prose before it and trailing remarks.
+    """
+    stripped = (text or "").strip()
+    try:
+        return _loads(stripped)
+    except _FAST_ERRORS:
+        pass
+    for index, char in enumerate(stripped):
+        if char in "{[":
+            try:
+                return _DECODER.raw_decode(stripped, index)[0]
+            except json.JSONDecodeError:
+                continue
+    raise StructuredOutputError("no JSON object found in the reply")
+
+
+class OutputSchema:
+    """
+    A declared JSON Schema for one kind of model output. `prepare` may normalize the decoded
+    value first (unwrap an envelope, coerce "0.8"/"true" strings); `hint` describes the
+    expected shape in the corrective prompt.
+    """
+
+    def __init__(self, name: str, schema: Dict, hint: str, prepare: Optional[Callable[[Any], Any]] = None):
+        self.name = name
+        self.hint = hint
+        self.prepare = prepare
+        self.schema = schema
+        self._validator = None
+
+    def parse(self, content: str) -> Any:
+        value = extract_json(content)
+        if self.prepare is not None:
+            value = self.prepare(value)
+        if self._validator is None:
+            self._validator = jsonschema.Draft202012Validator(self.schema)
+        error = next(iter(self._validator.iter_errors(value)), None)
+        if error is not None:
+            location = "/".join(str(part) for part in error.absolute_path)
+            raise StructuredOutputError(f"{location + ': ' if location else ''}{error.message}")
+        return value
+
+
+def _coerce_verdict(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    value = dict(value)
+    score = value.get("faithfulness_score")
+    if isinstance(score, str):
+        try:
+            value["faithfulness_score"] = float(score)
+        except ValueError:
+            pass
+    flag = value.get("requires_revision")
+    if isinstance(flag, str) and flag.strip().lower() in ("true", "false"):
+        value["requires_revision"] = flag.strip().lower() == "true"
+    value.setdefault("rationale", "")
+    return value
+
+
+def _prepare_batch(value: Any) -> Any:
+    if isinstance(value, dict) and isinstance(value.get("verdicts"), list):
+        return {**value, "verdicts": [_coerce_verdict(entry) for entry in value["verdicts"]]}
+    return value
+
+
+def _unwrap_outline(value: Any) -> Any:
+    # JSON mode only returns objects, so an outline array arrives inside some envelope key.
+    if isinstance(value, dict):
+        lists = [v for v in value.values() if isinstance(v, list)]
+        if len(lists) == 1:
+            return lists[0]
+    return value
+
+
+_VERDICT_PROPERTIES = {
+    "faithfulness_score": {"type": "number", "minimum": 0, "maximum": 1},
+    "requires_revision": {"type": "boolean"},
+    "rationale": {"type": "string"},
+}
+
+VERDICT_SCHEMA = OutputSchema(
+    "verdict",
+    {"type": "object", "required": ["faithfulness_score", "requires_revision"], "properties": _VERDICT_PROPERTIES},
+    'a JSON object {"faithfulness_score": <number 0-1>, "requires_revision": <true|false>, "rationale": "<string>"}',
+    prepare=_coerce_verdict,
+)
+
+BATCH_VERDICTS_SCHEMA = OutputSchema(
+    "batch_verdicts",
+    {
+        "type": "object",
+        "required": ["verdicts"],
+        "properties": {"verdicts": {"type": "array", "items": {
+            "type": "object", "required": ["faithfulness_score", "requires_revision"],
+            "properties": {"id": {"type": ["integer", "string"]}, **_VERDICT_PROPERTIES},
+        }}},
+    },
+    'a JSON object {"verdicts": [{"id": <claim number>, "faithfulness_score": <number 0-1>, '
+    '"requires_revision": <true|false>, "rationale": "<string>"}, ...]} with one entry per claim',
+    prepare=_prepare_batch,
+)
+
+OUTLINE_SCHEMA = OutputSchema(
+    "outline",
+    {
+        "type": "array",
+        "minItems": 1,
+        "items": {"anyOf": [
+            {"type": "string", "minLength": 1},
+            {"type": "object", "required": ["title"], "properties": {"title": {"type": "string", "minLength": 1}, "summary": {"type": "string"}}},
+        ]},
+    },
+    'a JSON object {"sections": [...]} whose array holds the section titles (or {"title", "summary"} objects)',
+    prepare=_unwrap_outline,
+)
+
+
+async def parse_with_repair(schema: OutputSchema, content: str, retry: Callable[[str, str], Awaitable[str]],
+                            check: Optional[Callable[[Any], Any]] = None, max_repairs: int = 1,
+                            stats: Optional[Dict[str, int]] = None) -> Any:
+    """
+    Parses `content` against `schema` (then `check`, which may reshape the value or raise
+    StructuredOutputError). A malformed reply is sent back through `retry(previous_reply,
+    corrective_prompt)` up to `max_repairs` times instead of redoing the whole request.
+    Outcomes are counted as `structured_output{schema,outcome=valid|repaired|failed}` and
+    in `stats`. Raises StructuredOutputError when every attempt is malformed.
+    """
+    tracer = get_tracer()
+
+    def outcome(name: str):
+        tracer.count("structured_output", schema=schema.name, outcome=name)
+        if stats is not None:
+            stats[name] = stats.get(name, 0) + 1
+
+    for attempt in range(max_repairs + 1):
+        try:
+            value = schema.parse(content)
+            value = check(value) if check is not None else value
+        except StructuredOutputError as e:
+            if attempt == max_repairs:
+                outcome("failed")
+                raise
+            logger.warning(f"Malformed {schema.name} output ({e}), asking for a corrected reply")
+            prompt = f"Your previous reply could not be used: {e}. Reply with only {schema.hint}, and no other text."
+            content = await retry(content, prompt)
+            continue
+        outcome("repaired" if attempt else "valid")
+        return value
@@ -0,0 +1,111 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+TIER_MEMORY = "memory"
+TIER_DISK = "disk"
+
+
+class TieredStore:
+    """
+    Key/value store behind VerdictCache and PlanCache: an in-memory LRU tier in front of an
+    optional SQLite table, each with its own size cap, and a TTL on every entry.
+
+    Values must be JSON-serialisable and are returned as stored, so callers copy them before
+    handing them out. Each cache uses its own `table`, so several can share one database file.
+    """
+
+    def __init__(self, table: str, value_column: str = "value", db_path: Optional[str] = None,
+                 max_memory_entries: int = 2048, max_disk_entries: int = 100_000, ttl_seconds: Optional[float] = None,
+                 busy_timeout_seconds: float = 30.0):
+        # Table and column names come from the caches, never from user input.
+        self.table = table
+        self.value_column = value_column
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            # Audit shards in separate processes share one cache file; wait out their write locks.
+            self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_seconds * 1000)}")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"key TEXT PRIMARY KEY, {value_column} TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_access ON {table} (last_access)")
+            self._conn.commit()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: Any):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Returns `(value, tier)` with tier TIER_MEMORY or TIER_DISK, or `(None, None)` on a miss."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if not self._expired(created_at):
+                self._memory.move_to_end(key)
+                return value, TIER_MEMORY
+            del self._memory[key]
+
+        if self._conn is None:
+            return None, None
+        row = self._conn.execute(f"SELECT {self.value_column}, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        value_json, created_at = row
+        if self._expired(created_at):
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+            return None, None
+        self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        value = json.loads(value_json)
+        self._remember(key, created_at, value)
+        return value, TIER_DISK
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        self._remember(key, now, value)
+        if self._conn is None:
+            return
+
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, {self.value_column}, created_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now, now),
+        )
+        if self.ttl_seconds is not None:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+        self._conn.commit()
+
+    @property
+    def memory_entries(self) -> int:
+        return len(self._memory)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,12 +1,113 @@
+import asyncio
 import json
-import chromadb
-from typing import List
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+from lazy_imports import LazyImport
+from tracing import get_tracer
+
+chromadb = LazyImport("chromadb")
+embedding_functions = LazyImport("chromadb.utils.embedding_functions")
+ONNXMiniLM_L6_V2 = LazyImport("chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2", "ONNXMiniLM_L6_V2")
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_DENSE = "dense"
+RETRIEVAL_HYBRID = "hybrid"
+EVIDENCE_CHUNKS = "chunks"
+EVIDENCE_SENTENCES = "sentences"
+
+# Figures and capitalised names: what a near-verbatim claim must state in the source's order.
+ANCHOR = re.compile(r"\d+(?:[.,]\d+)*%?|\b[A-Z][\w-]*")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])|\n+")
+
+_default_embedding_function = None
+_default_embedding_lock = threading.Lock()
+
+def _create_default_embedding_function():
+    """
+    Chroma's DefaultEmbeddingFunction builds a new ONNXMiniLM_L6_V2, and so re-reads the
+    tokenizer and re-opens the onnxruntime session, on every call. This subclass keeps one
+    model instance; it is still named "default", so persisted collections open unchanged.
+    """
+    class SharedDefaultEmbeddingFunction(embedding_functions.DefaultEmbeddingFunction):
+        def __init__(self):
+            super().__init__()
+            self.onnx_model = ONNXMiniLM_L6_V2()
+
+        def __call__(self, input):
+            return self.onnx_model(input)
+
+    return SharedDefaultEmbeddingFunction()
+
+def get_default_embedding_function():
+    """
+    Chroma's default embedding model, created on first use and shared by every registry in
+    the process, so a worker that indexes several corpora loads the model once.
+    """
+    global _default_embedding_function
+    with _default_embedding_lock:
+        if _default_embedding_function is None:
+            _default_embedding_function = _create_default_embedding_function()
+        return _default_embedding_function
+
+def set_default_embedding_function(embedding_function):
+    """Replaces the process-wide default embedding model (None loads Chroma's again on next use)."""
+    global _default_embedding_function
+    _default_embedding_function = embedding_function
+
+def _reopen_model_after_fork():
+    # Neither the onnxruntime session nor the Rust tokenizer survives fork (their thread pools
+    # stay in the parent), so a forked worker drops both and re-opens them from disk on first use.
+    onnx_model = getattr(_default_embedding_function, "onnx_model", None)
+    if onnx_model is not None:
+        vars(onnx_model).pop("model", None)
+        vars(onnx_model).pop("tokenizer", None)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reopen_model_after_fork)
 
 class ToolRegistry:
-    def __init__(self, collection_name: str = "source_knowledge"):
-        self.chroma_client = chromadb.Client()
-        # In-memory ephemeral DB by default
-        self.collection = self.chroma_client.get_or_create_collection(name=collection_name)
+    def __init__(self, collection_name: str = "source_knowledge", persist_directory: Optional[str] = None, read_only: bool = False,
+                 embedding_function=None, cache_size: int = 4096, max_workers: int = 4,
+                 retrieval_mode: str = RETRIEVAL_HYBRID, n_results: int = 2,
+                 evidence_mode: str = EVIDENCE_CHUNKS, max_evidence_sentences: int = 4):
+        """
+        By default the vector DB is in-memory and ephemeral, and created on first use. With `persist_directory`,
+        embeddings are stored on disk and reused across processes; `read_only` opens an
+        existing index without ever writing to it (e.g. for worker processes).
+        Query embeddings and search results are kept in LRU caches of `cache_size` entries,
+        and the `a*` methods run retrieval on a pool of `max_workers` threads.
+        Evidence for the evaluator fuses dense and BM25 rankings in `hybrid` mode and can be
+        trimmed to the best-matching sentences with `evidence_mode="sentences"`.
+        Without `embedding_function`, Chroma's default model is shared process-wide
+        (see get_default_embedding_function).
+        """
+        self.read_only = read_only
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        self._embedding_function = embedding_function
+        self._chroma_client = None
+        self._collection = None
+        self._backend_lock = threading.Lock()
+        self.cache_size = cache_size
+        self._embedding_cache: "OrderedDict[str, list]" = OrderedDict()
+        self._result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retrieval")
+        self.retrieval_mode = retrieval_mode
+        self.n_results = n_results
+        self.evidence_mode = evidence_mode
+        self.max_evidence_sentences = max_evidence_sentences
+        self.bm25 = BM25Index()
+        self._documents: Dict[str, str] = {}
+        self._corpus_hash = hashlib.sha256()
         
         # Define the tools available to the Evaluator LLM
         self.tools = [
@@ -29,53 +130,285 @@ class ToolRegistry:
             }
         ]
 
+    @property
+    def embedding_function(self):
+        if self._embedding_function is None:
+            self._embedding_function = get_default_embedding_function()
+        return self._embedding_function
+
+    @property
+    def chroma_client(self):
+        with self._backend_lock:
+            if self._chroma_client is None:
+                if self.persist_directory:
+                    self._chroma_client = chromadb.PersistentClient(path=self.persist_directory)
+                else:
+                    self._chroma_client = chromadb.Client()
+            return self._chroma_client
+
+    @property
+    def collection(self):
+        """The Chroma collection, opened (and ChromaDB imported) on first use."""
+        if self._collection is None:
+            client = self.chroma_client
+            with self._backend_lock:
+                if self._collection is None:
+                    if self.read_only:
+                        self._collection = client.get_collection(name=self.collection_name, embedding_function=self.embedding_function)
+                    else:
+                        self._collection = client.get_or_create_collection(name=self.collection_name, embedding_function=self.embedding_function)
+        return self._collection
+
+    @staticmethod
+    def chunk_id(chunk: str) -> str:
+        """Content-addressed id, so reloading the same chunk never collides or re-embeds."""
+        return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+    def _add_missing(self, text_chunks: List[str], existing_ids: set) -> int:
+        unique = {self.chunk_id(chunk): chunk for chunk in text_chunks}
+        new_ids = [chunk_id for chunk_id in unique if chunk_id not in existing_ids]
+        if new_ids and not self.read_only:
+            self._clear_result_cache()
+            self.collection.add(
+                documents=[unique[chunk_id] for chunk_id in new_ids],
+                ids=new_ids
+            )
+        return len(new_ids)
+
     def load_context(self, text_chunks: List[str]):
-        """Loads factual context into the Vector Database."""
+        """Loads factual context into the Vector Database, skipping chunks that are already indexed."""
         if not text_chunks:
             return
             
         # Optional: chunking could happen here. We assume chunks are pre-split.
-        ids = [str(i) for i in range(len(text_chunks))]
-        self.collection.add(
-            documents=text_chunks,
-            ids=ids
-        )
+        existing_ids = set(self.collection.get(ids=[self.chunk_id(c) for c in text_chunks], include=[])["ids"])
+        self._add_missing(text_chunks, existing_ids)
+        self._index_lexical(text_chunks)
+        for chunk in text_chunks:
+            self._corpus_hash.update(chunk.encode("utf-8") + b"\x00")
+
+    def sync_context(self, text_chunks: List[str], source_hash: str):
+        """
+        Makes the collection hold exactly `text_chunks`. If the collection was last synced
+        against the same `source_hash` nothing is touched; otherwise only added or changed
+        chunks are embedded and chunks no longer in the source are removed.
+        """
+        for chunk in text_chunks:
+            self._corpus_hash.update(chunk.encode("utf-8") + b"\x00")
+        current_ids = {self.chunk_id(chunk) for chunk in text_chunks}
+        for stale_id in set(self._documents) - current_ids:
+            self.bm25.remove(stale_id)
+            del self._documents[stale_id]
+        self._index_lexical(text_chunks)
+        self._clear_result_cache()
+
+        metadata = self.collection.metadata or {}
+        if metadata.get("source_hash") == source_hash:
+            logger.info(f"Vector index '{self.collection.name}' is up to date, skipping embedding.")
+            return
+        if self.read_only:
+            logger.warning(f"Read-only vector index '{self.collection.name}' is stale for the current source; using it as-is.")
+            return
+
+        existing_ids = set(self.collection.get(include=[])["ids"])
+        stale_ids = list(existing_ids - current_ids)
+        if stale_ids:
+            self._clear_result_cache()
+            self.collection.delete(ids=stale_ids)
+        added = self._add_missing(text_chunks, existing_ids)
+        # Distance settings can't be changed after creation, so only carry over user metadata.
+        user_metadata = {k: v for k, v in metadata.items() if not k.startswith("hnsw:")}
+        self.collection.modify(metadata={**user_metadata, "source_hash": source_hash})
+        logger.info(f"Synced vector index '{self.collection.name}': {added} chunks embedded, {len(stale_ids)} removed, {len(current_ids) - added} reused.")
+
+    def _index_lexical(self, text_chunks: List[str]):
+        for chunk in text_chunks:
+            chunk_id = self.chunk_id(chunk)
+            if chunk_id not in self._documents:
+                self._documents[chunk_id] = chunk
+                self.bm25.add(chunk_id, chunk)
+
+    @property
+    def corpus_fingerprint(self) -> str:
+        """Stable hash of every chunk loaded so far, used to scope cached verdicts to a corpus."""
+        return self._corpus_hash.hexdigest()
+
+    def _clear_result_cache(self):
+        with self._cache_lock:
+            self._result_cache.clear()
+
+    def _embed(self, texts: List[str]) -> list:
+        """Embeds texts in one forward pass, serving repeats from the embedding cache."""
+        embeddings = {}
+        with self._cache_lock:
+            for text in texts:
+                if text in self._embedding_cache:
+                    self._embedding_cache.move_to_end(text)
+                    embeddings[text] = self._embedding_cache[text]
+        missing = list(dict.fromkeys(text for text in texts if text not in embeddings))
+        if missing:
+            with get_tracer().span("retrieval.embed", texts=len(missing)):
+                computed = self.embedding_function(missing)
+            for text, embedding in zip(missing, computed):
+                embeddings[text] = embedding
+            with self._cache_lock:
+                for text in missing:
+                    self._embedding_cache[text] = embeddings[text]
+                while len(self._embedding_cache) > self.cache_size:
+                    self._embedding_cache.popitem(last=False)
+        return [embeddings[text] for text in texts]
 
-    def vector_search(self, query: str) -> str:
+    def _query_many(self, queries: List[str], n_results: int) -> List[tuple]:
+        """Returns (documents, distances) per query using one vectorized Chroma query for all cache misses."""
+        results = {}
+        with self._cache_lock:
+            for query in queries:
+                key = (query, n_results)
+                if key in self._result_cache:
+                    self._result_cache.move_to_end(key)
+                    results[query] = self._result_cache[key]
+        missing = list(dict.fromkeys(query for query in queries if query not in results))
+        tracer = get_tracer()
+        tracer.count("retrieval.queries", len(queries) - len(missing), cache="hit")
+        if missing:
+            tracer.count("retrieval.queries", len(missing), cache="miss")
+            query_embeddings = self._embed(missing)
+            with tracer.span("retrieval.vector_query", queries=len(missing), n_results=n_results):
+                response = self.collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    include=["documents", "distances"]
+                )
+            documents = response.get('documents') or [[] for _ in missing]
+            distances = response.get('distances') or [[] for _ in missing]
+            with self._cache_lock:
+                for query, docs, dists in zip(missing, documents, distances):
+                    results[query] = (list(docs), list(dists))
+                    self._result_cache[(query, n_results)] = results[query]
+                while len(self._result_cache) > self.cache_size:
+                    self._result_cache.popitem(last=False)
+        return [results[query] for query in queries]
+
+    def vector_search(self, query: str, n_results: Optional[int] = None) -> str:
         """Executes a semantic search against the loaded context."""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=2
-        )
-        
-        if results and results.get('documents') and len(results['documents'][0]) > 0:
-            # Return the top matches as a single string
-            return "\n".join(results['documents'][0])
-        
-        return "No relevant information found in the source documents."
+        return self.vector_search_many([query], n_results=n_results)[0]
+
+    def vector_search_many(self, queries: List[str], n_results: Optional[int] = None) -> List[str]:
+        """Searches for many queries at once; returns one evidence string per query."""
+        n_results = n_results or self.n_results
+        matches = self.search_documents_many(queries, n_results)
+
+        evidence = []
+        for query, documents in zip(queries, matches):
+            if not documents:
+                evidence.append("No relevant information found in the source documents.")
+            elif self.evidence_mode == EVIDENCE_SENTENCES:
+                evidence.append(" ".join(self.best_sentences(query, documents)))
+            else:
+                # Return the top matches as a single string
+                evidence.append("\n".join(documents))
+        return evidence
+
+    def search_documents_many(self, queries: List[str], n_results: int) -> List[List[str]]:
+        """Ranked source chunks per query, using the configured retrieval mode."""
+        if self.retrieval_mode == RETRIEVAL_HYBRID:
+            return self._hybrid_search_many(queries, n_results)
+        return [documents for documents, _ in self._query_many(queries, n_results)]
+
+    @property
+    def documents(self) -> List[str]:
+        """Every chunk loaded into the registry, in load order."""
+        return list(self._documents.values())
+
+    def _hybrid_search_many(self, queries: List[str], n_results: int) -> List[List[str]]:
+        """Fuses dense and BM25 rankings with reciprocal-rank fusion."""
+        candidates = max(n_results * 3, 10)
+        fused = []
+        for query, (documents, _) in zip(queries, self._query_many(queries, candidates)):
+            dense_ranking = [self.chunk_id(document) for document in documents]
+            with get_tracer().span("retrieval.bm25"):
+                lexical_ranking = [doc_id for doc_id, _ in self.bm25.search(query, top_k=candidates)]
+            # Ids are content hashes, so either source gives the same text; a persisted index may
+            # hold chunks this process never loaded, which only the dense results carry.
+            dense_texts = dict(zip(dense_ranking, documents))
+            fused.append([self._documents.get(doc_id) or dense_texts[doc_id]
+                          for doc_id in reciprocal_rank_fusion([dense_ranking, lexical_ranking])[:n_results]])
+        return fused
+
+    def best_sentences(self, query: str, documents: List[str]) -> List[str]:
+        """Picks the sentences sharing the most (IDF-weighted) terms with the query, in document order."""
+        query_terms = set(tokenize(query))
+        scored = []
+        for document in documents:
+            for sentence in SENTENCE_BOUNDARY.split(document):
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+                score = sum(self.bm25.idf(term) for term in query_terms & set(tokenize(sentence)))
+                scored.append((score, len(scored), sentence))
+        best = sorted(scored, key=lambda item: item[0], reverse=True)[:self.max_evidence_sentences]
+        return [sentence for _, _, sentence in sorted(best, key=lambda item: item[1]) if sentence]
+
+    @staticmethod
+    def distance_to_score(distance: float) -> float:
+        """Maps an L2 distance to a 0..1 score. Lower distance = more faithful."""
+        return min(1.0, max(0.0, 1.0 - (distance / 1.5)))
+
+    @staticmethod
+    def lexical_overlap(claim: str, evidence: str) -> float:
+        """Fraction of the claim's word and number tokens that also appear in the evidence."""
+        claim_tokens = set(tokenize(claim))
+        if not claim_tokens:
+            return 0.0
+        evidence_tokens = set(tokenize(evidence))
+        return len(claim_tokens & evidence_tokens) / len(claim_tokens)
+
+    @staticmethod
+    def anchors_in_order(claim: str, evidence: str) -> bool:
+        """
+        True when the claim's numbers and names (except its first word, capitalised anyway)
+        appear in the evidence in the same order, so "A 80%, B 20%" doesn't pass for
+        "A 20%, B 80%" although every token overlaps.
+        """
+        claim_anchors = ANCHOR.findall(claim.strip())
+        if claim_anchors and claim.strip().startswith(claim_anchors[0]) and not claim_anchors[0][0].isdigit():
+            claim_anchors = claim_anchors[1:]
+        evidence_anchors = iter(ANCHOR.findall(evidence))
+        return all(anchor in evidence_anchors for anchor in claim_anchors)
+
+    def retrieve(self, query: str, n_results: int = 2) -> dict:
+        """
+        Runs vector search locally and returns the matched documents, their distances and
+        a confidence score derived from the closest match.
+        """
+        return self.retrieve_many([query], n_results=n_results)[0]
+
+    def retrieve_many(self, queries: List[str], n_results: int = 2) -> List[dict]:
+        """Batched form of `retrieve`."""
+        return [
+            {
+                "documents": documents,
+                "distances": distances,
+                "confidence": self.distance_to_score(distances[0]) if distances else 0.0
+            }
+            for documents, distances in self._query_many(queries, n_results)
+        ]
 
     def evaluate_claim_by_vector(self, claim: str) -> dict:
         """Evaluates a claim directly using vector distance from the knowledge base."""
-        results = self.collection.query(
-            query_texts=[claim],
-            n_results=1,
-            include=["documents", "distances"]
-        )
+        documents, distances = self._query_many([claim], n_results=1)[0]
         
-        if not results or not results.get('documents') or not results['documents'][0]:
+        if not documents:
             return {
                 "faithfulness_score": 0.0,
                 "requires_revision": True,
                 "rationale": "No context found in vector knowledge base."
             }
             
-        distance = results['distances'][0][0]
-        match_text = results['documents'][0][0]
+        distance = distances[0]
+        match_text = documents[0]
         
-        # Map L2 distance to a score. 
-        # Lower distance = more faithful.
-        score = max(0.0, 1.0 - (distance / 1.5)) 
-        score = min(1.0, score)
+        score = self.distance_to_score(distance)
         
         requires_revision = score < 0.8
         
@@ -88,5 +421,35 @@ class ToolRegistry:
     def execute_tool(self, tool_name: str, kwargs: dict) -> str:
         """Route tool execution from LLM to appropriate function."""
         if tool_name == "vector_search":
-            return self.vector_search(**kwargs)
+            return self.vector_search(kwargs["query"])
         raise ValueError(f"Unknown tool requested by LLM: {tool_name}")
+
+    def close(self):
+        """Stops the retrieval threads; queued lookups still finish."""
+        self._executor.shutdown(wait=False)
+
+    async def _run_in_pool(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+
+    async def avector_search(self, query: str) -> str:
+        """`vector_search` on the retrieval thread pool, keeping the event loop responsive."""
+        return await self._run_in_pool(self.vector_search, query)
+
+    async def avector_search_many(self, queries: List[str]) -> List[str]:
+        return await self._run_in_pool(self.vector_search_many, queries)
+
+    async def aevaluate_claim_by_vector(self, claim: str) -> dict:
+        return await self._run_in_pool(self.evaluate_claim_by_vector, claim)
+
+    async def asearch_documents(self, query: str, n_results: int) -> List[str]:
+        return (await self._run_in_pool(self.search_documents_many, [query], n_results))[0]
+
+    async def aretrieve(self, query: str, n_results: int = 2) -> dict:
+        return await self._run_in_pool(self.retrieve, query, n_results)
+
+    async def aretrieve_many(self, queries: List[str], n_results: int = 2) -> List[dict]:
+        return await self._run_in_pool(self.retrieve_many, queries, n_results)
+
+    async def aexecute_tool(self, tool_name: str, kwargs: dict) -> str:
+        return await self._run_in_pool(self.execute_tool, tool_name, kwargs)
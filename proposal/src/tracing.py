@@ -0,0 +1,241 @@
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Durations kept per span name for percentiles; counts and sums are exact.
+MAX_SAMPLES_PER_SPAN = 10_000
+
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    """Shared stand-in returned by a disabled tracer, so instrumented code pays one attribute check."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attributes", "span_id", "parent_id", "started", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(tracer._ids)
+        self.parent_id = None
+        self.started = 0.0
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer._finish(self.name, self.started, duration, self.attributes, self.span_id, self.parent_id)
+        return False
+
+
+class Tracer:
+    """
+    Lightweight span and counter recorder shared by the generator, evaluator, retrieval and
+    orchestration layers.
+
+    `span(name, **attributes)` times a block (nesting is tracked across awaits through a
+    context variable); `record` adds a duration measured elsewhere, e.g. time-to-first-token;
+    `count` bumps a labelled counter such as prompt/completion tokens from Groq `usage`.
+    Finished spans are appended to `jsonl_path` as they close, `summary()` aggregates a run
+    and `serve_prometheus()` exposes the same data in Prometheus text format.
+    A tracer built with `enabled=False` records nothing.
+    """
+
+    def __init__(self, enabled: bool = True, jsonl_path: Optional[str] = None):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._spans: Dict[str, dict] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8") if enabled and jsonl_path else None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def record(self, name: str, seconds: float, **attributes):
+        if not self.enabled:
+            return
+        self._finish(name, time.perf_counter() - seconds, seconds, attributes, next(self._ids), _current_span.get())
+
+    def count(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_usage(self, stage: str, usage):
+        """Adds the token counts of a Groq `usage` object (or dict) to the `tokens` counter."""
+        if not self.enabled or usage is None:
+            return
+        for kind in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+            if isinstance(value, (int, float)):
+                self.count("tokens", value, stage=stage, kind=kind.replace("_tokens", ""))
+
+    def _finish(self, name: str, started: float, duration: float, attributes: dict, span_id: int, parent_id: Optional[int]):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = {"count": 0, "sum": 0.0, "max": 0.0, "errors": 0, "samples": deque(maxlen=MAX_SAMPLES_PER_SPAN)}
+            stats["count"] += 1
+            stats["sum"] += duration
+            stats["max"] = max(stats["max"], duration)
+            stats["errors"] += "error" in attributes
+            stats["samples"].append(duration)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps({
+                    "type": "span", "name": name, "id": span_id, "parent": parent_id,
+                    "start": started, "duration_ms": round(duration * 1000, 3), "attributes": attributes,
+                }, default=str) + "\n")
+
+    def summary(self) -> Dict:
+        """Per-span count/total/percentiles (ms) and every counter, for a run report."""
+        with self._lock:
+            spans = {}
+            for name, stats in sorted(self._spans.items()):
+                ordered = sorted(stats["samples"])
+                pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+                spans[name] = {
+                    "count": stats["count"], "errors": stats["errors"], "total_ms": round(stats["sum"] * 1000, 3),
+                    "p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": round(stats["max"] * 1000, 3),
+                }
+            counters = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                label_text = ",".join(f"{k}={v}" for k, v in labels)
+                counters[f"{name}{{{label_text}}}" if label_text else name] = value
+        return {"spans": spans, "counters": counters}
+
+    def write_summary(self):
+        """Appends the current summary to the JSON-lines file and logs it."""
+        if not self.enabled:
+            return
+        summary = self.summary()
+        logger.info(f"Trace summary: {json.dumps(summary)}")
+        if self._jsonl is not None:
+            with self._lock:
+                self._jsonl.write(json.dumps({"type": "summary", "time": time.time(), **summary}) + "\n")
+                self._jsonl.flush()
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def prometheus_text(self) -> str:
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        lines = ["# TYPE pipeline_span_seconds summary"]
+        with self._lock:
+            for name, stats in sorted(self._spans.items()):
+                ordered = sorted(stats["samples"])
+                for q in (0.5, 0.95, 0.99):
+                    value = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+                    lines.append(f'pipeline_span_seconds{{span="{escape(name)}",quantile="{q}"}} {value:.6f}')
+                lines.append(f'pipeline_span_seconds_sum{{span="{escape(name)}"}} {stats["sum"]:.6f}')
+                lines.append(f'pipeline_span_seconds_count{{span="{escape(name)}"}} {stats["count"]}')
+            names = sorted({name for name, _ in self._counters})
+            for name in names:
+                metric = "pipeline_" + "".join(c if c.isalnum() else "_" for c in name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter, labels), value in sorted(self._counters.items()):
+                    if counter == name:
+                        label_text = ",".join(f'{k}="{escape(v)}"' for k, v in labels)
+                        lines.append(f"{metric}{{{label_text}}} {value:g}" if label_text else f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port: int = 9464, host: str = "127.0.0.1") -> int:
+        """Serves `GET /metrics` from a daemon thread; returns the bound port."""
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._jsonl is not None:
+            with self._lock:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+_tracer: Optional[Tracer] = None
+
+def get_tracer() -> Tracer:
+    """
+    Returns the process-wide tracer. It is disabled unless PIPELINE_TRACE_JSONL (a file to
+    append spans to) or PIPELINE_METRICS_PORT (a port for the Prometheus endpoint) is set.
+    """
+    global _tracer
+    if _tracer is None:
+        jsonl_path = os.environ.get("PIPELINE_TRACE_JSONL")
+        metrics_port = os.environ.get("PIPELINE_METRICS_PORT")
+        _tracer = Tracer(enabled=bool(jsonl_path or metrics_port), jsonl_path=jsonl_path)
+        if metrics_port:
+            _tracer.serve_prometheus(int(metrics_port))
+    return _tracer
+
+def set_tracer(tracer: Optional[Tracer]):
+    """Replaces the process-wide tracer (e.g. an enabled one for a benchmark run)."""
+    global _tracer
+    _tracer = tracer
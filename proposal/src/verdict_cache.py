@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from tiered_store import TIER_MEMORY, TieredStore
+
+logger = logging.getLogger(__name__)
+
+
+class VerdictCache:
+    """
+    Content-addressed cache of evaluator verdicts.
+
+    Keys are derived from the normalized claim text, the evaluator model name and a
+    fingerprint of the source corpus, so a verdict is only reused when all three match.
+    Lookups hit an in-memory LRU tier first and fall back to an optional SQLite store
+    (see TieredStore).
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_memory_entries: int = 2048,
+        max_disk_entries: int = 100_000,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._store = TieredStore("verdicts", "verdict", db_path=db_path, max_memory_entries=max_memory_entries,
+                                  max_disk_entries=max_disk_entries, ttl_seconds=ttl_seconds)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+    @staticmethod
+    def normalize_claim(claim: str) -> str:
+        """Collapses whitespace and case so trivially different renderings share a key."""
+        return re.sub(r"\s+", " ", claim).strip().lower()
+
+    def make_key(self, claim: str, model: str, corpus_fingerprint: str) -> str:
+        payload = "\x1f".join([self.normalize_claim(claim), model, corpus_fingerprint])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        verdict, tier = self._store.get(key)
+        if verdict is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        self._stats["memory_hits" if tier == TIER_MEMORY else "disk_hits"] += 1
+        return dict(verdict)
+
+    def set(self, key: str, verdict: dict):
+        self._store.set(key, dict(verdict))
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Tuple[dict, bool]]]) -> dict:
+        """
+        Returns the cached verdict for `key`, or runs `compute` exactly once for all
+        concurrent callers. `compute` returns `(verdict, cacheable)`; transient failures
+        should be reported as not cacheable so they are retried on the next lookup.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            return dict(await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            verdict, cacheable = await compute()
+            if cacheable:
+                self.set(key, verdict)
+            future.set_result(verdict)
+            return dict(verdict)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved so it isn't reported when nobody was waiting.
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+
+    @property
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "saved_evaluations": self._stats["hits"] + self._stats["coalesced"],
+            "evictions": self._store.evictions,
+            "memory_entries": self._store.memory_entries,
+        }
+
+    def close(self):
+        self._store.close()
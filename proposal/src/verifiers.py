@@ -0,0 +1,129 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class Verifier(abc.ABC):
+    """
+    Pre-screens (claim, evidence) pairs before they reach the LLM evaluator.
+
+    `verify_many` returns, per pair, a verdict in the evaluator's schema
+    (`faithfulness_score`, `requires_revision`, `rationale`) when the backend is confident,
+    or None to hand the claim on to the LLM.
+    """
+
+    name = "verifier"
+
+    @abc.abstractmethod
+    async def verify_many(self, pairs: Sequence[Tuple[str, str]]) -> List[Optional[dict]]:
+        ...
+
+    def close(self):
+        pass
+
+
+class NLIVerifier(Verifier):
+    """
+    CPU-only entailment check with a small cross-encoder NLI model exported to ONNX
+    (e.g. a MiniLM or DeBERTa-xsmall NLI checkpoint; `model.onnx` + `tokenizer.json` +
+    `config.json` in one directory, see `from_pretrained`).
+
+    The retrieved evidence is the premise and the claim the hypothesis. A claim is accepted
+    when P(entailment) >= `accept_threshold`, flagged when P(contradiction) >=
+    `reject_threshold`, and left to the LLM otherwise. Pairs are scored in batches of
+    `batch_size` on a small thread pool so the event loop keeps streaming.
+    """
+
+    def __init__(self, session, tokenizer, labels: Sequence[str], name: str = "nli", max_length: int = 384,
+                 batch_size: int = 16, accept_threshold: float = 0.85, reject_threshold: float = 0.85, max_workers: int = 2):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.name = name
+        self.batch_size = batch_size
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        labels = [label.lower() for label in labels]
+        try:
+            self._entailment = labels.index("entailment")
+            self._contradiction = labels.index("contradiction")
+        except ValueError:
+            raise ValueError(f"NLI model labels must include 'entailment' and 'contradiction', got {labels}")
+        self._input_names = {i.name for i in session.get_inputs()}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nli-verifier")
+        # Premise (evidence) is truncated first so the claim is always seen whole.
+        self.tokenizer.enable_truncation(max_length=max_length, strategy="only_first")
+        self.tokenizer.enable_padding()
+
+    @classmethod
+    def from_pretrained(cls, model_dir: str, **kwargs) -> "NLIVerifier":
+        """Loads `model.onnx`, `tokenizer.json` and the `id2label` map of `config.json` from `model_dir`."""
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("NLIVerifier needs the optional 'onnxruntime' and 'tokenizers' packages") from e
+
+        with open(os.path.join(model_dir, "config.json"), "r", encoding="utf-8") as f:
+            id2label = json.load(f)["id2label"]
+        labels = [id2label[str(i)] for i in range(len(id2label))]
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = kwargs.pop("intra_op_threads", max(1, (os.cpu_count() or 2) // 2))
+        session = onnxruntime.InferenceSession(os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"])
+        tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        return cls(session, tokenizer, labels, name=f"nli:{os.path.basename(os.path.normpath(model_dir))}", **kwargs)
+
+    def score(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Label probabilities per (claim, evidence) pair, shape (len(pairs), n_labels)."""
+        probabilities = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([(evidence, claim) for claim, evidence in batch])
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            logits = self.session.run(None, {k: v for k, v in feeds.items() if k in self._input_names})[0]
+            logits = logits - logits.max(axis=1, keepdims=True)
+            exp = np.exp(logits)
+            probabilities.append(exp / exp.sum(axis=1, keepdims=True))
+        return np.concatenate(probabilities) if probabilities else np.zeros((0, 3))
+
+    def _verdicts(self, pairs: Sequence[Tuple[str, str]]) -> List[Optional[dict]]:
+        with get_tracer().span("verifier.nli", pairs=len(pairs)):
+            probabilities = self.score(pairs)
+        verdicts: List[Optional[dict]] = []
+        for (claim, evidence), probs in zip(pairs, probabilities):
+            entailment, contradiction = float(probs[self._entailment]), float(probs[self._contradiction])
+            detail = f"(entailment {entailment:.2f}, contradiction {contradiction:.2f}) against: '{evidence[:200]}'"
+            if entailment >= self.accept_threshold:
+                verdicts.append({"faithfulness_score": round(entailment, 2), "requires_revision": False,
+                                 "rationale": f"Local NLI model: supported by the source {detail}"})
+            elif contradiction >= self.reject_threshold:
+                verdicts.append({"faithfulness_score": round(1.0 - contradiction, 2), "requires_revision": True,
+                                 "rationale": f"Local NLI model: contradicted by the source {detail}"})
+            else:
+                verdicts.append(None)
+        decided = sum(v is not None for v in verdicts)
+        get_tracer().count("verifier.pairs", decided, outcome="decided")
+        get_tracer().count("verifier.pairs", len(verdicts) - decided, outcome="deferred")
+        return verdicts
+
+    async def verify_many(self, pairs: Sequence[Tuple[str, str]]) -> List[Optional[dict]]:
+        if not pairs:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._verdicts, list(pairs))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,19 @@
+import sys
+import os
+import pytest
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import rate_limiter
+
+@pytest.fixture(autouse=True)
+def generous_rate_limiter():
+    """
+    Agents built without a limiter use the process-wide one; give every test a fresh,
+    effectively unlimited budget so timings don't depend on what ran before.
+    """
+    previous = rate_limiter._rate_limiter
+    rate_limiter.set_rate_limiter(rate_limiter.RateLimiter(requests_per_minute=1e6, tokens_per_minute=1e9))
+    yield
+    rate_limiter.set_rate_limiter(previous)
@@ -0,0 +1,82 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import batch_audit
+from batch_audit import audit_shard, load_manifest, plan_shards, run_audit
+
+class FakeOrchestrator:
+    instances = []
+
+    def __init__(self, source_text_path, **kwargs):
+        self.source = source_text_path
+        self.audited = []
+        FakeOrchestrator.instances.append(self)
+
+    async def evaluate_document(self, path, batched=False):
+        self.audited.append(path)
+        with open(path) as f:
+            claims = [line for line in f.read().splitlines() if line]
+        if claims == ["x"]:
+            raise RuntimeError("API unavailable")
+        return [{"claim": c, "verdict": {"requires_revision": "100%" in c}, "tier": "llm"} for c in claims]
+
+    async def aclose(self):
+        self.closed = True
+
+def write_manifest(tmp_path, pairs):
+    for source, draft in pairs:
+        (tmp_path / source).write_text("source text")
+    (tmp_path / "a1.md").write_text("Exports are 80%.\nExports are 100%.")
+    (tmp_path / "a2.md").write_text("Palmer is fiberless.")
+    (tmp_path / "b1.md").write_text("Keitt stays green.")
+    (tmp_path / "broken.md").write_text("x")
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text("\n".join(json.dumps({"source": s, "draft": d}) for s, d in pairs))
+    return str(manifest)
+
+def test_shards_keep_each_source_in_one_process(tmp_path):
+    manifest = write_manifest(tmp_path, [("a.txt", "a1.md"), ("b.txt", "b1.md"), ("a.txt", "a2.md")])
+    shards = plan_shards(load_manifest(manifest), workers=4)
+    assert len(shards) == 2
+    assert sorted(sorted(os.path.basename(e["draft"]) for e in shard) for shard in shards) == [["a1.md", "a2.md"], ["b1.md"]]
+
+def test_audit_reuses_corpus_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_audit, "Orchestrator", FakeOrchestrator)
+    FakeOrchestrator.instances = []
+    manifest = write_manifest(tmp_path, [("a.txt", "a1.md"), ("a.txt", "a2.md"), ("b.txt", "broken.md")])
+    output = tmp_path / "audit"
+
+    report = run_audit(manifest, str(output), workers=1)
+    # One orchestrator (one index load) per source, reused for both of a.txt's drafts.
+    assert sorted(len(o.audited) for o in FakeOrchestrator.instances) == [1, 2]
+    assert report["claims"] == 3 and report["flagged"] == 1
+    assert report["drafts"]["audited"] == 2 and report["drafts"]["missing"] == ["broken.md"]
+
+    FakeOrchestrator.instances = []
+    (tmp_path / "broken.md").write_text("Recovered claim.")
+    report = run_audit(manifest, str(output), workers=1)
+    # Only the draft that failed last time is evaluated again.
+    assert [o.audited for o in FakeOrchestrator.instances] == [[str(tmp_path / "broken.md")]]
+    assert report["drafts"]["audited"] == 3 and report["claims"] == 4
+    assert json.loads((output / "report.json").read_text()) == report
+
+def test_shard_closes_its_verifier_when_cancelled(tmp_path, monkeypatch):
+    class CancelledOrchestrator(FakeOrchestrator):
+        async def evaluate_document(self, path, batched=False):
+            raise asyncio.CancelledError()
+
+    verifier = type("FakeVerifier", (), {"closed": False, "close": lambda self: setattr(self, "closed", True)})()
+    monkeypatch.setattr(batch_audit, "Orchestrator", CancelledOrchestrator)
+    monkeypatch.setattr(batch_audit.NLIVerifier, "from_pretrained", classmethod(lambda cls, model_dir: verifier))
+    manifest = write_manifest(tmp_path, [("a.txt", "a1.md")])
+    options = {"model": "m", "max_concurrency": 1, "batched": False, "tiered": False, "eager_retrieval": False, "nli_model_dir": "nli"}
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(audit_shard(load_manifest(manifest), str(tmp_path / "verdicts.jsonl"), options))
+    assert verifier.closed
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from claim_extractor import ClaimDeduplicator, ClaimExtractor, deduplicate
+
+DRAFT = (
+    "## Mango Exports\n\n"
+    "In this section we explore the mango trade. Yield: 25 t/ha.\n"
+    "Brazil exported 3.5 tons in 2022; India leads global production by a wide margin.\n"
+    "Tommy Atkins dominates exports, and it is grown mostly in Bahia.\n"
+    "The main varieties are:\n"
+    "- Palmer mangoes have virtually fiberless flesh.\n"
+    "What drives demand?\n"
+    "| Variety | Share |\n"
+    "| Tommy Atkins | 80% |\n"
+)
+
+def test_extracts_atomic_factual_claims_with_spans():
+    claims = ClaimExtractor().extract(DRAFT)
+
+    assert [c.text for c in claims] == [
+        "Yield: 25 t/ha.",
+        "Brazil exported 3.5 tons in 2022",
+        "India leads global production by a wide margin.",
+        "Tommy Atkins dominates exports, and it is grown mostly in Bahia.",
+        "- Palmer mangoes have virtually fiberless flesh.",
+        "| Tommy Atkins | 80% |",
+    ]
+    assert all(DRAFT[c.start:c.end] == c.text for c in claims)
+
+def test_short_declaratives_without_numbers_are_kept():
+    claims = ClaimExtractor().extract("Keitt is big. Palmer is fiberless! Sweet. Really?\nSee also")
+    # One-word exclamations, questions and unterminated fragments are still skipped.
+    assert [c.text for c in claims] == ["Keitt is big.", "Palmer is fiberless!"]
+
+def test_deduplicator_merges_exact_and_near_duplicates_but_not_different_numbers():
+    deduplicator = ClaimDeduplicator()
+    assert deduplicator.add("Tommy Atkins accounts for 80% of Brazilian mango exports.") is None
+    assert deduplicator.add("**Tommy Atkins accounts for 80% of Brazilian mango exports!**") == 0
+    assert deduplicator.add("Tommy Atkins accounts for 80% of the Brazilian mango exports.") == 0
+    assert deduplicator.add("Tommy Atkins does not account for 80% of Brazilian mango exports.") is None
+    assert deduplicator.add("Tommy Atkins accounts for 8% of Brazilian mango exports.") is None
+    assert deduplicator.add("The Palmer variety has virtually fiberless flesh.") is None
+    assert deduplicator.stats == {"unique": 4, "exact": 1, "near": 1}
+
+def test_deduplicator_keeps_claims_with_different_content_words_apart():
+    claim = ("Palmer mangoes grown under irrigation in the Sao Francisco valley of northeastern Brazil have a {} shelf life after harvest, "
+             "cold storage in export warehouses and sea freight to European ports, according to growers and exporters.")
+    deduplicator = ClaimDeduplicator()
+    assert deduplicator.add(claim.format("short")) is None
+    assert deduplicator.add(claim.format("long")) is None
+    assert deduplicator.add(claim.format("very short")) == 0
+    assert deduplicator.stats == {"unique": 2, "exact": 0, "near": 1}
+    assert deduplicator.add("Brazil ships mangoes to Spain.") is None
+    assert deduplicator.add("Spain ships mangoes to Brazil.") is None
+
+def test_deduplicate_maps_every_claim_to_an_evaluated_one():
+    draft = "Palmer mangoes have fiberless flesh. Brazil exported 3.5 tons in 2022. Palmer mangoes have fiberless flesh."
+    claims = ClaimExtractor().extract(draft)
+    unique, owners = deduplicate(claims)
+
+    assert [c.text for c in unique] == ["Palmer mangoes have fiberless flesh.", "Brazil exported 3.5 tons in 2022."]
+    assert owners == [0, 1, 0]
+    assert claims[2].start == draft.rindex("Palmer")
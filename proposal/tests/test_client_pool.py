@@ -0,0 +1,86 @@
+import sys
+import os
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from client_pool import ClientPool
+from rate_limiter import RateLimiter
+
+class KeepAliveServer:
+    def __init__(self):
+        self.connections = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                server.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.send_header("retry-after", "0.5")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def test_pool_reuses_connections_across_requests_and_event_loops():
+    server = KeepAliveServer()
+    limiter = RateLimiter()
+    pool = ClientPool(max_connections=2, http2=False, rate_limiter=limiter)
+
+    async def burst():
+        responses = await asyncio.gather(*(pool.http_client.get(server.url) for _ in range(10)))
+        assert all(r.status_code == 200 for r in responses)
+
+    try:
+        asyncio.run(burst())
+        assert server.connections <= 2
+        # A later event loop gets its own connections instead of the dead loop's sockets.
+        asyncio.run(burst())
+        assert server.connections <= 4
+        assert pool.stats()["requests"] == 20
+        # Response headers reach the rate limiter.
+        assert limiter._blocked_until > 0
+
+        asyncio.run(pool.aclose())
+        assert pool.closed
+    finally:
+        server.close()
+
+def test_agents_close_only_the_pool_they_created():
+    from document_generator import DocumentGenerator
+    from evaluator_agent import EvaluatorAgent
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000)
+    shared = ClientPool(http2=False)
+
+    async def main():
+        agents = [DocumentGenerator(rate_limiter=limiter), EvaluatorAgent(None, rate_limiter=limiter),
+                  DocumentGenerator(rate_limiter=limiter, client_pool=shared), EvaluatorAgent(None, client_pool=shared)]
+        for agent in agents:
+            agent.client_pool.http_client
+            await agent.aclose()
+        return agents
+
+    private_generator, private_evaluator, *shared_agents = asyncio.run(main())
+    # A private limiter gets a private pool that feeds it headers; the agent closes it.
+    assert private_generator.client_pool.rate_limiter is limiter and private_generator.client_pool.closed
+    assert private_evaluator.client_pool.closed
+    assert all(agent.client_pool is shared for agent in shared_agents) and not shared.closed
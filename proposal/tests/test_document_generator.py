@@ -0,0 +1,136 @@
+import sys
+import os
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from document_generator import DocumentGenerator
+from plan_cache import PlanCache
+from rate_limiter import RateLimiter, estimate_tokens
+
+def make_stream(words, delay):
+    async def stream():
+        for word in words:
+            await asyncio.sleep(delay)
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = word
+            yield chunk
+    return stream()
+
+@patch('document_generator.AsyncGroq')
+def test_parallel_sections_stream_in_outline_order(mock_groq):
+    os.environ["GROQ_API_KEY"] = "testsuite"
+    started = []
+
+    async def create(**kwargs):
+        if not kwargs.get("stream"):
+            resp = MagicMock()
+            resp.choices[0].message.content = '{"sections": [{"title": "A", "summary": "first"}, {"title": "B", "summary": "second"}, {"title": "C", "summary": "third"}]}'
+            return resp
+        prompt = kwargs["messages"][-1]["content"]
+        title = prompt.split("section titled '")[1][0]
+        started.append(title)
+        # Later sections finish first, so output order must come from the outline.
+        return make_stream([f"{title}1 ", f"{title}2 "], {"A": 0.03, "B": 0.02, "C": 0.0}[title])
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = create
+    mock_groq.return_value = mock_client
+
+    generator = DocumentGenerator(num_sections=3, parallel_sections=3)
+
+    async def collect():
+        return [chunk async for chunk in generator.generate_report_stream("source", "prompt")]
+
+    output = "".join(asyncio.run(collect()))
+    assert output == "\n\n## A\n\nA1 A2 \n\n## B\n\nB1 B2 \n\n## C\n\nC1 C2 "
+    assert sorted(started) == ["A", "B", "C"]
+
+@patch('document_generator.AsyncGroq')
+def test_section_prompts_carry_only_retrieved_source(mock_groq):
+    os.environ["GROQ_API_KEY"] = "testsuite"
+    prompts = []
+
+    async def create(**kwargs):
+        prompts.append(kwargs["messages"][-1]["content"])
+        if not kwargs.get("stream"):
+            resp = MagicMock()
+            resp.choices[0].message.content = '["Exports"]'
+            return resp
+        return make_stream(["text"], 0)
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = create
+    mock_groq.return_value = mock_client
+
+    registry = MagicMock()
+    registry.documents = ["Exports grew. More detail.", "Varieties differ. More detail."]
+    registry.asearch_documents = AsyncMock(return_value=["Exports grew. More detail.", "x " * 400])
+
+    generator = DocumentGenerator(num_sections=1, tool_registry=registry, section_context_tokens=100, outline_context_tokens=100)
+    source = "Exports grew. More detail.\n\nVarieties differ. More detail.\n\nUnrelated. " + "filler " * 500
+
+    async def collect():
+        return [chunk async for chunk in generator.generate_report_stream(source, "prompt")]
+
+    asyncio.run(collect())
+    outline_prompt, section_prompt = prompts
+    assert "- Exports grew.\n- Varieties differ." in outline_prompt and "filler" not in outline_prompt
+    # The oversized second chunk doesn't fit the budget and is left out.
+    assert "Exports grew. More detail." in section_prompt and "x x" not in section_prompt
+    assert generator.prompt_token_savings["calls"] == 2
+    assert generator.prompt_token_savings["sent_source_tokens"] < generator.prompt_token_savings["full_source_tokens"]
+
+@patch('document_generator.AsyncGroq')
+def test_cached_plan_skips_outline_call_and_replaces_tail_context(mock_groq):
+    os.environ["GROQ_API_KEY"] = "testsuite"
+    prompts = []
+
+    async def create(**kwargs):
+        prompts.append(kwargs["messages"][-1]["content"])
+        if not kwargs.get("stream"):
+            resp = MagicMock()
+            resp.choices[0].message.content = '{"sections": [{"title": "Exports", "summary": "trade"}, {"title": "Varieties", "summary": "cultivars"}]}'
+            return resp
+        return make_stream(["x" * 3000], 0)
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = create
+    mock_groq.return_value = mock_client
+
+    registry = MagicMock()
+    registry.corpus_fingerprint = "corpus"
+    registry.asearch_documents = AsyncMock(return_value=["Tommy Atkins accounts for 80% of exports. Palmer is fiberless."])
+    registry.best_sentences = MagicMock(side_effect=lambda query, documents: documents[0].split(" Palmer")[:1])
+
+    plan_cache = PlanCache()
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000)
+
+    async def collect(prompt):
+        async with DocumentGenerator(num_sections=2, tool_registry=registry, plan_cache=plan_cache, rate_limiter=limiter) as generator:
+            return [chunk async for chunk in generator.generate_report_stream("source", prompt)]
+
+    asyncio.run(collect("Brazilian mangos"))
+    assert len(prompts) == 3 and '"summary"' in prompts[0]
+    second_section = prompts[2]
+    assert "1. Exports (already written, covers: Tommy Atkins accounts for 80% of exports.)" in second_section
+    assert "x" * 100 not in second_section
+
+    prompts.clear()
+    asyncio.run(collect("brazilian  Mangos."))
+    # Same corpus and an equivalent prompt: the outline call is skipped.
+    assert len(prompts) == 2 and all("section titled" in p for p in prompts)
+    assert plan_cache.stats["hits"] == 1
+
+def test_outline_digest_samples_the_whole_source():
+    registry = MagicMock()
+    registry.documents = [f"Topic {i} is covered here. Details follow." for i in range(100)]
+    generator = DocumentGenerator(tool_registry=registry, outline_context_tokens=80)
+
+    digest = generator._outline_source("source")
+    topics = [int(line.split()[2]) for line in digest.splitlines()]
+    assert sum(estimate_tokens(line[2:]) for line in digest.splitlines()) <= 80
+    # The budget is spread over the source instead of spent on its opening chunks.
+    assert topics[0] == 0 and topics[-1] >= 75 and len(topics) >= 8
@@ -0,0 +1,83 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from evaluation_queue import OVERFLOW_BLOCK, OVERFLOW_COALESCE, OVERFLOW_VECTOR_TIER, EvaluationQueue
+
+def run_queue(overflow, claims, **kwargs):
+    gate = asyncio.Event()
+    evaluated, results = [], {}
+
+    async def evaluate(claim):
+        evaluated.append(claim)
+        await gate.wait()
+        return {"claim": claim, "tier": "llm"}
+
+    async def fallback(claim):
+        return {"claim": claim, "tier": "vector_fallback"}
+
+    async def main():
+        queue = EvaluationQueue(evaluate, results.__setitem__, workers=1, max_depth=2, overflow=overflow, fallback=fallback, **kwargs)
+        async with queue:
+            for index, claim in enumerate(claims):
+                put = asyncio.create_task(queue.put(claim, index))
+                await asyncio.sleep(0.01)
+                if not put.done():
+                    # The producer is held back until a worker frees a slot.
+                    gate.set()
+                    await put
+            gate.set()
+        return queue.stats
+
+    return asyncio.run(main()), evaluated, results
+
+def test_block_policy_applies_backpressure():
+    stats, evaluated, results = run_queue(OVERFLOW_BLOCK, [f"claim {i}" for i in range(5)])
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert evaluated == [f"claim {i}" for i in range(5)]
+    assert stats["max_depth_seen"] <= 2
+
+def test_vector_tier_policy_diverts_overflow():
+    stats, evaluated, results = run_queue(OVERFLOW_VECTOR_TIER, [f"claim {i}" for i in range(5)])
+    # One claim is with the worker, two wait in the queue, the rest go to the fallback.
+    assert [results[i]["tier"] for i in range(5)] == ["llm", "llm", "llm", "vector_fallback", "vector_fallback"]
+    assert stats["fallback"] == 2
+
+def test_coalesce_policy_merges_into_newest_item():
+    stats, evaluated, results = run_queue(OVERFLOW_COALESCE, [f"claim {i}." for i in range(5)])
+    assert evaluated == ["claim 0.", "claim 1.", "claim 2. claim 3. claim 4."]
+    assert results[3] == {"claim": "claim 3.", "tier": "llm", "evaluated_as": "claim 2. claim 3. claim 4."}
+    assert stats["coalesced"] == 2
+
+def test_vector_tier_policy_requires_fallback():
+    with pytest.raises(ValueError):
+        EvaluationQueue(lambda claim: None, print, overflow=OVERFLOW_VECTOR_TIER)
+
+def test_failed_evaluation_delivers_error_verdict():
+    results = {}
+
+    async def evaluate(claim):
+        if claim == "claim 1":
+            raise RuntimeError("model unavailable")
+        return {"claim": claim, "tier": "llm"}
+
+    async def main():
+        queue = EvaluationQueue(evaluate, results.__setitem__, workers=2)
+        async with queue:
+            for index in range(3):
+                await queue.put(f"claim {index}", index)
+        return queue.stats
+
+    stats = asyncio.run(main())
+    # The failure is reported for its claim and the others still complete; join() does not raise.
+    assert sorted(results) == [0, 1, 2]
+    assert results[0]["tier"] == results[2]["tier"] == "llm"
+    assert results[1]["tier"] == "error"
+    assert results[1]["claim"] == "claim 1"
+    assert results[1]["verdict"]["requires_revision"] is True
+    assert "model unavailable" in results[1]["verdict"]["rationale"]
+    assert stats["failed"] == 1
@@ -79,3 +79,160 @@ def test_evaluator_scores_truth(mock_groq, test_registry):
     assert result['faithfulness_score'] == 1.0
     assert result['requires_revision'] is False
 
+
+@patch('evaluator_agent.AsyncGroq')
+def test_batch_evaluation_splits_malformed_batches(mock_groq):
+    mock_client = MagicMock()
+    mock_acompletion = AsyncMock()
+    mock_client.chat.completions.create = mock_acompletion
+    mock_groq.return_value = mock_client
+
+    registry = MagicMock()
+    registry.avector_search_many = AsyncMock(return_value=["Tommy Atkins accounts for 80% of Brazilian mango exports."] * 2)
+
+    def response(content):
+        resp = MagicMock()
+        resp.choices[0].message.content = content
+        resp.choices[0].message.tool_calls = None
+        return resp
+
+    # The packed call returns one verdict for two claims, and so does the corrective retry,
+    # so each claim is retried on its own.
+    mock_acompletion.side_effect = [
+        response('{"verdicts": [{"id": 1, "faithfulness_score": 1.0, "requires_revision": false}]}'),
+        response('{"verdicts": [{"id": 1, "faithfulness_score": 1.0, "requires_revision": false}]}'),
+        response('{"faithfulness_score": 1.0, "requires_revision": false, "rationale": "ok"}'),
+        response('{"faithfulness_score": 0.0, "requires_revision": true, "rationale": "bad"}'),
+    ]
+
+    agent = EvaluatorAgent(registry)
+    claims = ["Tommy Atkins accounts for 80% of exports.", "Tommy Atkins accounts for 100% of exports."]
+    verdicts = asyncio.run(agent.evaluate_claims_batch(claims, max_concurrency=1))
+
+    assert [v['requires_revision'] for v in verdicts] == [False, True]
+    # Single claims reuse the retrieved evidence: one JSON call each, no tool loop.
+    assert mock_acompletion.await_count == 4
+    assert "tools" not in mock_acompletion.call_args.kwargs
+
+@patch('evaluator_agent.AsyncGroq')
+def test_batch_api_errors_fail_the_batch_without_splitting(mock_groq):
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=RuntimeError("Error code: 503 - service unavailable"))
+    mock_groq.return_value = mock_client
+
+    registry = MagicMock()
+    registry.avector_search_many = AsyncMock(return_value=["Tommy Atkins accounts for 80% of Brazilian mango exports."] * 4)
+    cache = MagicMock()
+    cache.make_key.side_effect = lambda claim, model, fingerprint: claim
+    cache.get.return_value = None
+
+    agent = EvaluatorAgent(registry, cache=cache)
+    verdicts = asyncio.run(agent.evaluate_claims_batch([f"Claim number {n} about exports." for n in range(4)]))
+
+    assert mock_client.chat.completions.create.await_count == 1
+    assert all(v["requires_revision"] and "503" in v["rationale"] for v in verdicts)
+    cache.set.assert_not_called()
+
+@patch('evaluator_agent.AsyncGroq')
+def test_eager_retrieval_skips_tool_round_trip(mock_groq):
+    mock_client = MagicMock()
+    mock_acompletion = AsyncMock()
+    mock_client.chat.completions.create = mock_acompletion
+    mock_groq.return_value = mock_client
+
+    registry = MagicMock()
+    registry.aretrieve = AsyncMock()
+    registry.avector_search = AsyncMock(return_value="The Palmer variety has virtually fiberless flesh.")
+    registry.aretrieve.return_value = {
+        "documents": ["The Palmer variety has virtually fiberless flesh."],
+        "distances": [0.2],
+        "confidence": 0.87
+    }
+
+    mock_resp = MagicMock()
+    mock_resp.choices[0].message.content = '{"faithfulness_score": 1.0, "requires_revision": false, "rationale": "Matches"}'
+    mock_acompletion.return_value = mock_resp
+
+    agent = EvaluatorAgent(registry, eager_retrieval=True, min_retrieval_confidence=0.5)
+    result = asyncio.run(agent.evaluate_claim("Palmer mangoes are virtually fiberless."))
+
+    assert result['requires_revision'] is False
+    assert mock_acompletion.await_count == 1
+    assert "tools" not in mock_acompletion.call_args.kwargs
+
+@patch('evaluator_agent.AsyncGroq')
+def test_local_verifier_defers_only_unsure_claims_to_llm(mock_groq):
+    mock_client = MagicMock()
+    mock_acompletion = AsyncMock()
+    mock_client.chat.completions.create = mock_acompletion
+    mock_groq.return_value = mock_client
+
+    registry = MagicMock()
+    registry.avector_search_many = AsyncMock(return_value=["Tommy Atkins accounts for 80% of Brazilian mango exports."] * 3)
+
+    verifier = MagicMock()
+    verifier.verify_many = AsyncMock(return_value=[
+        {"faithfulness_score": 0.97, "requires_revision": False, "rationale": "Local NLI model: supported"},
+        None,
+        None,
+    ])
+
+    resp = MagicMock()
+    resp.choices[0].message.content = ('{"verdicts": [{"id": 1, "faithfulness_score": 0.0, "requires_revision": true, "rationale": "bad"}, '
+                                       '{"id": 2, "faithfulness_score": 0.0, "requires_revision": true, "rationale": "bad"}]}')
+    mock_acompletion.return_value = resp
+
+    agent = EvaluatorAgent(registry, verifier=verifier)
+    claims = ["Tommy Atkins accounts for 80% of exports.", "Tommy Atkins is grown mostly on the moon.", "Mango trees grow on Mars."]
+    verdicts = asyncio.run(agent.evaluate_claims_batch(claims))
+
+    assert [v['requires_revision'] for v in verdicts] == [False, True, True]
+    assert mock_acompletion.await_count == 1
+    llm_prompt = mock_acompletion.call_args.kwargs["messages"][-1]["content"]
+    assert "moon" in llm_prompt and "80% of exports" not in llm_prompt
+
+@patch('evaluator_agent.AsyncGroq')
+def test_free_text_verdict_is_repaired_with_one_corrective_call(mock_groq):
+    mock_client = MagicMock()
+    mock_acompletion = AsyncMock()
+    mock_client.chat.completions.create = mock_acompletion
+    mock_groq.return_value = mock_client
+
+    registry = MagicMock()
+    registry.aretrieve = AsyncMock(return_value={
+        "documents": ["The Palmer variety has virtually fiberless flesh."],
+        "distances": [0.2],
+        "confidence": 0.87
+    })
+    registry.avector_search = AsyncMock(return_value="The Palmer variety has virtually fiberless flesh.")
+
+    free_text = MagicMock()
+    free_text.choices[0].message.content = "The claim matches the source, so it is faithful."
+    repaired = MagicMock()
+    repaired.choices[0].message.content = '{"faithfulness_score": 1.0, "requires_revision": false, "rationale": "Matches"}'
+    mock_acompletion.side_effect = [free_text, repaired]
+
+    agent = EvaluatorAgent(registry, eager_retrieval=True, min_retrieval_confidence=0.5)
+    result = asyncio.run(agent.evaluate_claim("Palmer mangoes are virtually fiberless."))
+
+    assert result == {"faithfulness_score": 1.0, "requires_revision": False, "rationale": "Matches"}
+    assert mock_acompletion.await_count == 2
+    corrective = mock_acompletion.call_args.kwargs["messages"]
+    assert corrective[-2]["content"] == "The claim matches the source, so it is faithful."
+    assert agent.output_stats == {"valid": 0, "repaired": 1, "failed": 0}
+
+def test_concurrent_claims_share_one_verifier_call():
+    registry = MagicMock()
+    registry.avector_search = AsyncMock(side_effect=lambda claim: f"evidence for {claim}")
+    verifier = MagicMock()
+    verifier.verify_many = AsyncMock(side_effect=lambda pairs: [
+        {"faithfulness_score": 1.0, "requires_revision": False, "rationale": evidence} for _, evidence in pairs])
+    agent = EvaluatorAgent(registry, verifier=verifier, rate_limiter=MagicMock(), client_pool=MagicMock())
+
+    async def main():
+        return await asyncio.gather(*[agent.evaluate_claim(f"claim {n}") for n in range(3)])
+
+    verdicts = asyncio.run(main())
+    assert [v["rationale"] for v in verdicts] == [f"evidence for claim {n}" for n in range(3)]
+    assert verifier.verify_many.await_count == 1
+    assert len(verifier.verify_many.await_args.args[0]) == 3
@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+import asyncio
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from event_server import EventServer
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.calls = []
+
+    async def stream_events(self, prompt, output_path):
+        self.calls.append((prompt, output_path))
+        yield {"type": "text", "offset": 0, "text": "Mangoes are sweet."}
+        yield {"type": "verdict", "claim": "Mangoes are sweet.", "start": 0, "end": 18, "verdict": {"requires_revision": False}, "tier": "llm"}
+        yield {"type": "done", "claims": 1, "flagged": 0}
+
+async def fetch(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = (await reader.read()).decode()
+    writer.close()
+    return response
+
+def test_events_endpoint_streams_sse(tmp_path):
+    orchestrator = FakeOrchestrator()
+
+    async def main():
+        server = await EventServer(orchestrator, str(tmp_path), port=0).start()
+        try:
+            return await fetch(server.port, "/events?prompt=Brazilian+mangos"), await fetch(server.port, "/events")
+        finally:
+            await server.close()
+
+    response, missing_prompt = asyncio.run(main())
+    head, body = response.split("\r\n\r\n", 1)
+    assert head.startswith("HTTP/1.1 200") and "text/event-stream" in head
+    messages = [block.split("\n") for block in body.strip().split("\n\n")]
+    assert [m[0] for m in messages] == ["event: text", "event: verdict", "event: done"]
+    assert json.loads(messages[1][1][len("data: "):])["end"] == 18
+    assert orchestrator.calls[0][0] == "Brazilian mangos"
+    assert missing_prompt.startswith("HTTP/1.1 400")
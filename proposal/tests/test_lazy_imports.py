@@ -0,0 +1,49 @@
+import sys
+import os
+import subprocess
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from lazy_imports import LazyImport
+from tool_registry import ToolRegistry
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+
+def test_entry_points_defer_heavy_dependencies():
+    probe = ("import sys, orchestrator, batch_audit, event_server; "
+             "print(','.join(m for m in ('chromadb', 'groq', 'jsonschema') if m in sys.modules))")
+    assert subprocess.check_output([sys.executable, "-c", probe], cwd=SRC_DIR, text=True).strip() == ""
+
+def test_lazy_import_resolves_on_first_use():
+    dumps = LazyImport("json", "dumps")
+    assert not dumps.loaded
+    assert dumps({"a": 1}) == '{"a": 1}'
+    assert dumps.loaded and LazyImport("os.path").join("a", "b") == os.path.join("a", "b")
+
+def test_registries_share_the_default_embedding_model_and_open_chroma_on_first_use():
+    first, second = ToolRegistry(collection_name="test_lazy_a"), ToolRegistry(collection_name="test_lazy_b")
+    assert first._collection is None and first._chroma_client is None
+    assert first.embedding_function is second.embedding_function
+
+def test_default_embedding_keeps_one_model_and_drops_its_session_after_fork():
+    import tool_registry
+    from unittest.mock import MagicMock, patch
+    onnx_class = MagicMock()
+    onnx_class.return_value.return_value = [[0.0]]
+    saved = tool_registry._default_embedding_function
+    try:
+        tool_registry.set_default_embedding_function(None)
+        with patch('tool_registry.ONNXMiniLM_L6_V2', onnx_class):
+            embedding_function = tool_registry.get_default_embedding_function()
+            embedding_function(["first"])
+            embedding_function(["second"])
+        assert onnx_class.call_count == 1
+        assert embedding_function.name() == "default"
+
+        onnx_model = embedding_function.onnx_model
+        vars(onnx_model).update(model="session", tokenizer="tokenizer")
+        tool_registry._reopen_model_after_fork()
+        assert "model" not in vars(onnx_model) and "tokenizer" not in vars(onnx_model)
+    finally:
+        tool_registry.set_default_embedding_function(saved)
@@ -0,0 +1,268 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from orchestrator import Orchestrator
+from draft_checkpoint import DraftCheckpoint
+from rate_limiter import RateLimiter
+from test_tool_registry import CountingEmbeddingFunction
+
+@pytest.fixture
+def orchestrator(tmp_path):
+    os.environ["GROQ_API_KEY"] = "testsuite"
+    source = tmp_path / "source.txt"
+    source.write_text("Tommy Atkins accounts for 80% of Brazilian mango exports.\n\nThe Palmer variety has virtually fiberless flesh.")
+    return Orchestrator(source_text_path=str(source), embedding_function=CountingEmbeddingFunction())
+
+class AuthenticationError(Exception):
+    status_code = 401
+
+def test_pipeline_resumes_from_first_incomplete_section(orchestrator, tmp_path):
+    output = tmp_path / "draft.md"
+    outline = [{"title": t, "summary": ""} for t in ("One", "Two", "Three")]
+    orchestrator.generator.plan_outline = AsyncMock(return_value=outline)
+    orchestrator.generator.rate_limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000)
+    streamed, fail_in = [], {"Two"}
+
+    async def create(**kwargs):
+        section = kwargs["messages"][-1]["content"].split("section titled '")[1].split("'")[0]
+        streamed.append(section)
+        if section in fail_in:
+            raise AuthenticationError("Error code: 401 - invalid API key")
+
+        async def stream():
+            for text in (f"Section {section} opens with a complete sentence. ", f"Section {section} closes with another sentence."):
+                chunk = MagicMock()
+                chunk.choices[0].delta.content = text
+                yield chunk
+        return stream()
+
+    orchestrator.generator._client = MagicMock()
+    orchestrator.generator._client.chat.completions.create = create
+    evaluated = []
+
+    async def evaluate_claim(claim):
+        evaluated.append(claim)
+        return {"claim": claim, "verdict": {"requires_revision": False}, "tier": "llm"}
+
+    orchestrator._evaluate_claim = evaluate_claim
+
+    with pytest.raises(AuthenticationError):
+        asyncio.run(orchestrator.generate_and_evaluate_pipeline("prompt", str(output)))
+    assert streamed == ["One", "Two"]
+    # Section one reached disk before the failure; the failed section is not marked complete.
+    assert "Section One closes" in output.read_text() and "[Error generating" not in output.read_text()
+    checkpoint = DraftCheckpoint.load(DraftCheckpoint.path_for(str(output)), orchestrator._draft_run_key("prompt"))
+    assert checkpoint.completed_sections == 1
+
+    fail_in.clear()
+    evaluated.clear()
+    results = asyncio.run(orchestrator.generate_and_evaluate_pipeline("prompt", str(output)))
+
+    assert streamed == ["One", "Two", "Two", "Three"]
+    assert orchestrator.generator.plan_outline.await_count == 1
+    text = output.read_text()
+    assert text.count("## Two") == 1 and text.count("Section Two opens") == 1
+    assert [r["claim"] for r in results] == [
+        f"Section {s} {verb}" for s in ("One", "Two", "Three")
+        for verb in ("opens with a complete sentence.", "closes with another sentence.")
+    ]
+    # Section one's claims already had verdicts and are not evaluated again.
+    assert not any("One" in claim for claim in evaluated)
+    checkpoint = DraftCheckpoint.load(DraftCheckpoint.path_for(str(output)), orchestrator._draft_run_key("prompt"))
+    assert checkpoint.completed_sections == 3 and len(checkpoint.verdicts) == 6
+
+def test_stream_events_interleave_text_and_verdicts_with_offsets(orchestrator, tmp_path):
+    orchestrator.generator.plan_outline = AsyncMock(return_value=[{"title": "One", "summary": ""}])
+
+    async def stream_section(section, messages, raise_errors=False):
+        yield "Mangoes grow in Brazil's Sao Francisco Valley. "
+        yield "Palmer mangoes "
+        await asyncio.sleep(0.05)
+        yield "have fiberless flesh."
+
+    async def evaluate_claim(claim):
+        return {"claim": claim, "verdict": {"requires_revision": "Palmer" in claim}, "tier": "llm"}
+
+    orchestrator.generator._stream_section = stream_section
+    orchestrator._evaluate_claim = evaluate_claim
+
+    async def collect():
+        return [event async for event in orchestrator.stream_events("prompt", str(tmp_path / "draft.md"))]
+
+    events = asyncio.run(collect())
+    draft = "".join(e["text"] for e in events if e["type"] == "text")
+    assert draft == (tmp_path / "draft.md").read_text()
+    verdicts = [e for e in events if e["type"] == "verdict"]
+    assert [draft[v["start"]:v["end"]] for v in verdicts] == [v["claim"] for v in verdicts]
+    assert len(verdicts) == 2
+    # The first claim's verdict is out while the section is still streaming.
+    assert events.index(verdicts[0]) < max(i for i, e in enumerate(events) if e["type"] == "text")
+    assert events[-1] == {"type": "done", "claims": 2, "flagged": 1}
+
+def test_evaluate_document_evaluates_repeated_claims_once(orchestrator, tmp_path):
+    draft = tmp_path / "draft.md"
+    draft.write_text("## Palmer\n\nThe Palmer variety has fiberless flesh. Exports: 80%.\n"
+                     "As noted above, the Palmer variety has fiberless flesh.\n"
+                     "The Palmer variety has fiberless flesh!\n")
+    evaluated = []
+
+    async def evaluate_claim(claim):
+        evaluated.append(claim)
+        return {"claim": claim, "verdict": {"requires_revision": False}, "tier": "llm"}
+
+    orchestrator._evaluate_claim = evaluate_claim
+    results = asyncio.run(orchestrator.evaluate_document(str(draft)))
+
+    assert evaluated == ["The Palmer variety has fiberless flesh.", "Exports: 80%.", "As noted above, the Palmer variety has fiberless flesh."]
+    assert [r.get("duplicate_of") for r in results] == [None, None, None, 0]
+    text = draft.read_text()
+    assert all(text[r["start"]:r["end"]] == r["claim"] for r in results)
+
+def test_pipeline_shares_verdicts_between_repeated_claims(orchestrator, tmp_path):
+    orchestrator.generator.plan_outline = AsyncMock(return_value=[{"title": "One", "summary": ""}])
+
+    async def stream_section(section, messages, raise_errors=False):
+        yield "Palmer mangoes have fiberless flesh. In this section we look at mangoes. "
+        yield "Palmer mangoes have fiberless flesh!"
+
+    evaluated = []
+
+    async def evaluate_claim(claim):
+        evaluated.append(claim)
+        await asyncio.sleep(0.01)
+        return {"claim": claim, "verdict": {"requires_revision": False}, "tier": "llm"}
+
+    orchestrator.generator._stream_section = stream_section
+    orchestrator._evaluate_claim = evaluate_claim
+    results = asyncio.run(orchestrator.generate_and_evaluate_pipeline("prompt", str(tmp_path / "draft.md")))
+
+    assert evaluated == ["Palmer mangoes have fiberless flesh."]
+    assert [(r["claim"], r.get("duplicate_of")) for r in results] == [
+        ("Palmer mangoes have fiberless flesh.", None), ("Palmer mangoes have fiberless flesh!", 0)]
+
+def test_orchestrator_context_closes_only_its_own_client_pool(orchestrator, tmp_path):
+    from client_pool import ClientPool
+    shared = ClientPool()
+    source = tmp_path / "source.txt"
+    borrower = Orchestrator(source_text_path=str(source), embedding_function=CountingEmbeddingFunction(), client_pool=shared)
+    assert borrower.generator.client_pool is shared and borrower.evaluator.client_pool is shared
+
+    async def run():
+        async with orchestrator, borrower:
+            pass
+
+    asyncio.run(run())
+    assert orchestrator.client_pool.closed
+    assert not shared.closed
+    # Retrieval threads go with the orchestrator, whoever owns the pool.
+    assert orchestrator.tool_registry._executor._shutdown and borrower.tool_registry._executor._shutdown
+    asyncio.run(shared.aclose())
+
+def test_pipeline_repairs_flagged_sections_and_splices_them_in(orchestrator, tmp_path):
+    orchestrator.repair_threshold = 0.5
+    orchestrator.generator.plan_outline = AsyncMock(return_value=[{"title": t, "summary": ""} for t in ("One", "Two")])
+    bodies = {
+        "One": "Tommy Atkins makes up 100% of mango exports. Palmer mangoes have fiberless flesh.",
+        "Two": "Mango exports leave from the Sao Francisco Valley.",
+    }
+
+    async def stream_section(section, messages, raise_errors=False):
+        yield bodies[section]
+
+    evaluated = []
+
+    async def evaluate_claim(claim):
+        evaluated.append(claim)
+        return {"claim": claim, "verdict": {"requires_revision": "100%" in claim}, "tier": "llm"}
+
+    repair = AsyncMock(return_value="Tommy Atkins makes up 80% of mango exports. Palmer mangoes have fiberless flesh.")
+    orchestrator.generator._stream_section = stream_section
+    orchestrator.generator.repair_section = repair
+    orchestrator._evaluate_claim = evaluate_claim
+    output = tmp_path / "draft.md"
+    repairs = []
+    results = asyncio.run(orchestrator.generate_and_evaluate_pipeline("prompt", str(output), on_repair=repairs.append))
+
+    section, body, failing = repair.await_args.args[2:]
+    assert section["title"] == "One" and body == bodies["One"]
+    assert [claim for claim, _ in failing] == ["Tommy Atkins makes up 100% of mango exports."]
+    # Only the rewritten claim is evaluated again.
+    assert evaluated.count("Palmer mangoes have fiberless flesh.") == 1
+    assert evaluated[-1] == "Tommy Atkins makes up 80% of mango exports."
+
+    text = output.read_text()
+    assert "100%" not in text and "## Two\n\nMango exports leave" in text
+    assert [r["claim"] for r in results] == [
+        "Tommy Atkins makes up 80% of mango exports.", "Palmer mangoes have fiberless flesh.",
+        "Mango exports leave from the Sao Francisco Valley."]
+    assert all(text[r["start"]:r["end"]] == r["claim"] for r in results)
+    assert not any(r["verdict"]["requires_revision"] for r in results)
+    assert len(repairs) == 1 and repairs[0]["flagged_before"] == 1 and repairs[0]["flagged_after"] == 0
+    assert orchestrator.repair_stats == [{"section": "One", "flagged_before": 1, "flagged_after": 0, "reverified": 1, "accepted": True}]
+
+def test_pipeline_repairs_share_the_queue_and_leave_delivered_results_alone(orchestrator, tmp_path):
+    orchestrator.repair_threshold = 0.5
+    orchestrator.generator.plan_outline = AsyncMock(return_value=[{"title": t, "summary": ""} for t in ("One", "Two")])
+    bodies = {
+        "One": "Tommy Atkins makes up 100% of mango exports.",
+        "Two": "Mango exports leave from the Sao Francisco Valley. Mango exports leave from the Sao Francisco Valley.",
+    }
+
+    async def stream_section(section, messages, raise_errors=False):
+        yield bodies[section]
+
+    async def evaluate_claim(claim):
+        return {"claim": claim, "verdict": {"requires_revision": "100%" in claim}, "tier": "llm"}
+
+    orchestrator.generator._stream_section = stream_section
+    orchestrator.generator.repair_section = AsyncMock(return_value="Tommy Atkins makes up the largest share of mango exports.")
+    orchestrator._evaluate_claim = evaluate_claim
+    orchestrator.evaluate_claims_concurrently = AsyncMock(side_effect=AssertionError("repair bypassed the queue"))
+    delivered = []
+    results = asyncio.run(orchestrator.generate_and_evaluate_pipeline("prompt", str(tmp_path / "draft.md"), on_result=delivered.append))
+
+    assert [r["claim"] for r in results][0] == "Tommy Atkins makes up the largest share of mango exports."
+    # The results handed to on_result keep the offsets of the original draft.
+    assert delivered[0]["claim"] == "Tommy Atkins makes up 100% of mango exports."
+    assert all(r is not d for r in results for d in delivered)
+    assert results[-1]["duplicate_of"] == len(results) - 2 and delivered[-1]["duplicate_of"] == len(delivered) - 2
+    assert results[-1]["start"] - delivered[-1]["start"] == len(results[0]["claim"]) - len(delivered[0]["claim"])
+
+def test_vector_tier_accepts_only_claims_stating_the_best_chunk_in_order(orchestrator):
+    chunk = "Tommy Atkins accounts for 80% of exports and Palmer for 20% of exports."
+    retrieval = lambda distance: {"documents": [chunk, "Keitt 20% Tommy 80%"], "distances": [distance, 0.9]}
+
+    accepted = orchestrator._vector_tier("Tommy Atkins accounts for 80% of exports and Palmer for 20% of exports.", retrieval(0.1))
+    assert accepted["requires_revision"] is False
+    # Every token overlaps and the distance is tiny, but the figures are swapped.
+    assert orchestrator._vector_tier("Tommy Atkins accounts for 20% of exports and Palmer for 80% of exports.", retrieval(0.1)) is None
+    # A figure that only the second chunk mentions is not evidence for the best one.
+    assert orchestrator._vector_tier("Keitt accounts for 80% of exports.", retrieval(0.1)) is None
+    assert orchestrator._vector_tier("Tommy Atkins accounts for 80% of exports.", retrieval(0.6)) is None
+    rejected = orchestrator._vector_tier("Tommy Atkins accounts for 80% of exports.", retrieval(1.4))
+    assert rejected["requires_revision"] is True
+
+def test_concurrent_runs_keep_separate_tier_counts(orchestrator):
+    orchestrator.tiered = False
+
+    async def evaluate_claim(claim):
+        await asyncio.sleep(0.01)
+        return {"requires_revision": False}
+    orchestrator.evaluator.evaluate_claim = evaluate_claim
+
+    async def run(claims):
+        counts = orchestrator._start_tier_counts()
+        await orchestrator.evaluate_claims_concurrently(claims)
+        return counts
+
+    async def main():
+        return await asyncio.gather(asyncio.create_task(run(["a", "b", "c"])), asyncio.create_task(run(["d"])))
+
+    first, second = asyncio.run(main())
+    assert first == {"llm": 3} and second == {"llm": 1}
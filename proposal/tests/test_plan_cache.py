@@ -0,0 +1,32 @@
+import sys
+import os
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from plan_cache import PlanCache
+
+def test_equivalent_prompts_share_a_plan_that_survives_restarts(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = PlanCache(db_path=db_path)
+    key = cache.make_key("Write a report on  Brazilian mangos!", "corpus-a", "model", 5)
+    assert cache.make_key("write a report on brazilian mangos", "corpus-a", "model", 5) == key
+    assert cache.make_key("Write a report on Brazilian mangos", "corpus-b", "model", 5) != key
+    assert cache.make_key("Write a report on Brazilian mangos", "corpus-a", "model", 3) != key
+
+    plan = [{"title": "Exports", "summary": "Trade volumes.", "digest": "Tommy Atkins accounts for 80% of exports."}]
+    assert cache.get(key) is None
+    cache.set(key, plan)
+    cache.get(key)[0]["title"] = "mutated"
+    cache.close()
+
+    reopened = PlanCache(db_path=db_path)
+    assert reopened.get(key) == plan
+    assert reopened.stats["hits"] == 1
+    reopened.close()
+
+def test_expired_plans_are_dropped(tmp_path):
+    cache = PlanCache(db_path=str(tmp_path / "cache.sqlite3"), ttl_seconds=-1)
+    cache.set("key", [{"title": "A", "summary": "", "digest": ""}])
+    assert cache.get("key") is None
+    cache.close()
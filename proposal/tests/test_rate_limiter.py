@@ -0,0 +1,102 @@
+import sys
+import os
+import time
+import asyncio
+import multiprocessing
+
+import pytest
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from rate_limiter import RateLimiter, PRIORITY_EVALUATOR, PRIORITY_GENERATOR
+
+def test_generator_calls_jump_ahead_of_queued_evaluator_calls():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000)
+    order = []
+
+    async def acquire(name, priority):
+        await limiter.acquire(10, priority)
+        order.append(name)
+
+    async def run():
+        limiter.observe_headers({"retry-after": "0.05"})
+        evaluator = asyncio.create_task(acquire("evaluator", PRIORITY_EVALUATOR))
+        await asyncio.sleep(0)
+        generator = asyncio.create_task(acquire("generator", PRIORITY_GENERATOR))
+        await asyncio.gather(evaluator, generator)
+
+    asyncio.run(run())
+    assert order == ["generator", "evaluator"]
+
+def test_rate_limited_calls_are_retried_after_hinted_delay():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000)
+    attempts = []
+
+    async def request():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise Exception("Error code: 429 - Rate limit reached. Please try again in 10ms.")
+        return "ok"
+
+    assert asyncio.run(limiter.call(request)) == "ok"
+    assert len(attempts) == 2
+    assert limiter.stats["rate_limited"] == 1
+
+def test_api_429_reaches_the_limiter_instead_of_sdk_retries():
+    os.environ["GROQ_API_KEY"] = "testsuite"
+    import httpx
+    from client_pool import ClientPool
+    from evaluator_agent import EvaluatorAgent
+
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000, base_delay=0.01)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"retry-after": "0.05", "x-ratelimit-remaining-tokens": "500"},
+                                  json={"error": {"message": "Rate limit reached. Please try again in 50ms."}})
+        return httpx.Response(200, json={
+            "id": "1", "object": "chat.completion", "created": 0, "model": "m",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": '{"faithfulness_score": 1.0, "requires_revision": false}'}}],
+        })
+
+    pool = ClientPool(rate_limiter=limiter, http2=False)
+    pool._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    agent = EvaluatorAgent(None, rate_limiter=limiter, client_pool=pool)
+
+    content = asyncio.run(agent._json_completion([{"role": "user", "content": "claim"}]))
+    assert "faithfulness_score" in content
+    assert len(requests) == 2
+    assert limiter.stats["rate_limited"] == 1 and limiter.stats["calls"] == 2
+
+
+def _admit_until_paced(state, admitted):
+    limiter = RateLimiter(shared_state=state)
+
+    async def main():
+        count = 0
+        try:
+            while True:
+                await asyncio.wait_for(limiter.acquire(1), timeout=0.5)
+                count += 1
+        except asyncio.TimeoutError:
+            return count
+
+    admitted.put(asyncio.run(main()))
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs the fork start method")
+def test_processes_sharing_a_budget_never_admit_more_than_it_allows():
+    context = multiprocessing.get_context("fork")
+    # 30 requests per minute refill one slot every 2 s, longer than a worker waits.
+    state = RateLimiter.shared_state(30, 1_000_000, context=context)
+    admitted = context.Queue()
+    workers = [context.Process(target=_admit_until_paced, args=(state, admitted)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    total = sum(admitted.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join()
+    assert 30 <= total <= 31
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sentence_segmenter import StreamingSentenceSegmenter, KIND_HEADER, KIND_LIST_ITEM, KIND_TABLE_ROW
+
+STREAM = (
+    "\n\n## Mango Exports\n\n"
+    "Brazil exported 3.5 tons in 2022. Dr. Silva agrees, e.g. in Bahia! Is it true?\n"
+    "1. Tommy Atkins leads exports.\n"
+    "| Variety | Share |\n"
+    "| Tommy Atkins | 80% |\n"
+    "Palmer is fiberless"
+)
+
+def test_segments_are_emitted_token_by_token_with_offsets():
+    segmenter = StreamingSentenceSegmenter()
+    segments = []
+    for ch in STREAM:
+        segments += segmenter.feed(ch)
+    assert [s.text for s in segments][-1] == "| Tommy Atkins | 80% |"
+    segments += segmenter.flush()
+
+    assert [s.text for s in segments] == [
+        "## Mango Exports",
+        "Brazil exported 3.5 tons in 2022.",
+        "Dr. Silva agrees, e.g. in Bahia!",
+        "Is it true?",
+        "1. Tommy Atkins leads exports.",
+        "| Variety | Share |",
+        "| Tommy Atkins | 80% |",
+        "Palmer is fiberless",
+    ]
+    assert [s.kind for s in segments][0] == KIND_HEADER
+    assert segments[4].kind == KIND_LIST_ITEM
+    assert segments[6].kind == KIND_TABLE_ROW
+    assert all(STREAM[s.start:s.end] == s.text for s in segments)
+
+def test_sentence_is_released_as_soon_as_the_next_one_starts():
+    segmenter = StreamingSentenceSegmenter()
+    assert segmenter.feed("Exports grew 3.") == []
+    assert segmenter.feed("5% last year. ") == []
+    assert [s.text for s in segmenter.feed("Prices")] == ["Exports grew 3.5% last year."]
+
+def test_long_paragraph_only_buffers_the_unfinished_sentence():
+    segmenter = StreamingSentenceSegmenter()
+    sentence = "Exports grew 3.5% in 2022, e.g. in Bahia. "
+    emitted = []
+    for _ in range(500):
+        for token in sentence.split(" "):
+            emitted += segmenter.feed(token + " ")
+        # Earlier sentences of the line are dropped once emitted, so each feed stays cheap.
+        assert len(segmenter._buffer) < 2 * len(sentence)
+    emitted += segmenter.flush()
+    assert len(emitted) == 500 and {s.text for s in emitted} == {sentence.strip()}
+    assert emitted[-1].start == 499 * (len(sentence) + 1)
@@ -0,0 +1,48 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from structured_output import OUTLINE_SCHEMA, VERDICT_SCHEMA, StructuredOutputError, extract_json, parse_with_repair
+
+def test_extract_json_finds_the_value_around_prose_and_fences():
+    assert extract_json('{"a": 1}') == {"a": 1}
+    assert extract_json('Sure! ```json\n{"a": {"b": [1, 2]}}\n``` Hope {this} helps.') == {"a": {"b": [1, 2]}}
+    assert extract_json('Titles: ["Intro", "Exports"].') == ["Intro", "Exports"]
+    with pytest.raises(StructuredOutputError):
+        extract_json("The claim is supported.")
+
+def test_schemas_coerce_and_validate():
+    verdict = VERDICT_SCHEMA.parse('{"faithfulness_score": "0.8", "requires_revision": "false"}')
+    assert verdict == {"faithfulness_score": 0.8, "requires_revision": False, "rationale": ""}
+    with pytest.raises(StructuredOutputError, match="faithfulness_score"):
+        VERDICT_SCHEMA.parse('{"faithfulness_score": 8, "requires_revision": true}')
+
+    assert OUTLINE_SCHEMA.parse('{"outline": ["Intro", "Exports"]}') == ["Intro", "Exports"]
+    with pytest.raises(StructuredOutputError):
+        OUTLINE_SCHEMA.parse('{"sections": []}')
+
+def test_only_malformed_replies_are_repaired():
+    prompts = []
+
+    async def retry(previous, prompt):
+        prompts.append((previous, prompt))
+        return '{"faithfulness_score": 1.0, "requires_revision": false, "rationale": "ok"}'
+
+    stats = {}
+    assert asyncio.run(parse_with_repair(VERDICT_SCHEMA, '{"faithfulness_score": 0.5, "requires_revision": true}', retry, stats=stats))["faithfulness_score"] == 0.5
+    assert not prompts
+
+    verdict = asyncio.run(parse_with_repair(VERDICT_SCHEMA, "Looks supported to me.", retry, stats=stats))
+    assert verdict["requires_revision"] is False
+    assert prompts[0][0] == "Looks supported to me." and "requires_revision" in prompts[0][1]
+
+    async def still_broken(previous, prompt):
+        return "{not json"
+
+    with pytest.raises(StructuredOutputError):
+        asyncio.run(parse_with_repair(VERDICT_SCHEMA, "nope", still_broken, stats=stats))
+    assert stats == {"valid": 1, "repaired": 1, "failed": 1}
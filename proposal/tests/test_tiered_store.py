@@ -0,0 +1,38 @@
+import sys
+import os
+import time
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from tiered_store import TIER_DISK, TIER_MEMORY, TieredStore
+
+def test_stores_share_a_database_in_separate_tables(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite")
+    verdicts = TieredStore("verdicts", "verdict", db_path=db_path, max_memory_entries=1, max_disk_entries=2)
+    plans = TieredStore("plans", "plan", db_path=db_path)
+    verdicts.set("a", {"score": 1})
+    verdicts.set("b", {"score": 2})
+    plans.set("a", [{"title": "Exports"}])
+
+    assert verdicts.get("b") == ({"score": 2}, TIER_MEMORY)
+    assert verdicts.get("a") == ({"score": 1}, TIER_DISK)
+    assert plans.get("a") == ([{"title": "Exports"}], TIER_MEMORY)
+
+    # The disk tier keeps the most recently used entries.
+    verdicts.set("c", {"score": 3})
+    reopened = TieredStore("verdicts", "verdict", db_path=db_path, ttl_seconds=60)
+    assert reopened.get("b") == (None, None)
+    assert reopened.get("a")[1] == reopened.get("c")[1] == TIER_DISK
+    assert TieredStore("plans", "plan", db_path=db_path).get("a")[0] == [{"title": "Exports"}]
+
+    reopened.ttl_seconds = 0
+    time.sleep(0.01)
+    assert reopened.get("a") == (None, None)
+    for store in (verdicts, plans, reopened):
+        store.close()
+
+def test_disk_tier_waits_for_other_writers(tmp_path):
+    store = TieredStore("verdicts", "verdict", db_path=str(tmp_path / "cache.sqlite"), busy_timeout_seconds=5)
+    assert store._conn.execute("PRAGMA busy_timeout").fetchone() == (5000,)
+    store.close()
@@ -0,0 +1,103 @@
+import sys
+import os
+import asyncio
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from tool_registry import ToolRegistry
+
+class CountingEmbeddingFunction(EmbeddingFunction):
+    """Deterministic bag-of-words embedding so the registry can be tested offline."""
+
+    def __init__(self):
+        self.calls = []
+
+    @staticmethod
+    def name() -> str:
+        return "counting-test"
+
+    def get_config(self) -> dict:
+        return {}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "CountingEmbeddingFunction":
+        return CountingEmbeddingFunction()
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        embeddings = []
+        for text in input:
+            vector = np.zeros(64, dtype=np.float32)
+            for word in text.lower().split():
+                vector[sum(map(ord, word)) % 64] += 1.0
+            embeddings.append(vector / (np.linalg.norm(vector) or 1.0))
+        return embeddings
+
+def test_vector_search_many_embeds_once_and_caches_results():
+    embedder = CountingEmbeddingFunction()
+    registry = ToolRegistry(collection_name="test_batched_queries", embedding_function=embedder)
+    registry.load_context(["Tommy Atkins accounts for 80% of Brazilian mango exports.", "The Palmer variety has virtually fiberless flesh."])
+    embedder.calls.clear()
+
+    queries = ["Tommy Atkins exports", "Palmer fiberless flesh", "Tommy Atkins exports"]
+    results = registry.vector_search_many(queries)
+    assert results[0].startswith("Tommy Atkins")
+    assert results[1].startswith("The Palmer variety")
+    assert embedder.calls == [["Tommy Atkins exports", "Palmer fiberless flesh"]]
+
+    assert asyncio.run(registry.avector_search("Palmer fiberless flesh")) == results[1]
+    assert len(embedder.calls) == 1
+
+def test_hybrid_search_finds_numeric_claims_and_trims_to_sentences():
+    registry = ToolRegistry(collection_name="test_hybrid_search", embedding_function=CountingEmbeddingFunction(),
+                            n_results=1, evidence_mode="sentences", max_evidence_sentences=1)
+    registry.load_context([
+        "Brazil grows many mango varieties. Tommy Atkins accounts for 80% of exports. It ships well.",
+        "The Palmer variety has virtually fiberless flesh. It is popular in domestic markets.",
+        "Exports grew 3.5% in 2022 while domestic prices fell.",
+    ])
+
+    evidence = registry.vector_search("What share of exports is Tommy Atkins? 80%")
+    assert evidence == "Tommy Atkins accounts for 80% of exports."
+
+def test_persistent_index_only_embeds_changed_chunks(tmp_path):
+    chunks = ["Tommy Atkins accounts for 80% of Brazilian mango exports.", "The Palmer variety has virtually fiberless flesh.",
+              "Exports grew 3.5% in 2022.", "Keitt mangoes ripen late in the season."]
+    path = str(tmp_path / "index")
+
+    def open_registry(**kwargs):
+        embedder = CountingEmbeddingFunction()
+        registry = ToolRegistry(collection_name="test_persistent", persist_directory=path, embedding_function=embedder, **kwargs)
+        return registry, embedder
+
+    def embedded(embedder):
+        return sorted(text for call in embedder.calls for text in call)
+
+    def indexed(registry):
+        return set(registry.collection.get(include=[])["ids"])
+
+    registry, embedder = open_registry()
+    registry.sync_context(chunks[:3], "v1")
+    assert embedded(embedder) == sorted(chunks[:3])
+
+    # Same source hash: nothing is read back or embedded.
+    registry, embedder = open_registry()
+    registry.sync_context(chunks[:3], "v1")
+    assert embedder.calls == []
+
+    # Only the new chunk is embedded and the dropped one is deleted.
+    registry, embedder = open_registry()
+    registry.sync_context([chunks[0], chunks[2], chunks[3]], "v2")
+    assert embedded(embedder) == [chunks[3]]
+    assert indexed(registry) == {ToolRegistry.chunk_id(chunks[i]) for i in (0, 2, 3)}
+    assert registry.collection.metadata["source_hash"] == "v2"
+
+    # A read-only reader uses a stale index as it is.
+    registry, embedder = open_registry(read_only=True)
+    registry.sync_context(chunks[:2], "v3")
+    assert embedder.calls == []
+    assert indexed(registry) == {ToolRegistry.chunk_id(chunks[i]) for i in (0, 2, 3)}
+    assert registry.collection.metadata["source_hash"] == "v2"
@@ -0,0 +1,55 @@
+import sys
+import os
+import json
+import asyncio
+import urllib.request
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from tracing import Tracer
+
+def test_spans_nest_across_awaits_and_export_jsonl(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = Tracer(jsonl_path=str(path))
+
+    async def child(n):
+        with tracer.span("child", n=n):
+            await asyncio.sleep(0.01)
+
+    async def run():
+        with tracer.span("parent"):
+            await asyncio.gather(child(1), child(2))
+
+    asyncio.run(run())
+    tracer.record_usage("evaluator", {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150})
+    tracer.write_summary()
+    tracer.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    spans = {(l["name"], l["attributes"].get("n")): l for l in lines if l["type"] == "span"}
+    parent = spans[("parent", None)]
+    assert spans[("child", 1)]["parent"] == parent["id"] and spans[("child", 2)]["parent"] == parent["id"]
+    summary = lines[-1]
+    assert summary["type"] == "summary" and summary["spans"]["child"]["count"] == 2
+    assert summary["counters"]["tokens{kind=prompt,stage=evaluator}"] == 120
+
+def test_prometheus_endpoint_serves_metrics():
+    tracer = Tracer()
+    tracer.record("llm.call", 0.25)
+    tracer.count("llm.retries", stage="evaluator")
+    port = tracer.serve_prometheus(port=0)
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+    finally:
+        tracer.close()
+    assert 'pipeline_span_seconds_count{span="llm.call"} 1' in body
+    assert 'pipeline_llm_retries_total{stage="evaluator"} 1' in body
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("anything") as span:
+        span.set(ignored=True)
+    tracer.record("anything", 1.0)
+    tracer.count("anything")
+    assert tracer.summary() == {"spans": {}, "counters": {}}
@@ -0,0 +1,39 @@
+import sys
+import os
+import asyncio
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from verdict_cache import VerdictCache
+
+def test_cache_persists_and_normalizes_claims(tmp_path):
+    db_path = str(tmp_path / "verdicts.sqlite3")
+    cache = VerdictCache(db_path=db_path)
+    key = cache.make_key("Palmer is  fiberless.", "model-a", "corpus-1")
+    cache.set(key, {"faithfulness_score": 1.0, "requires_revision": False, "rationale": "ok"})
+    cache.close()
+
+    reopened = VerdictCache(db_path=db_path)
+    assert reopened.make_key("palmer is fiberless.", "model-a", "corpus-1") == key
+    assert reopened.make_key("palmer is fiberless.", "model-a", "corpus-2") != key
+    assert reopened.get(key)["faithfulness_score"] == 1.0
+    assert reopened.stats["disk_hits"] == 1
+
+def test_concurrent_identical_claims_share_one_evaluation():
+    cache = VerdictCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"faithfulness_score": 0.0, "requires_revision": True, "rationale": "bad"}, True
+
+    async def run():
+        key = cache.make_key("claim", "model", "corpus")
+        return await asyncio.gather(*[cache.get_or_compute(key, compute) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r["requires_revision"] for r in results)
+    assert cache.stats["coalesced"] == 4
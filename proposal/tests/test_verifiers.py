@@ -0,0 +1,60 @@
+import sys
+import os
+import asyncio
+import numpy as np
+import pytest
+from types import SimpleNamespace
+
+# Ensure the src folder is in the python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from verifiers import NLIVerifier, Verifier
+
+class FakeTokenizer:
+    """Encodes each pair as one token: 1 if the hypothesis says 100%, 2 if it says 80%, else 0."""
+
+    def enable_truncation(self, **kwargs):
+        pass
+
+    def enable_padding(self, **kwargs):
+        pass
+
+    def encode_batch(self, pairs):
+        token = lambda claim: 1 if "100%" in claim else 2 if "80%" in claim else 0
+        return [SimpleNamespace(ids=[token(claim)], attention_mask=[1], type_ids=[0]) for _, claim in pairs]
+
+class FakeSession:
+    def __init__(self):
+        self.batches = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, feeds):
+        assert set(feeds) == {"input_ids", "attention_mask"}
+        self.batches.append(len(feeds["input_ids"]))
+        # Labels: contradiction, entailment, neutral.
+        table = {0: [0.0, 0.0, 3.0], 1: [6.0, 0.0, 0.0], 2: [0.0, 6.0, 0.0]}
+        return [np.array([table[int(ids[0])] for ids in feeds["input_ids"]])]
+
+def test_nli_verifier_accepts_rejects_and_defers():
+    session = FakeSession()
+    verifier = NLIVerifier(session, FakeTokenizer(), ["CONTRADICTION", "ENTAILMENT", "NEUTRAL"], batch_size=2)
+    evidence = "Tommy Atkins accounts for 80% of Brazilian mango exports."
+    claims = ["Tommy Atkins is 80% of exports.", "Tommy Atkins is 100% of exports.", "Mangoes are tasty."]
+
+    verdicts = asyncio.run(verifier.verify_many([(claim, evidence) for claim in claims]))
+    verifier.close()
+
+    assert verdicts[0]["requires_revision"] is False and verdicts[0]["faithfulness_score"] > 0.9
+    assert verdicts[1]["requires_revision"] is True and "contradicted" in verdicts[1]["rationale"]
+    assert verdicts[2] is None
+    assert session.batches == [2, 1]
+
+def test_nli_verifier_requires_entailment_labels():
+    with pytest.raises(ValueError):
+        NLIVerifier(FakeSession(), FakeTokenizer(), ["positive", "negative"])
+
+def test_verifier_backends_must_implement_verify_many():
+    with pytest.raises(TypeError):
+        Verifier()